@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+"""Measure the throughput of NodeOps.atomic_update() with N concurrent
+updaters incrementing one counter, with and without the backoff and cached
+state. Requires a running etcd.
+"""
+
+import sys
+import os
+import time
+import threading
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from etcd.client import Client
+from etcd.exceptions import EtcdAtomicWriteError
+
+
+def _run(args, label, **kwargs):
+    path = args.path + '/counter'
+
+    c = Client(host=args.host, port=args.port)
+    c.node.set(path, 0)
+
+    counts = { 'calls': 0, 'successes': 0, 'failures': 0 }
+    counts_lock = threading.Lock()
+
+    def increment(value):
+        with counts_lock:
+            counts['calls'] += 1
+
+        return int(value) + 1
+
+    def update():
+        # A client per updater, so that each has its own session and cache.
+        c = Client(host=args.host, port=args.port)
+
+        for i in range(args.updates):
+            try:
+                c.node.atomic_update(path, increment,
+                                     max_attempts=args.max_attempts,
+                                     **kwargs)
+            except EtcdAtomicWriteError:
+                key = 'failures'
+            else:
+                key = 'successes'
+
+            with counts_lock:
+                counts[key] += 1
+
+    threads = [threading.Thread(target=update)
+               for i in range(args.updaters)]
+
+    start = time.time()
+
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    elapsed_s = time.time() - start
+
+    print("%s: (%d) updates/s, (%.2f) attempts per success, (%d) "
+          "exhausted, final value (%s)" %
+          (label, counts['successes'] / elapsed_s,
+           float(counts['calls']) / max(1, counts['successes']),
+           counts['failures'], c.node.get(path).node.value))
+
+    c.directory.delete_recursive(args.path)
+
+
+def _main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', default=4001, type=int)
+    parser.add_argument('--updaters', default=16, type=int)
+    parser.add_argument('--updates', default=100, type=int,
+                        help="Number of updates per updater.")
+    parser.add_argument('--max-attempts', default=100, type=int)
+    parser.add_argument('--path', default='/bench_atomic_update')
+
+    args = parser.parse_args()
+
+    _run(args, 'Immediate retry', backoff_base_s=0)
+    _run(args, 'Backoff', use_cache=False)
+    _run(args, 'Backoff, cached state', use_cache=True)
+
+if __name__ == '__main__':
+    _main()
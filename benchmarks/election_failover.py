@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+"""Measure how long the leader-election recipe takes to fail over to another
+candidate, both when the leader resigns and when it dies (and its key has to
+expire). Runs against an in-process fake etcd, unless --host or --port is 
+given.
+"""
+
+import sys
+import os
+import time
+import threading
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from etcd.client import Client
+from etcd.fake_server import FakeEtcdServer
+
+
+def _run(args):
+    elected_event = threading.Event()
+
+    def on_elected(e):
+        elected_event.set()
+
+    elections = []
+    for i in range(args.candidates):
+        c = Client(host=args.host, port=args.port)
+        e = c.recipe.election.get_election(args.election_name,
+                                           'candidate%d' % (i,),
+                                           args.ttl,
+                                           on_elected=on_elected)
+
+        e.start()
+        elections.append(e)
+
+    def fail_over(resign):
+        elected_event.clear()
+
+        while 1:
+            leaders = [e for e in elections if e.is_leader is True]
+            if leaders:
+                break
+
+            time.sleep(.01)
+
+        leader = leaders[0]
+        elections.remove(leader)
+
+        start = time.time()
+        leader.stop(resign=resign)
+        elected_event.wait()
+
+        return time.time() - start
+
+    try:
+        for (label, resign) in (('resign', True), ('crash', False)):
+            durations_s = [fail_over(resign) for i in range(args.rounds)]
+
+            print("%s failover: mean (%.1f) ms, max (%.1f) ms" %
+                  (label,
+                   sum(durations_s) / len(durations_s) * 1000,
+                   max(durations_s) * 1000))
+    finally:
+        for e in elections:
+            e.stop()
+
+def _main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host',
+                        help="Use the etcd on this host (rather than a "
+                             "fake one).")
+    parser.add_argument('--port', type=int,
+                        help="Use the etcd on this port (rather than a "
+                             "fake one).")
+    parser.add_argument('--candidates', default=7, type=int)
+    parser.add_argument('--rounds', default=3, type=int,
+                        help="Number of failovers of each kind.")
+    parser.add_argument('--ttl', default=5, type=int)
+    parser.add_argument('--election-name', default='bench_election')
+
+    args = parser.parse_args()
+
+    # Every failover removes a candidate, and one has to be left to take 
+    # over from the last.
+    if args.candidates < args.rounds * 2 + 1:
+        parser.error("Need at least (rounds * 2 + 1) candidates.")
+
+    if args.host is None and args.port is None:
+        with FakeEtcdServer() as server:
+            args.host = server.host
+            args.port = server.port
+
+            _run(args)
+    else:
+        args.host = args.host or '127.0.0.1'
+        args.port = args.port or 4001
+
+        _run(args)
+
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+
+"""Measure how the client copes with failures in a cluster of fake members:
+the death of the member that it's using, connection resets, a burst of
+server errors, added latency, and waits that end with empty responses.
+
+For each, requests are made continuously, the fault is injected partway
+through, and the requests lost (those that raised), the failovers, and the
+time to recover (from the fault until the first success after the last lost
+request) are reported.
+"""
+
+import sys
+import os
+import time
+import json
+import threading
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from etcd.client import Client
+from etcd.fake_server import FakeEtcdServer, FakeStore
+from etcd.exceptions import EtcdWaitFaultException
+from etcd.metrics import LatencyHistogram
+from etcd.observer import RequestObserver
+
+
+class _FailoverCounter(RequestObserver):
+    def __init__(self):
+        self.failovers = 0
+
+    def request_finished(self, info):
+        self.failovers += info.failovers
+
+
+class _Cluster(object):
+    def __init__(self, size):
+        store = FakeStore()
+        self.servers = [FakeEtcdServer(store=store) for i in range(size)]
+
+    def __enter__(self):
+        for server in self.servers:
+            server.start()
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for server in self.servers:
+            if server.is_stopped() is False:
+                server.stop()
+
+    def get_server(self, prefix):
+        for server in self.servers:
+            if server.prefix == prefix:
+                return server
+
+        raise ValueError("No member has prefix: %s" % (prefix,))
+
+
+def _run_load(c, args, inject):
+    """Make requests for the duration, injecting the fault partway through.
+    """
+
+    counter = _FailoverCounter()
+    c.add_observer(counter)
+
+    key = '/bench_failover'
+    c.node.set(key, '0')
+
+    before = LatencyHistogram()
+    after = LatencyHistogram()
+    lost = {}
+    requests = 0
+
+    fault_at = None
+    recovered_at = None
+
+    started_at = time.time()
+    while 1:
+        now = time.time()
+        if now - started_at >= args.duration_s:
+            break
+
+        if fault_at is None and now - started_at >= args.fault_at_s:
+            inject(c)
+            fault_at = time.time()
+
+        requests += 1
+
+        try:
+            if requests % 2 == 0:
+                c.node.set(key, str(requests))
+            else:
+                c.node.get(key)
+        except Exception as e:
+            name = e.__class__.__name__
+            lost[name] = lost.get(name, 0) + 1
+
+            # Recovery is the first success after the last loss.
+            recovered_at = None
+            continue
+
+        finished_at = time.time()
+
+        if fault_at is None:
+            before.record(finished_at - now)
+        else:
+            after.record(finished_at - now)
+
+            if recovered_at is None:
+                recovered_at = finished_at
+
+    c.remove_observer(counter)
+
+    if recovered_at is None:
+        recover_s = None
+    else:
+        recover_s = recovered_at - fault_at
+
+    (before_p99_s,) = before.get_percentiles([99])
+    (after_p99_s,) = after.get_percentiles([99])
+
+    return { 'requests': requests,
+             'lost': sum(lost.values()),
+             'lost_by_error': lost,
+             'failovers': counter.failovers,
+             'recover_s': recover_s,
+             'p99_before_s': before_p99_s,
+             'p99_after_s': after_p99_s,
+             'max_after_s': after.max_s }
+
+def _scenario_death(cluster, c, args):
+    def inject(c):
+        cluster.get_server(c.prefix).stop()
+
+    return _run_load(c, args, inject)
+
+def _scenario_resets(cluster, c, args):
+    def inject(c):
+        cluster.get_server(c.prefix).faults.reset_rate = args.reset_rate
+
+    return _run_load(c, args, inject)
+
+def _scenario_errors(cluster, c, args):
+    def inject(c):
+        cluster.get_server(c.prefix).faults.add_error_burst(args.burst)
+
+    return _run_load(c, args, inject)
+
+def _scenario_latency(cluster, c, args):
+    def inject(c):
+        cluster.get_server(c.prefix).faults.latency_s = args.latency_s
+
+    return _run_load(c, args, inject)
+
+def _scenario_empty_waits(cluster, c, args):
+    """Deliver changes to a waiter that tracks the index (so it can't miss
+    any), while the member ends some of the waits with empty responses.
+    """
+
+    key = '/bench_failover_wait'
+    r = c.node.set(key, '0')
+
+    cluster.get_server(c.prefix).faults.empty_wait_rate = \
+        args.empty_wait_rate
+
+    count = args.changes
+    received = []
+    faults = [0]
+
+    def wait():
+        waiter = Client(host=args.host, port=cluster.servers[0].port)
+        wait_index = r.node.modified_index + 1
+
+        while len(received) < count:
+            try:
+                event = waiter.node.wait(key, wait_index=wait_index)
+            except EtcdWaitFaultException:
+                faults[0] += 1
+                continue
+
+            received.append((time.time(), int(event.node.value)))
+            wait_index = event.node.modified_index + 1
+
+    t = threading.Thread(target=wait)
+    t.start()
+
+    changed_at = []
+    for i in range(count):
+        changed_at.append(time.time())
+        c.node.set(key, str(i))
+        time.sleep(args.change_interval_s)
+
+    t.join()
+
+    histogram = LatencyHistogram()
+    for (received_at, i) in received:
+        histogram.record(received_at - changed_at[i])
+
+    (p50_s, p99_s) = histogram.get_percentiles([50, 99])
+
+    return { 'changes': count,
+             'received': len(received),
+             'empty_waits': faults[0],
+             'delivery_p50_s': p50_s,
+             'delivery_p99_s': p99_s }
+
+_SCENARIOS = [
+    ('death', _scenario_death),
+    ('resets', _scenario_resets),
+    ('errors', _scenario_errors),
+    ('latency', _scenario_latency),
+    ('empty_waits', _scenario_empty_waits),
+]
+
+def _main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--members', default=3, type=int)
+    parser.add_argument('--duration-s', default=3.0, type=float)
+    parser.add_argument('--fault-at-s', default=1.0, type=float)
+    parser.add_argument('--reset-rate', default=1.0, type=float)
+    parser.add_argument('--burst', default=20, type=int,
+                        help="Server errors in the burst.")
+    parser.add_argument('--latency-s', default=.01, type=float)
+    parser.add_argument('--empty-wait-rate', default=.5, type=float)
+    parser.add_argument('--changes', default=200, type=int,
+                        help="Changes to deliver to the waiter.")
+    parser.add_argument('--change-interval-s', default=.005, type=float)
+    parser.add_argument('--only',
+                        help="Comma-separated scenarios to run (%s)." %
+                             (', '.join(name for (name, f) in _SCENARIOS)))
+
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else None
+
+    results = {}
+    for (name, scenario) in _SCENARIOS:
+        if names is not None and name not in names:
+            continue
+
+        sys.stderr.write("Running: %s\n" % (name,))
+
+        with _Cluster(args.members) as cluster:
+            c = Client(host=args.host, port=cluster.servers[0].port)
+            results[name] = scenario(cluster, c, args)
+
+    print(json.dumps(results, indent=4, sort_keys=True))
+
+if __name__ == '__main__':
+    _main()
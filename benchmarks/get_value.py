@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+"""Compare reading a value with node.get() (which builds a response and a
+node object, and parses the expiration) against node.get_value() (which only
+decodes the JSON). The decoding is measured alone, on a canned response for a
+node with and without a TTL, and then end-to-end against an in-process fake
+etcd (or, with --host and --port, a running etcd).
+"""
+
+import sys
+import os
+import json
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import requests
+
+from etcd.client import Client
+from etcd.fake_server import FakeEtcdServer
+from etcd.response import ResponseV2
+
+
+def _get_canned_response(key, is_expiring):
+    node = { 'key': key, 'value': 'value', 'createdIndex': 5,
+             'modifiedIndex': 5 }
+
+    if is_expiring is True:
+        node['expiration'] = '2026-10-19T12:00:00.000000000+00:00'
+        node['ttl'] = 10
+
+    r = requests.models.Response()
+    r.status_code = 200
+    r.headers['Content-Type'] = 'application/json'
+    r.headers['X-Etcd-Index'] = '5'
+    r._content = json.dumps({ 'action': 'get', 'node': node }) \
+                    .encode('utf-8')
+    r.encoding = 'utf-8'
+
+    return r
+
+def _report(name, full_us, value_us):
+    print("%s: get (%.1f) us/call, get_value (%.1f) us/call, "
+          "saved (%.1f) us/call (%.0f%%)" %
+          (name, full_us, value_us, full_us - value_us,
+           (full_us - value_us) / full_us * 100))
+
+def _time_us(f, calls):
+    # Warm up, so that connections are open.
+    f()
+
+    return timeit.timeit(f, number=calls) / calls * 1000000
+
+def _measure_decode(args):
+    for is_expiring in (False, True):
+        r = _get_canned_response(args.key, is_expiring)
+
+        full_us = _time_us(
+                    lambda: ResponseV2(r, 'get', args.key).node.value,
+                    args.calls)
+
+        value_us = _time_us(
+                    lambda: r.json()['node']['value'],
+                    args.calls)
+
+        name = 'decode (ttl)' if is_expiring is True else 'decode'
+        _report(name, full_us, value_us)
+
+def _measure_get(c, args):
+    c.node.set(args.key, 'value', ttl=args.ttl)
+
+    full_us = _time_us(lambda: c.node.get(args.key).node.value, args.calls)
+    value_us = _time_us(lambda: c.node.get_value(args.key), args.calls)
+
+    _report('get', full_us, value_us)
+
+    c.node.delete(args.key)
+
+def _main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--calls', default=2000, type=int)
+    parser.add_argument('--key', default='/bench_get_value')
+    parser.add_argument('--ttl', type=int,
+                        help="Give the key a TTL for the end-to-end gets.")
+
+    args = parser.parse_args()
+
+    _measure_decode(args)
+
+    if args.host is not None or args.port is not None:
+        c = Client(host=args.host or '127.0.0.1', port=args.port or 4001)
+        _measure_get(c, args)
+
+        return
+
+    with FakeEtcdServer() as server:
+        c = Client(host=server.host, port=server.port)
+        _measure_get(c, args)
+
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+"""Measure how long "import etcd.client" takes in a fresh interpreter, once
+Requests has been imported (so, how much of it is this package's). Fails (with a
+non-zero exit) if this package's share is over the budget, or if something
+that should only be imported when it's used (pytz, the modules, the ops,
+metrics, tracing) was imported anyway.
+"""
+
+import sys
+import os
+import subprocess
+import argparse
+
+_ROOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# These should only be imported once they're used.
+_LAZY_MODULES = [
+    'pytz',
+    'etcd.node_ops',
+    'etcd.directory_ops',
+    'etcd.inorder_ops',
+    'etcd.modules.lock',
+    'etcd.modules.leader',
+    'etcd.recipes.lock',
+    'etcd.metrics',
+    'etcd.tracing',
+    'opentelemetry',
+]
+
+# Requests is imported first, in the same interpreter, so that the time for
+# the client is only this package's.
+_SCRIPT = """\
+import sys
+import time
+
+start = time.time()
+import requests
+requests_s = time.time() - start
+
+start = time.time()
+import etcd.client
+client_s = time.time() - start
+
+loaded = [name for name in %(lazy_modules)r if name in sys.modules]
+print('%%f %%f %%s' %% (requests_s, client_s, ','.join(loaded)))
+"""
+
+
+def _measure():
+    """Import Requests and then the client in a fresh interpreter, and return
+    the seconds that each took and the lazy modules that were imported along
+    with the client.
+    """
+
+    script = _SCRIPT % { 'lazy_modules': _LAZY_MODULES }
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = _ROOT_PATH + os.pathsep + env.get('PYTHONPATH', '')
+
+    output = subprocess.check_output([sys.executable, '-c', script], env=env)
+    parts = output.decode('utf-8').split()
+
+    requests_s = float(parts[0])
+    client_s = float(parts[1])
+    loaded = parts[2].split(',') if len(parts) > 2 else []
+
+    return (requests_s, client_s, loaded)
+
+def _main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', default=15, type=int)
+    parser.add_argument('--budget-ms', default=10.0, type=float,
+                        help="The most that importing the package may "
+                             "take, after Requests.")
+
+    args = parser.parse_args()
+
+    # Compile everything first, so that the runs don't.
+    _measure()
+
+    results = [_measure() for i in range(args.runs)]
+
+    # The least is the one least disturbed by anything else on the machine.
+    requests_s = min(requests_s for (requests_s, client_s, loaded) in results)
+    client_s = min(client_s for (requests_s, client_s, loaded) in results)
+    loaded = results[0][2]
+
+    own_ms = client_s * 1000
+
+    print("import requests:    (%.1f) ms" % (requests_s * 1000,))
+    print("This package:       (%.1f) ms (budget: %.1f ms)" %
+          (own_ms, args.budget_ms))
+
+    is_failed = False
+
+    if loaded:
+        print("Imported eagerly:   %s" % (', '.join(loaded),))
+        is_failed = True
+
+    if own_ms > args.budget_ms:
+        print("Over budget.")
+        is_failed = True
+
+    if is_failed is True:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+"""Compare adding in-order values one at a time with adding them concurrently
+using add_many(). Requires a running etcd.
+"""
+
+import sys
+import os
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from etcd.client import Client
+
+
+def _main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', default=4001, type=int)
+    parser.add_argument('--values', default=2000, type=int)
+    parser.add_argument('--concurrency', default=[1, 4, 8, 16], type=int,
+                        nargs='+')
+    parser.add_argument('--ttl', default=None, type=int)
+    parser.add_argument('--path', default='/bench_inorder_add_many')
+
+    args = parser.parse_args()
+
+    c = Client(host=args.host, port=args.port)
+    io = c.inorder.get_inorder(args.path)
+    values = [str(i) for i in range(args.values)]
+
+    def clean():
+        try:
+            c.directory.delete_recursive(args.path)
+        except KeyError:
+            pass
+
+    clean()
+
+    start = time.time()
+    for value in values:
+        io.add(value, ttl=args.ttl)
+
+    elapsed_s = time.time() - start
+    print("add(): (%.0f) values/s" % (args.values / elapsed_s,))
+
+    for max_concurrency in args.concurrency:
+        clean()
+
+        start = time.time()
+        r = io.add_many(values, ttl=args.ttl, max_concurrency=max_concurrency)
+        elapsed_s = time.time() - start
+
+        print("add_many(), concurrency (%d): (%.0f) values/s, (%d) failures" %
+              (max_concurrency, args.values / elapsed_s, len(r.failures)))
+
+    clean()
+
+if __name__ == '__main__':
+    _main()
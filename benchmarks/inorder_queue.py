@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+"""Measure the throughput of an in-order directory used as a work queue, for
+every combination of the given numbers of producers, consumers, and
+prefetch sizes. Runs against an in-process fake etcd, unless --host or
+--port is given.
+"""
+
+import sys
+import os
+import time
+import threading
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from etcd.client import Client
+from etcd.fake_server import FakeEtcdServer
+
+
+def _get_counts(phrase):
+    return [int(part) for part in phrase.split(',')]
+
+def _run(args, producer_count, consumer_count, prefetch):
+    c = Client(host=args.host, port=args.port)
+
+    try:
+        c.directory.delete_recursive(args.path)
+    except KeyError:
+        pass
+
+    # The entries are split among the producers.
+    entries = args.entries // producer_count
+    total = entries * producer_count
+    consumed = [0]
+    consumed_lock = threading.Lock()
+    done_event = threading.Event()
+    consumers = []
+
+    def produce():
+        io = Client(host=args.host, port=args.port).inorder.\
+                get_inorder(args.path)
+
+        for i in range(entries):
+            io.add(str(i))
+
+    def consume():
+        io = Client(host=args.host, port=args.port).inorder.\
+                get_inorder(args.path)
+
+        consumer = io.get_consumer(prefetch=prefetch)
+        consumers.append(consumer)
+
+        while done_event.is_set() is False:
+            if consumer.get(timeout=.5) is None:
+                continue
+
+            with consumed_lock:
+                consumed[0] += 1
+                if consumed[0] == total:
+                    done_event.set()
+
+    consumer_threads = [threading.Thread(target=consume)
+                        for i in range(consumer_count)]
+
+    for t in consumer_threads:
+        t.start()
+
+    producer_threads = [threading.Thread(target=produce)
+                        for i in range(producer_count)]
+
+    start = time.time()
+
+    for t in producer_threads:
+        t.start()
+
+    for t in producer_threads:
+        t.join()
+
+    produced_s = time.time() - start
+
+    for t in consumer_threads:
+        t.join()
+
+    consumed_s = time.time() - start
+
+    print("(%d) producers, (%d) consumers, prefetch (%d): produced (%.0f)/s, "
+          "consumed (%.0f)/s, (%d) claim conflicts" %
+          (producer_count, consumer_count, prefetch,
+           total / produced_s, total / consumed_s,
+           sum(consumer.conflict_count for consumer in consumers)))
+
+    c.directory.delete_recursive(args.path)
+
+def _run_all(args):
+    for producer_count in _get_counts(args.producers):
+        for consumer_count in _get_counts(args.consumers):
+            for prefetch in _get_counts(args.prefetch):
+                _run(args, producer_count, consumer_count, prefetch)
+
+def _main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host',
+                        help="Use the etcd on this host (rather than a "
+                             "fake one).")
+    parser.add_argument('--port', type=int,
+                        help="Use the etcd on this port (rather than a "
+                             "fake one).")
+    parser.add_argument('--producers', default='1,4',
+                        help="Comma-separated numbers of producers.")
+    parser.add_argument('--consumers', default='1,4,8',
+                        help="Comma-separated numbers of consumers.")
+    parser.add_argument('--prefetch', default='1,10,50',
+                        help="Comma-separated prefetch sizes.")
+    parser.add_argument('--entries', default=1000, type=int,
+                        help="Number of entries added in each run (split "
+                             "among the producers).")
+    parser.add_argument('--path', default='/bench_inorder_queue')
+
+    args = parser.parse_args()
+
+    if args.host is None and args.port is None:
+        with FakeEtcdServer() as server:
+            args.host = server.host
+            args.port = server.port
+
+            _run_all(args)
+    else:
+        args.host = args.host or '127.0.0.1'
+        args.port = args.port or 4001
+
+        _run_all(args)
+
+if __name__ == '__main__':
+    _main()
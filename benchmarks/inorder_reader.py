@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+"""Compare reading the head of a large in-order directory by building a full
+sorted listing with reading it through a windowed reader. Requires a running
+etcd.
+"""
+
+import sys
+import os
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from etcd.client import Client
+
+
+def _main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', default=4001, type=int)
+    parser.add_argument('--entries', default=10000, type=int)
+    parser.add_argument('--window-size', default=100, type=int)
+    parser.add_argument('--polls', default=50, type=int,
+                        help="Number of windows to read.")
+    parser.add_argument('--path', default='/bench_inorder_reader')
+
+    args = parser.parse_args()
+
+    c = Client(host=args.host, port=args.port)
+
+    try:
+        c.directory.delete_recursive(args.path)
+    except KeyError:
+        pass
+
+    io = c.inorder.get_inorder(args.path)
+    r = io.add_many(str(i) for i in range(args.entries))
+    if r.failures:
+        print("(%d) entries couldn't be added." % (len(r.failures),))
+
+    # Every poll lists the directory and builds every node, keeping the head.
+    start = time.time()
+    for i in range(args.polls):
+        list(io.list(sorted=True).node.children)[:args.window_size]
+
+    elapsed_s = time.time() - start
+    print("Full listing: (%.1f) ms/poll" % (elapsed_s / args.polls * 1000,))
+
+    # Every poll returns the next window.
+    reader = io.get_reader(window_size=args.window_size)
+
+    start = time.time()
+    for i in range(args.polls):
+        reader.next_window()
+
+    elapsed_s = time.time() - start
+    print("Windowed reader: (%.1f) ms/poll, (%d) listings" %
+          (elapsed_s / args.polls * 1000, reader.list_count))
+
+    c.directory.delete_recursive(args.path)
+
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+"""Measure the throughput and acquisition latency of the key-based lock
+recipe with many local contenders. Requires a running etcd.
+"""
+
+import sys
+import os
+import time
+import threading
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from etcd.client import Client
+
+
+def _main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', default=4001, type=int)
+    parser.add_argument('--contenders', default=32, type=int)
+    parser.add_argument('--acquisitions', default=20, type=int,
+                        help="Number of acquisitions per contender.")
+    parser.add_argument('--ttl', default=10, type=int)
+    parser.add_argument('--lock-name', default='bench_key_lock')
+
+    args = parser.parse_args()
+
+    latencies = []
+    latencies_lock = threading.Lock()
+    holders = [0]
+    violations = [0]
+
+    def contend():
+        c = Client(host=args.host, port=args.port)
+        l = c.recipe.lock.get_lock(args.lock_name, args.ttl)
+
+        for i in range(args.acquisitions):
+            start = time.time()
+            l.acquire()
+            latency_s = time.time() - start
+
+            holders[0] += 1
+            if holders[0] > 1:
+                violations[0] += 1
+
+            holders[0] -= 1
+            l.release()
+
+            with latencies_lock:
+                latencies.append(latency_s)
+
+    threads = [threading.Thread(target=contend)
+               for i in range(args.contenders)]
+
+    start = time.time()
+
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    elapsed_s = time.time() - start
+
+    latencies.sort()
+    count = len(latencies)
+
+    print("(%d) contenders: (%.0f) acquisitions/s, latency p50 (%.1f) ms, "
+          "p99 (%.1f) ms, max (%.1f) ms, (%d) exclusion violations" %
+          (args.contenders, count / elapsed_s,
+           latencies[count // 2] * 1000,
+           latencies[min(count - 1, int(count * .99))] * 1000,
+           latencies[-1] * 1000, violations[0]))
+
+if __name__ == '__main__':
+    _main()
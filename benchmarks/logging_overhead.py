@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+"""Measure what debug logging costs on the request path. First, in-process,
+compare formatting a request's debug message eagerly (as the client used to)
+with the guarded, lazy logging that it does now, with debug logging disabled.
+Then measure requests/s with debug logging disabled and with it enabled (but
+discarded), against a running etcd.
+"""
+
+import sys
+import os
+import time
+import logging
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from etcd.client import Client
+
+_logger = logging.getLogger('etcd.client')
+
+
+def _measure_formatting(iterations):
+    url = 'http://127.0.0.1:4001/v2/keys/some/key'
+    parameters = { 'recursive': 'true' }
+    data = { 'value': 'some value', 'ttl': 10 }
+
+    def eager():
+        message = ("Request(%s)=[%s] params=[%s] data_keys=[%s]" %
+                   ('get', url, parameters, data.keys()))
+        _logger.debug(message)
+
+    def lazy():
+        if _logger.isEnabledFor(logging.DEBUG) is True:
+            _logger.debug("Request(%s)=[%s] params=[%s] data_keys=[%s]",
+                          'get', url, parameters, list(data.keys()))
+
+    for (label, f) in (('eager', eager), ('guarded', lazy)):
+        elapsed_s = timeit.timeit(f, number=iterations)
+        print("Debug disabled, %s formatting: (%.2f) us/request" %
+              (label, elapsed_s / iterations * 1000000))
+
+def _measure_requests(args):
+    c = Client(host=args.host, port=args.port)
+    c.node.set(args.key, 'value')
+
+    # Enabled, but discarded, so that only the cost of building the records
+    # is measured.
+    logging.getLogger('etcd').addHandler(logging.NullHandler())
+
+    for level in (logging.WARNING, logging.DEBUG):
+        logging.getLogger('etcd').setLevel(level)
+
+        start = time.time()
+        for i in range(args.requests):
+            c.node.get(args.key)
+
+        elapsed_s = time.time() - start
+
+        print("Debug %s: (%.0f) requests/s" %
+              ('enabled' if level == logging.DEBUG else 'disabled',
+               args.requests / elapsed_s))
+
+    logging.getLogger('etcd').setLevel(logging.WARNING)
+    c.node.delete(args.key)
+
+def _main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', default=4001, type=int)
+    parser.add_argument('--iterations', default=200000, type=int)
+    parser.add_argument('--requests', default=2000, type=int)
+    parser.add_argument('--key', default='/bench_logging_overhead')
+    parser.add_argument('--formatting-only', action='store_true',
+                        help="Don't make any requests.")
+
+    args = parser.parse_args()
+
+    _measure_formatting(args.iterations)
+
+    if args.formatting_only is False:
+        _measure_requests(args)
+
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+"""Measure the per-request overhead of request observers, by timing the same 
+reads with no observers and with observers that do nothing. Requires a 
+running etcd.
+"""
+
+import sys
+import os
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from etcd.client import Client
+from etcd.observer import RequestObserver
+
+
+def _main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', default=4001, type=int)
+    parser.add_argument('--requests', default=2000, type=int)
+    parser.add_argument('--observers', default=[0, 1, 4], type=int, 
+                        nargs='+')
+    parser.add_argument('--key', default='/bench_observer_overhead')
+
+    args = parser.parse_args()
+
+    c = Client(host=args.host, port=args.port)
+    c.node.set(args.key, 'value')
+
+    for count in args.observers:
+        observers = [RequestObserver() for i in range(count)]
+        for observer in observers:
+            c.add_observer(observer)
+
+        start = time.time()
+        for i in range(args.requests):
+            c.node.get(args.key)
+
+        elapsed_s = time.time() - start
+
+        print("(%d) observers: (%.1f) us/request" % 
+              (count, elapsed_s / args.requests * 1000000))
+
+        for observer in observers:
+            c.remove_observer(observer)
+
+    c.node.delete(args.key)
+
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+"""Compare the per-call cost of the normal operations with that of prepared
+ones (which build their URL, parameters, and Requests settings only once),
+for repeated gets and sets of one key. By default, responses come from a
+canned transport in this process, so only the client's own cost is measured.
+Pass --fake-server to go through HTTP to an in-process fake etcd, or --host
+and --port to use a running etcd.
+"""
+
+import sys
+import os
+import json
+import argparse
+import timeit
+import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import requests
+import requests.adapters
+
+from etcd.client import Client
+from etcd.fake_server import FakeEtcdServer
+
+
+class _CannedAdapter(requests.adapters.BaseAdapter):
+    """Answers every request with the same response, without a network."""
+
+    def __init__(self, key):
+        super(_CannedAdapter, self).__init__()
+
+        node = { 'key': key, 'value': 'value', 'createdIndex': 5,
+                 'modifiedIndex': 5 }
+
+        self.__content = json.dumps({ 'action': 'get', 'node': node }) \
+                            .encode('utf-8')
+
+    def send(self, request, **kwargs):
+        r = requests.models.Response()
+        r.status_code = 200
+        r.headers['Content-Type'] = 'application/json'
+        r.headers['X-Etcd-Index'] = '5'
+        r._content = self.__content
+        r.encoding = 'utf-8'
+        r.url = request.url
+        r.request = request
+        r.elapsed = datetime.timedelta(0)
+
+        return r
+
+    def close(self):
+        pass
+
+
+def _measure(c, args):
+    prepared_get = c.node.prepare_get(args.key)
+    prepared_set = c.node.prepare_set(args.key, 'value')
+
+    # The set is first, so that there's something to get.
+    pairs = [
+        ('set', lambda: c.node.set(args.key, 'value'), prepared_set.send),
+        ('get', lambda: c.node.get(args.key), prepared_get.send),
+    ]
+
+    for (name, normal, prepared) in pairs:
+        # Warm up, so that connections are open.
+        normal()
+        prepared()
+
+        normal_us = timeit.timeit(normal, number=args.calls) / \
+                        args.calls * 1000000
+
+        prepared_us = timeit.timeit(prepared, number=args.calls) / \
+                        args.calls * 1000000
+
+        print("%s: normal (%.1f) us/call, prepared (%.1f) us/call, "
+              "saved (%.1f) us/call (%.0f%%)" %
+              (name, normal_us, prepared_us, normal_us - prepared_us,
+               (normal_us - prepared_us) / normal_us * 100))
+
+def _main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--fake-server', action='store_true',
+                        help="Use an in-process fake etcd over HTTP.")
+    parser.add_argument('--calls', default=2000, type=int)
+    parser.add_argument('--key', default='/bench_prepared')
+
+    args = parser.parse_args()
+
+    if args.host is not None or args.port is not None:
+        c = Client(host=args.host or '127.0.0.1', port=args.port or 4001)
+        _measure(c, args)
+        c.node.delete(args.key)
+
+        return
+
+    with FakeEtcdServer() as server:
+        c = Client(host=server.host, port=server.port)
+
+        if args.fake_server is False:
+            c.session.mount(server.prefix, _CannedAdapter(args.key))
+
+        _measure(c, args)
+
+if __name__ == '__main__':
+    _main()
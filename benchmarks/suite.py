@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+
+"""Measure the throughput and latency of the common client operations
+(get, set, compare-and-swap, list, and watch), the cost of parsing responses,
+and the memory taken by parsed nodes. By default, this runs against an
+in-process fake etcd (so results are reproducible, and measure the client
+rather than a cluster), or against a running etcd if a host or port are given.
+
+The results are printed (or written) as JSON. Given the results of an earlier
+run as a baseline, the relative changes are printed too.
+"""
+
+import sys
+import os
+import time
+import json
+import platform
+import threading
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from etcd.client import Client
+from etcd.fake_server import FakeEtcdServer
+from etcd.metrics import LatencyHistogram
+from etcd.response import ResponseV2
+
+_PERCENTILES = [50, 99]
+
+
+class _FakeResponse(object):
+    """Stands in for a Requests response, so parsing can be measured alone.
+    """
+
+    def __init__(self, raw, etcd_index):
+        self.text = json.dumps(raw)
+        self.headers = { 'X-Etcd-Index': str(etcd_index) }
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def _get_stats(histogram, elapsed_s):
+    (p50_s, p99_s) = histogram.get_percentiles(_PERCENTILES)
+
+    return { 'count': histogram.count,
+             'ops_per_s': histogram.count / elapsed_s,
+             'mean_s': histogram.mean_s,
+             'p50_s': p50_s,
+             'p99_s': p99_s }
+
+def _measure(f, count):
+    histogram = LatencyHistogram()
+    started_at = time.time()
+
+    for i in range(count):
+        start = time.time()
+        f(i)
+        histogram.record(time.time() - start)
+
+    return _get_stats(histogram, time.time() - started_at)
+
+def _bench_get(c, args):
+    key = args.key_prefix + '/get'
+    c.node.set(key, 'value')
+
+    return _measure(lambda i: c.node.get(key), args.requests)
+
+def _bench_set(c, args):
+    key = args.key_prefix + '/set'
+
+    return _measure(lambda i: c.node.set(key, str(i)), args.requests)
+
+def _bench_cas(c, args):
+    key = args.key_prefix + '/cas'
+    c.node.set(key, '0')
+
+    # Every swap succeeds, since each one expects the previous one's value.
+    return _measure(
+            lambda i: c.node.compare_and_swap(
+                        key, str(i + 1), current_value=str(i)),
+            args.requests)
+
+def _bench_list(c, args):
+    path = args.key_prefix + '/list'
+    for i in range(args.nodes):
+        c.node.set('%s/%06d' % (path, i), 'value')
+
+    return _measure(lambda i: c.directory.list(path),
+                    max(1, args.requests // 10))
+
+def _bench_watch(c, args):
+    """Measure the time from a change being made until a waiting client has
+    received it.
+    """
+
+    key = args.key_prefix + '/watch'
+    c.node.set(key, 'value')
+
+    watcher = Client(host=args.host, port=args.port)
+    histogram = LatencyHistogram()
+    count = max(1, args.requests // 10)
+
+    for i in range(count):
+        ready = threading.Event()
+        woken_at = []
+
+        def wait():
+            ready.set()
+            watcher.node.wait(key)
+            woken_at.append(time.time())
+
+        t = threading.Thread(target=wait)
+        t.start()
+
+        # Give the wait time to reach the server.
+        ready.wait()
+        time.sleep(.005)
+
+        changed_at = time.time()
+        c.node.set(key, str(i))
+        t.join()
+
+        histogram.record(woken_at[0] - changed_at)
+
+    stats = _get_stats(histogram, 1)
+    del stats['ops_per_s']
+
+    return stats
+
+def _get_listing(count):
+    nodes = [{ 'key': '/bench/%06d' % (i,),
+               'value': 'value%d' % (i,),
+               'createdIndex': i + 1,
+               'modifiedIndex': i + 1 }
+             for i
+             in range(count)]
+
+    return { 'action': 'get',
+             'node': { 'key': '/bench', 'dir': True, 'nodes': nodes,
+                       'createdIndex': 1, 'modifiedIndex': 1 } }
+
+def _parse(response):
+    r = ResponseV2(response, 'get', '/bench')
+    return (r, list(r.node.children))
+
+def _bench_parse(c, args):
+    """Measure decoding a listing response and building its nodes."""
+
+    response = _FakeResponse(_get_listing(args.nodes), args.nodes)
+
+    stats = _measure(lambda i: _parse(response),
+                     max(1, args.requests // 10))
+
+    stats['nodes'] = args.nodes
+    stats['per_node_s'] = stats['mean_s'] / args.nodes
+
+    return stats
+
+def _bench_memory(c, args):
+    """Measure the memory held by a parsed listing, per node."""
+
+    response = _FakeResponse(_get_listing(args.nodes), args.nodes)
+
+    tracemalloc.start()
+
+    try:
+        before = tracemalloc.take_snapshot()
+        parsed = _parse(response)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    total_bytes = sum(stat.size_diff
+                      for stat
+                      in after.compare_to(before, 'filename'))
+
+    return { 'nodes': args.nodes,
+             'bytes_per_node': total_bytes / float(args.nodes) }
+
+_BENCHMARKS = [
+    ('get', _bench_get),
+    ('set', _bench_set),
+    ('cas', _bench_cas),
+    ('list', _bench_list),
+    ('watch', _bench_watch),
+    ('parse', _bench_parse),
+    ('memory', _bench_memory),
+]
+
+def _print_comparison(results, baseline):
+    for (name, stats) in sorted(results.items()):
+        baseline_stats = baseline.get(name)
+        if baseline_stats is None:
+            continue
+
+        for (metric, value) in sorted(stats.items()):
+            baseline_value = baseline_stats.get(metric)
+            if metric in ('count', 'nodes') or not baseline_value or \
+               value is None:
+                continue
+
+            change = (value - baseline_value) / float(baseline_value) * 100
+            sys.stderr.write("%-8s %-14s %12.6g -> %12.6g (%+.1f%%)\n" %
+                             (name, metric, baseline_value, value, change))
+
+def _run(c, args, target):
+    names = args.only.split(',') if args.only else None
+
+    results = {}
+    for (name, benchmark) in _BENCHMARKS:
+        if names is not None and name not in names:
+            continue
+
+        sys.stderr.write("Running: %s\n" % (name,))
+        results[name] = benchmark(c, args)
+
+    try:
+        c.directory.delete_recursive(args.key_prefix)
+    except KeyError:
+        pass
+
+    return { 'meta': { 'target': target,
+                       'python': platform.python_version(),
+                       'platform': platform.platform(),
+                       'time': time.time(),
+                       'requests': args.requests,
+                       'nodes': args.nodes },
+             'results': results }
+
+def _main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host',
+                        help="Use the etcd on this host (rather than a "
+                             "fake one).")
+    parser.add_argument('--port', type=int,
+                        help="Use the etcd on this port (rather than a "
+                             "fake one).")
+    parser.add_argument('--requests', default=2000, type=int)
+    parser.add_argument('--nodes', default=1000, type=int,
+                        help="Nodes in the listings.")
+    parser.add_argument('--key-prefix', default='/bench_suite')
+    parser.add_argument('--only',
+                        help="Comma-separated benchmarks to run (%s)." %
+                             (', '.join(name for (name, f) in _BENCHMARKS)))
+    parser.add_argument('--output', help="Write the results to this file.")
+    parser.add_argument('--baseline',
+                        help="Compare with the results in this file.")
+
+    args = parser.parse_args()
+
+    if args.host is None and args.port is None:
+        with FakeEtcdServer() as server:
+            args.host = server.host
+            args.port = server.port
+
+            c = Client(host=args.host, port=args.port)
+            document = _run(c, args, 'fake')
+    else:
+        args.host = args.host or '127.0.0.1'
+        args.port = args.port or 4001
+
+        c = Client(host=args.host, port=args.port)
+        document = _run(c, args, '%s:%d' % (args.host, args.port))
+
+    encoded = json.dumps(document, indent=4, sort_keys=True)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            f.write(encoded + '\n')
+    else:
+        print(encoded)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        _print_comparison(document['results'], baseline['results'])
+
+if __name__ == '__main__':
+    _main()
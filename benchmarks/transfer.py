@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+
+"""Measure the throughput of exporting and importing a large subtree. Requires
+a running etcd.
+"""
+
+import sys
+import os
+import io
+import time
+import tempfile
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from etcd.client import Client
+
+
+def _main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', default=4001, type=int)
+    parser.add_argument('--keys', default=100000, type=int)
+    parser.add_argument('--fanout', default=100, type=int,
+                        help="Number of keys per directory.")
+    parser.add_argument('--concurrency', default=16, type=int)
+    parser.add_argument('--path', default='/bench_transfer')
+
+    args = parser.parse_args()
+
+    c = Client(host=args.host, port=args.port)
+
+    # Build the source tree by loading a generated dump.
+    source = io.StringIO()
+    source.write(u'{"format":"pec-dump","version":1,"root":"/"}\n')
+    for i in range(args.keys):
+        source.write(u'{"k":"/%d/%d","v":"value%d"}\n' %
+                     (i // args.fanout, i, i))
+
+    source.seek(0)
+
+    start = time.time()
+    r = c.transfer.load(source, path=args.path + '/source',
+                        max_concurrency=args.concurrency)
+    elapsed_s = time.time() - start
+
+    print("Load (generated): (%d) keys in (%.2f) seconds, (%.0f) keys/s, "
+          "(%d) failures" %
+          (r.loaded, elapsed_s, r.loaded / elapsed_s, len(r.failures)))
+
+    (handle, filepath) = tempfile.mkstemp()
+    os.close(handle)
+
+    try:
+        with open(filepath, 'w') as f:
+            start = time.time()
+            count = c.transfer.dump(args.path + '/source', f,
+                                    max_concurrency=args.concurrency)
+            elapsed_s = time.time() - start
+
+        print("Dump: (%d) nodes in (%.2f) seconds, (%.0f) nodes/s, (%d) "
+              "bytes" %
+              (count, elapsed_s, count / elapsed_s,
+               os.path.getsize(filepath)))
+
+        with open(filepath) as f:
+            start = time.time()
+            r = c.transfer.load(f, path=args.path + '/copy',
+                                max_concurrency=args.concurrency,
+                                checkpoint_filepath=filepath + '.checkpoint')
+            elapsed_s = time.time() - start
+
+        print("Load: (%d) nodes in (%.2f) seconds, (%.0f) nodes/s, (%d) "
+              "failures" %
+              (r.loaded, elapsed_s, r.loaded / elapsed_s, len(r.failures)))
+    finally:
+        os.remove(filepath)
+
+        if os.path.exists(filepath + '.checkpoint') is True:
+            os.remove(filepath + '.checkpoint')
+
+        c.directory.delete_recursive(args.path)
+
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,41 @@
+import random
+import time
+
+
+def get_delay_s(attempt, base_s, max_s):
+    """Return an exponential backoff delay with "full jitter": a random
+    duration between zero and the exponential ceiling. Spreading retries out
+    this way keeps contending clients from retrying in lock-step.
+
+    :param attempt: Number of attempts that have already failed (from 0)
+    :type attempt: int
+
+    :param base_s: Ceiling for the first retry
+    :type base_s: float
+
+    :param max_s: Largest ceiling
+    :type max_s: float
+
+    :returns: Seconds to wait
+    :rtype: float
+    """
+
+    return random.uniform(0, min(max_s, base_s * (2 ** attempt)))
+
+
+def sleep(attempt, base_s, max_s):
+    """Sleep for a backoff delay.
+
+    :param attempt: Number of attempts that have already failed (from 0)
+    :type attempt: int
+
+    :param base_s: Ceiling for the first retry
+    :type base_s: float
+
+    :param max_s: Largest ceiling
+    :type max_s: float
+    """
+
+    delay_s = get_delay_s(attempt, base_s, max_s)
+    if delay_s > 0:
+        time.sleep(delay_s)
@@ -1,6 +1,7 @@
 import requests
 import ssl
 import logging
+import time
 
 from os import environ
 from requests.exceptions import ConnectionError
@@ -9,14 +10,11 @@ from requests.packages.urllib3.poolmanager import PoolManager
 from datetime import datetime
 
 from etcd.config import HOST_FAIL_WAIT_S
-from etcd.directory_ops import DirectoryOps
-from etcd.node_ops import NodeOps
-from etcd.server_ops import ServerOps
-from etcd.stat_ops import StatOps
-from etcd.inorder_ops import InOrderOps
-from etcd.modules.lock import LockMod
-from etcd.modules.leader import LeaderMod
 from etcd.response import ResponseV2
+from etcd.observer import RequestInfo, notify
+
+# The ops, modules, recipes, metrics, and tracing are imported when they're 
+# first used, so that importing the client (for a short-lived tool) is quick.
 
 logging.getLogger('requests.packages.urllib3').setLevel(logging.WARN)
 
@@ -36,6 +34,10 @@ _SSL_CLIENT_KEY_FILEPATH = environ.get(
                             '') or None
 
 
+# Newer Pythons (and OpenSSLs) no longer provide SSLv3, so let them negotiate.
+_SSL_VERSION = getattr(ssl, 'PROTOCOL_SSLv3', None) or ssl.PROTOCOL_SSLv23
+
+
 class _Ssl3HttpAdapter(HTTPAdapter):
     """"Transport adapter" that allows us to use SSLv3."""
 
@@ -43,7 +45,7 @@ class _Ssl3HttpAdapter(HTTPAdapter):
         self.poolmanager = PoolManager(num_pools=connections,
                                        maxsize=maxsize,
                                        block=block,
-                                       ssl_version=ssl.PROTOCOL_SSLv3)
+                                       ssl_version=_SSL_VERSION)
 
 
 class _Modules(object):
@@ -66,6 +68,8 @@ class _Modules(object):
         try:
             return self.__lock
         except AttributeError:
+            from etcd.modules.lock import LockMod
+
             self.__lock = LockMod(self.__client)
             return self.__lock
 
@@ -80,10 +84,72 @@ class _Modules(object):
         try:
             return self.__leader
         except AttributeError:
+            from etcd.modules.leader import LeaderMod
+
             self.__leader = LeaderMod(self.__client)
             return self.__leader
 
 
+class _Recipes(object):
+    """Intermediate container that holds the coordination recipes that are 
+    built on the keys API.
+
+    :param client: Client instance
+    :type client: :class:`etcd.client.Client`
+    """
+
+    def __init__(self, client):
+        self.__client = client
+
+    @property
+    def lock(self):
+        """Return an instance of the class having the key-based lock 
+        functionality.
+
+        :rtype: :class:`etcd.recipes.lock.LockRecipe`
+        """
+
+        try:
+            return self.__lock
+        except AttributeError:
+            from etcd.recipes.lock import LockRecipe
+
+            self.__lock = LockRecipe(self.__client)
+            return self.__lock
+
+    @property
+    def semaphore(self):
+        """Return an instance of the class having the counting-semaphore 
+        functionality.
+
+        :rtype: :class:`etcd.recipes.semaphore.SemaphoreRecipe`
+        """
+
+        try:
+            return self.__semaphore
+        except AttributeError:
+            from etcd.recipes.semaphore import SemaphoreRecipe
+
+            self.__semaphore = SemaphoreRecipe(self.__client)
+            return self.__semaphore
+
+    @property
+    def election(self):
+        """Return an instance of the class having the leader-election 
+        functionality.
+
+        :rtype: :class:`etcd.recipes.election.ElectionRecipe`
+        """
+
+        try:
+            return self.__election
+        except AttributeError:
+            from etcd.recipes.election import ElectionRecipe
+
+            self.__election = ElectionRecipe(self.__client)
+            return self.__election
+
+
 class Client(object):
     """The main channel of functionality for the client. Connects to the 
     server, and provides functions via properties.
@@ -118,6 +184,13 @@ class Client(object):
                  ssl_client_cert_filepath=_SSL_CLIENT_CRT_FILEPATH, 
                  ssl_client_key_filepath=_SSL_CLIENT_KEY_FILEPATH):
 
+        # Replaced (rather than modified) when changed, so that a request can 
+        # use it without locking.
+        self.__observers = []
+        self.__metrics = None
+        self.__tracer = None
+        self.__tracing_observer = None
+
         if ssl_do_verify is not None:
             _logger.debug("SSL: Explicit verify setting given: [%s]", ssl_do_verify)
             self.__ssl_verify = ssl_do_verify
@@ -199,7 +272,8 @@ class Client(object):
         return ('<ETCD %s>' % (self.__prefix))
 
     def send(self, version, verb, path, value=None, parameters=None, data=None, 
-             module=None, return_raw=False, allow_reconnect=True):
+             module=None, return_raw=False, allow_reconnect=True, 
+             timeout=None):
         """Build and execute a request.
 
         :param version: Version of API
@@ -233,6 +307,11 @@ class Client(object):
                                 the current host fails connection.
         :type allow_reconnect: bool
 
+        :param timeout: Seconds to wait for the server to respond, after which 
+                        a requests.exceptions.Timeout is raised, or None to 
+                        wait indefinitely.
+        :type timeout: float or None
+
         :returns: Response object
         :rtype: :class:`etcd.response.ResponseV2`
         """
@@ -243,16 +322,7 @@ class Client(object):
         if data is None:
             data = {}
 
-        if version != 2:
-            raise ValueError("We were told to send a version (%d) request, "
-                             "which is not supported." % (version))
-        else:
-            response_cls = ResponseV2
-
-        if module is None:
-            url = ('%s/v%d%s' % (self.__prefix, version, path))
-        else:
-            url = ('%s/mod/v%d/%s%s' % (self.__prefix, version, module, path))
+        url_suffix = self.__get_url_suffix(version, path, module)
 
         if value is not None:
             data['value'] = value
@@ -262,58 +332,300 @@ class Client(object):
                  'verify': self.__ssl_verify, 
                  'cert': self.__ssl_cert }
 
-        _logger.debug("Request(%s)=[%s] params=[%s] data_keys=[%s]",
-                      verb, url, parameters, args['data'].keys())
+        if timeout is not None:
+            args['timeout'] = timeout
+
+        # This is on every request, so don't even build the arguments unless 
+        # they'll be logged.
+        if _logger.isEnabledFor(logging.DEBUG) is True:
+            _logger.debug("Request(%s)=[%s%s] params=[%s] data_keys=[%s]",
+                          verb, self.__prefix, url_suffix, parameters, 
+                          list(data.keys()))
 
         send = getattr(self.__session, verb)
-    
-        while 1:
-            try:
-                r = send(url, **args)
-            except ConnectionError as e:
-                _logger.debug("Connection error with [%s] [%s]: %s",
-                              self.__prefix, e.__class__.__name__, str(e))
-
-                if allow_reconnect is False:
+
+        def attempt(prefix):
+            return send(prefix + url_suffix, **args)
+
+        return self.__execute(verb, path, module, attempt, return_raw, 
+                              allow_reconnect)
+
+    def prepare(self, version, verb, path, value=None, parameters=None, 
+                data=None, module=None, return_raw=False, 
+                allow_reconnect=True, timeout=None):
+        """Build a request once, so that it can be sent many times more 
+        cheaply than with *send()*. Takes the same arguments.
+
+        :returns: Prepared request
+        :rtype: :class:`etcd.prepared.PreparedRequest`
+        """
+
+        from etcd.prepared import PreparedRequest
+
+        data = dict(data) if data is not None else {}
+        if value is not None:
+            data['value'] = value
+
+        url_suffix = self.__get_url_suffix(version, path, module)
+
+        return PreparedRequest(self, verb, path, url_suffix, 
+                               parameters=parameters, data=data, 
+                               module=module, return_raw=return_raw, 
+                               allow_reconnect=allow_reconnect, 
+                               timeout=timeout, verify=self.__ssl_verify, 
+                               cert=self.__ssl_cert)
+
+    def send_prepared(self, prepared):
+        """Send a request that was built by *prepare()*, failing over to other 
+        members like *send()* does.
+
+        :param prepared: Prepared request
+        :type prepared: :class:`etcd.prepared.PreparedRequest`
+
+        :returns: Response object
+        :rtype: :class:`etcd.response.ResponseV2`
+        """
+
+        if _logger.isEnabledFor(logging.DEBUG) is True:
+            _logger.debug("Prepared request(%s)=[%s%s]", prepared.verb, 
+                          self.__prefix, prepared.url_suffix)
+
+        return self.__execute(prepared.verb, prepared.path, prepared.module, 
+                              prepared.send_to, prepared.return_raw, 
+                              prepared.allow_reconnect)
+
+    def __get_url_suffix(self, version, path, module):
+        """Return the URL after the member's prefix. The prefix is added for 
+        every attempt, since a failure moves us to another member.
+        """
+
+        if version != 2:
+            raise ValueError("We were told to send a version (%d) request, "
+                             "which is not supported." % (version))
+
+        if module is None:
+            return ('/v%d%s' % (version, path))
+        else:
+            return ('/mod/v%d/%s%s' % (version, module, path))
+
+    def __execute(self, verb, path, module, attempt, return_raw, 
+                  allow_reconnect):
+        """Make attempts with the current member, and then others, until one 
+        gets a response.
+
+        :param attempt: Callable that takes a member's prefix, makes the 
+                        request with it, and returns the Requests response.
+        :type attempt: callable
+        """
+
+        observers = self.__observers
+        if observers:
+            info = RequestInfo(verb, path, module)
+            notify(observers, 'request_started', info)
+        else:
+            info = None
+
+        try:
+            while 1:
+                if info is not None:
+                    info.member = self.__prefix
+                    info.attempts += 1
+                    notify(observers, 'attempt_started', info)
+
+                try:
+                    r = attempt(self.__prefix)
+                except ConnectionError as e:
+                    _logger.debug("Connection error with [%s] [%s]: %s",
+                                  self.__prefix, e.__class__.__name__, e)
+
+                    if info is not None:
+                        notify(observers, 'attempt_finished', info, e)
+
+                    if allow_reconnect is False:
+                        raise
+                except Exception as e:
+                    # Like a read timeout, which doesn't fail over.
+                    if info is not None:
+                        notify(observers, 'attempt_finished', info, e)
+
                     raise
-            else:
-                break
+                else:
+                    if info is not None:
+                        info.status_code = r.status_code
+
+                        etcd_index = r.headers.get('X-Etcd-Index')
+                        if etcd_index is not None:
+                            info.etcd_index = int(etcd_index)
 
-            # If we get here, there was a connection problem. Rotate the server 
-            # that we're using, excluding any that have recently failed.
+                        info.first_byte_s = r.elapsed.total_seconds()
+                        info.response_bytes = len(r.content)
 
-            now_dt = datetime.now()
-            self.__machines[self.__machine_index][1] = now_dt
+                        body = r.request.body
+                        info.request_bytes = len(body) \
+                                                if body is not None \
+                                                else 0
 
-            len_ = len(self.__machines)
-            i = 0
-            elected = None
-            while i < len_:
-                machine_index = (self.__machine_index + 1) % len_
-                (prefix, last_fail_dt) = self.__machines[machine_index]
+                        notify(observers, 'attempt_finished', info, None)
 
-                if last_fail_dt is None or \
-                   (now_dt - last_fail_dt).total_seconds() > \
-                        HOST_FAIL_WAIT_S:
-                    elected = prefix
+                    break
 
-                i += 1
+                # If we get here, there was a connection problem. Rotate the 
+                # server that we're using, excluding any that have recently 
+                # failed.
 
-            if elected is None:
-                raise SystemError("All servers have failed: %s" % 
-                                  (self.__machines,))
+                now_dt = datetime.now()
+                self.__machines[self.__machine_index][1] = now_dt
 
-            self.__prefix = elected
-            self.__machine_index = machine_index
+                len_ = len(self.__machines)
+                i = 1
+                elected = None
+                while i <= len_:
+                    machine_index = (self.__machine_index + i) % len_
+                    (prefix, last_fail_dt) = self.__machines[machine_index]
 
-            _logger.debug("Retrying with next machine: %s", self.__prefix)
+                    if last_fail_dt is None or \
+                       (now_dt - last_fail_dt).total_seconds() > \
+                            HOST_FAIL_WAIT_S:
+                        elected = prefix
+                        break
 
-        r.raise_for_status()
+                    i += 1
 
-        if return_raw is True:
-            return r
+                if elected is None:
+                    raise SystemError("All servers have failed: %s" % 
+                                      (self.__machines,))
 
-        return response_cls(r, verb, path)
+                self.__prefix = elected
+                self.__machine_index = machine_index
+
+                if info is not None:
+                    info.failovers += 1
+
+                _logger.debug("Retrying with next machine: %s", self.__prefix)
+
+            r.raise_for_status()
+
+            if return_raw is True:
+                return r
+
+            if info is None:
+                return ResponseV2(r, verb, path)
+
+            decode_start = time.time()
+            response = ResponseV2(r, verb, path)
+            info.decode_s = time.time() - decode_start
+
+            return response
+        except Exception as e:
+            if info is not None:
+                info.error = e
+
+            raise
+        finally:
+            if info is not None:
+                info.elapsed_s = time.time() - info.started_at
+                notify(observers, 'request_finished', info)
+
+    def add_observer(self, observer):
+        """Register an observer to be notified around every request.
+
+        :param observer: Observer
+        :type observer: :class:`etcd.observer.RequestObserver`
+        """
+
+        self.__observers = self.__observers + [observer]
+
+    def remove_observer(self, observer):
+        """Unregister an observer.
+
+        :param observer: Observer
+        :type observer: :class:`etcd.observer.RequestObserver`
+
+        :raises: ValueError
+        """
+
+        observers = list(self.__observers)
+        observers.remove(observer)
+
+        self.__observers = observers
+
+    def enable_metrics(self):
+        """Start keeping latency histograms and counts for every operation.
+
+        :returns: Metrics
+        :rtype: :class:`etcd.metrics.OperationMetrics`
+        """
+
+        if self.__metrics is None:
+            from etcd.metrics import OperationMetrics
+
+            self.__metrics = OperationMetrics()
+
+        return self.__metrics
+
+    def disable_metrics(self):
+        """Stop keeping metrics, and discard them."""
+
+        self.__metrics = None
+
+    @property
+    def metrics(self):
+        """Return the operation metrics, or None if they're not enabled.
+
+        :rtype: :class:`etcd.metrics.OperationMetrics` or None
+        """
+
+        return self.__metrics
+
+    def enable_tracing(self, tracer=None):
+        """Create a span for every operation, and a child span for every 
+        HTTP attempt that it makes. If no tracer is given, OpenTelemetry's 
+        global tracer-provider is used, and, if OpenTelemetry isn't 
+        installed, tracing is left disabled (even if it had been enabled 
+        with another tracer).
+
+        :param tracer: OpenTelemetry (or compatible) tracer
+        :type tracer: opentelemetry.trace.Tracer or None
+
+        :returns: Whether tracing was enabled
+        :rtype: bool
+        """
+
+        from etcd.tracing import TracingObserver, get_default_tracer
+
+        self.disable_tracing()
+
+        if tracer is None:
+            tracer = get_default_tracer()
+            if tracer is None:
+                _logger.warning("Tracing wasn't enabled because OpenTelemetry "
+                                "isn't installed.")
+
+                return False
+
+        self.__tracing_observer = TracingObserver(tracer)
+        self.add_observer(self.__tracing_observer)
+        self.__tracer = tracer
+
+        return True
+
+    def disable_tracing(self):
+        """Stop creating spans."""
+
+        if self.__tracing_observer is not None:
+            self.remove_observer(self.__tracing_observer)
+            self.__tracing_observer = None
+
+        self.__tracer = None
+
+    @property
+    def tracer(self):
+        """Return the tracer, or None if tracing isn't enabled.
+
+        :rtype: opentelemetry.trace.Tracer or None
+        """
+
+        return self.__tracer
 
     @property
     def session(self):
@@ -338,6 +650,8 @@ class Client(object):
         try:
             return self.__directory
         except AttributeError:
+            from etcd.directory_ops import DirectoryOps
+
             self.__directory = DirectoryOps(self)
             return self.__directory
 
@@ -352,6 +666,8 @@ class Client(object):
         try:
             return self.__node
         except AttributeError:
+            from etcd.node_ops import NodeOps
+
             self.__node = NodeOps(self)
             return self.__node
 
@@ -365,6 +681,8 @@ class Client(object):
         try:
             return self.__server
         except AttributeError:
+            from etcd.server_ops import ServerOps
+
             self.__server = ServerOps(self)
             return self.__server
 
@@ -378,6 +696,8 @@ class Client(object):
         try:
             return self.__stat
         except AttributeError:
+            from etcd.stat_ops import StatOps
+
             self.__stat = StatOps(self)
             return self.__stat
 
@@ -392,9 +712,27 @@ class Client(object):
         try:
             return self.__inorder
         except AttributeError:
+            from etcd.inorder_ops import InOrderOps
+
             self.__inorder = InOrderOps(self)
             return self.__inorder
 
+    @property
+    def transfer(self):
+        """Return an instance of the class having the export/import 
+        functionality.
+
+        :rtype: :class:`etcd.transfer.TransferOps`
+        """
+
+        try:
+            return self.__transfer
+        except AttributeError:
+            from etcd.transfer import TransferOps
+
+            self.__transfer = TransferOps(self)
+            return self.__transfer
+
     @property
     def module(self):
         """Return an instance of the class that hosts the functionality 
@@ -408,3 +746,17 @@ class Client(object):
         except AttributeError:
             self.__module = _Modules(self)
             return self.__module
+
+    @property
+    def recipe(self):
+        """Return an instance of the class that hosts the coordination recipes 
+        that are built on the keys API.
+
+        :rtype: :class:`etcd.client._Recipes`
+        """
+
+        try:
+            return self.__recipe
+        except AttributeError:
+            self.__recipe = _Recipes(self)
+            return self.__recipe
@@ -1,8 +1,18 @@
+import logging
+
 from requests.exceptions import HTTPError, ChunkedEncodingError
 from requests.status_codes import codes
 
 from etcd.exceptions import EtcdPreconditionException, EtcdEmptyResponseError,\
-                            EtcdWaitFaultException, translate_exceptions
+                            EtcdWaitFaultException, \
+                            EtcdEventIndexClearedException, translate_exceptions
+from etcd.metrics import measure_operation
+
+_logger = logging.getLogger(__name__)
+
+# The error-code that etcd returns when the requested wait-index has already 
+# been dropped from its history.
+_ERROR_CODE_EVENT_INDEX_CLEARED = 401
 
 
 class CommonOps(object):
@@ -35,7 +45,7 @@ class CommonOps(object):
         else:
             url = ('%s%s' % (self.client.prefix, path))
 
-        self.client.debug("TEXT URL (%s) = [%s]" % (reason, url))
+        _logger.debug("TEXT URL (%s) = [%s]", reason, url)
 
         r = self.client.session.get(url)
         r.raise_for_status()
@@ -120,8 +130,10 @@ class CommonOps(object):
 
             raise
 
+    @measure_operation('wait')
     @translate_exceptions
-    def wait(self, path, recursive=False, force_consistent=False):
+    def wait(self, path, recursive=False, force_consistent=False, 
+             wait_index=None, timeout=None):
         """Long-poll on the given path until it changes.
 
         :param path: Node key
@@ -131,10 +143,21 @@ class CommonOps(object):
                           its descendants.
         :type recursive: bool
 
+        :param wait_index: Return the first change at or after this index, 
+                           even if it has already happened, rather than the 
+                           next one.
+        :type wait_index: int or None
+
+        :param timeout: Seconds to wait, after which a 
+                        requests.exceptions.Timeout is raised, or None to wait 
+                        indefinitely.
+        :type timeout: float or None
+
         :returns: Response object
         :rtype: :class:`etcd.response.ResponseV2` or None
 
-        :raises: KeyError
+        :raises: KeyError, 
+                 :class:`etcd.exceptions.EtcdEventIndexClearedException`
         """
 
         fq_path = self.get_fq_node_path(path)
@@ -147,8 +170,23 @@ class CommonOps(object):
         if force_consistent is True:
             parameters['consistent'] = 'true'
 
+        if wait_index is not None:
+            parameters['waitIndex'] = wait_index
+
         try:
-            return self.client.send(2, 'get', fq_path, parameters=parameters)
+            return self.client.send(2, 'get', fq_path, parameters=parameters, 
+                                    timeout=timeout)
+        except HTTPError as e:
+            if e.response.status_code == codes.bad_request:
+                try:
+                    j = e.response.json()
+                except ValueError:
+                    pass
+                else:
+                    if j.get('errorCode') == _ERROR_CODE_EVENT_INDEX_CLEARED:
+                        raise EtcdEventIndexClearedException(j.get('message'))
+
+            raise
         except ChunkedEncodingError:
 # TODO(dustin): We need to document why we would get this. We don't remember 
 #               the context.
@@ -3,3 +3,26 @@ try:
     from urllib import urlencode
 except ImportError:
     from urllib.parse import parse_qsl, urlencode
+
+try:
+    from Queue import Queue, Empty, Full
+except ImportError:
+    from queue import Queue, Empty, Full
+
+try:
+    string_types = (basestring,)
+except NameError:
+    string_types = (str,)
+
+try:
+    from urlparse import urlsplit
+    from urllib import unquote
+except ImportError:
+    from urllib.parse import urlsplit, unquote
+
+try:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
@@ -4,3 +4,54 @@ HOST_FAIL_WAIT_S = 5
 "Number of seconds that must elapse before we're allowed to retry a host."
 
 ATOMIC_MAX_ATTEMPTS = int(os.environ.get('ETCD_ATOMIC_MAX_ATTEMPTS', '5'))
+
+ATOMIC_BACKOFF_BASE_S = \
+    float(os.environ.get('ETCD_ATOMIC_BACKOFF_BASE_S', '.01'))
+"Ceiling of the first (randomized) delay after a failed atomic write."
+
+ATOMIC_BACKOFF_MAX_S = float(os.environ.get('ETCD_ATOMIC_BACKOFF_MAX_S', '1'))
+"Largest ceiling of the delay after a failed atomic write."
+
+ATOMIC_CACHE_SIZE = int(os.environ.get('ETCD_ATOMIC_CACHE_SIZE', '1024'))
+"Number of keys whose last atomic update a client remembers (use_cache)."
+
+WALK_MAX_CONCURRENCY = int(os.environ.get('ETCD_WALK_MAX_CONCURRENCY', '4'))
+"Default number of directory listings that a walk will have in-flight."
+
+BULK_MAX_CONCURRENCY = int(os.environ.get('ETCD_BULK_MAX_CONCURRENCY', '8'))
+"Default number of concurrent writes issued by the bulk operations."
+
+BULK_BATCH_SIZE = int(os.environ.get('ETCD_BULK_BATCH_SIZE', '100'))
+"Default number of keys processed between progress reports."
+
+WRITE_BEHIND_FLUSH_INTERVAL_S = \
+    float(os.environ.get('ETCD_WRITE_BEHIND_FLUSH_INTERVAL_S', '1'))
+"Default number of seconds between write-behind flushes."
+
+TTL_REFRESH_FRACTION = \
+    float(os.environ.get('ETCD_TTL_REFRESH_FRACTION', '.5'))
+"Default fraction of a key's TTL that elapses between refreshes."
+
+TTL_REFRESH_JITTER = float(os.environ.get('ETCD_TTL_REFRESH_JITTER', '.1'))
+"Default fraction of the refresh interval to randomize by."
+
+LOCK_RENEW_FRACTION = float(os.environ.get('ETCD_LOCK_RENEW_FRACTION', '.33'))
+"Default fraction of a lock's TTL that elapses between automatic renewals."
+
+LOCK_NONBLOCKING_TIMEOUT_S = \
+    float(os.environ.get('ETCD_LOCK_NONBLOCKING_TIMEOUT_S', '.5'))
+"""Seconds that a non-blocking acquire waits. The lock module can't report 
+contention without queuing for the lock, so this can't be zero."""
+
+INORDER_CONSUMER_PREFETCH = \
+    int(os.environ.get('ETCD_INORDER_CONSUMER_PREFETCH', '10'))
+"Default number of queue entries that a consumer keeps as claim candidates."
+
+INORDER_CONSUMER_MAX_SPREAD = \
+    int(os.environ.get('ETCD_INORDER_CONSUMER_MAX_SPREAD', '16'))
+"""Default largest number of windows of the oldest queue entries that a 
+contended consumer chooses its candidates from."""
+
+INORDER_READER_WINDOW_SIZE = \
+    int(os.environ.get('ETCD_INORDER_READER_WINDOW_SIZE', '100'))
+"Default number of entries that a windowed in-order reader returns at once."
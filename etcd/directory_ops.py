@@ -1,8 +1,40 @@
+import threading
+
+from collections import namedtuple
+
 from requests.exceptions import HTTPError
 from requests.status_codes import codes
 
+import etcd.config
+
+from etcd.compat import Queue, Full
 from etcd.exceptions import EtcdAlreadyExistsException, translate_exceptions
 from etcd.common_ops import CommonOps
+from etcd.metrics import measure_operation
+from etcd.parallel import imap_unordered, RateLimiter
+
+_QUEUE_POLL_INTERVAL_S = .25
+
+# The error-code that etcd returns when deleting a non-empty directory.
+_ERROR_CODE_DIR_NOT_EMPTY = 108
+
+BulkDeleteResult = namedtuple('BulkDeleteResult', 
+                              ['deleted', 'removed_directories', 'failures'])
+
+SyncResult = namedtuple('SyncResult', 
+                        ['added', 'changed', 'deleted', 'unchanged', 
+                         'failures'])
+
+
+def _get_values(node):
+    """Yield every value node under a recursively-listed directory node."""
+
+    for child in node.children:
+        if child.is_directory is True:
+            for descendant in _get_values(child):
+                yield descendant
+        else:
+            yield child
 
 # TODO(dustin): We may need a directory-specific version of 
 #               translate_exceptions. We'll see.
@@ -11,6 +43,7 @@ from etcd.common_ops import CommonOps
 class DirectoryOps(CommonOps):
     """Functions specific to directory management."""
 
+    @measure_operation('directory.list')
     @translate_exceptions
     def list(self, path, recursive=False, force_consistent=False, force_quorum=False):
         """Return a list of the nodes.
@@ -40,6 +73,112 @@ class DirectoryOps(CommonOps):
 
         return self.client.send(2, 'get', fq_path, parameters=parameters)
 
+    @measure_operation('directory.walk')
+    def walk(self, path, max_concurrency=etcd.config.WALK_MAX_CONCURRENCY, 
+             max_depth=None, force_consistent=False):
+        """Enumerate every node below the given directory by listing one level 
+        at a time, rather than asking the server for the whole tree in one 
+        response. Subdirectories are listed concurrently, and nodes are yielded 
+        as each listing arrives, so the order is not deterministic. Directory 
+        nodes are yielded as well as the values.
+
+        :param path: Key
+        :type path: string
+
+        :param max_concurrency: Maximum number of listings in-flight at once.
+        :type max_concurrency: int
+
+        :param max_depth: Don't descend more than this many levels below the 
+                          given directory (1 only returns its immediate 
+                          children), or None for no limit.
+        :type max_depth: int or None
+
+        :param force_consistent: Only interact with the current leader so 
+                                 propagation is not a concern.
+        :type force_consistent: bool
+
+        :returns: Generator of nodes
+        :rtype: generator of :class:`etcd.response.ResponseV2BasicNode`
+
+        :raises: KeyError, ValueError
+        """
+
+        if max_concurrency < 1:
+            raise ValueError("Concurrency must be at least one: (%d)" % 
+                             (max_concurrency,))
+
+        # The workers only ever hold one finished listing each, so a slow 
+        # consumer throttles the walk rather than letting it buffer the tree.
+        pending = Queue()
+        listings = Queue(maxsize=max_concurrency)
+        stop_event = threading.Event()
+
+        def list_level():
+            while stop_event.is_set() is False:
+                entry = pending.get()
+                if entry is None:
+                    return
+
+                (dir_path, depth) = entry
+
+                try:
+                    r = self.list(dir_path, force_consistent=force_consistent)
+                    if r.node.is_directory is False:
+                        raise ValueError("Not a directory: %s" % (dir_path,))
+
+                    listing = (dir_path, depth, list(r.node.children), None)
+                except Exception as e:
+                    listing = (dir_path, depth, None, e)
+
+                while stop_event.is_set() is False:
+                    try:
+                        listings.put(listing, timeout=_QUEUE_POLL_INTERVAL_S)
+                    except Full:
+                        pass
+                    else:
+                        break
+
+        threads = []
+        for i in range(max_concurrency):
+            t = threading.Thread(target=list_level)
+            t.daemon = True
+            t.start()
+
+            threads.append(t)
+
+        pending.put((path, 1))
+        outstanding = 1
+
+        try:
+            while outstanding > 0:
+                (dir_path, depth, children, error) = listings.get()
+                outstanding -= 1
+
+                if error is not None:
+                    # A subdirectory may be removed after its parent was 
+                    # listed.
+                    if dir_path != path and isinstance(error, KeyError):
+                        continue
+
+                    raise error
+
+                # Queue the subdirectories before yielding, so that the workers 
+                # stay busy while the caller processes this level.
+                if max_depth is None or depth < max_depth:
+                    for node in children:
+                        if node.is_directory is True:
+                            pending.put((node.key, depth + 1))
+                            outstanding += 1
+
+                for node in children:
+                    yield node
+        finally:
+            stop_event.set()
+
+            for t in threads:
+                pending.put(None)
+
+    @measure_operation('directory.create')
     @translate_exceptions
     def create(self, path, ttl=None):
         """A normal node-set will implicitly create directories on the way to 
@@ -81,6 +220,32 @@ class DirectoryOps(CommonOps):
 
             raise
 
+    @measure_operation('directory.update_ttl')
+    @translate_exceptions
+    def update_ttl(self, path, ttl):
+        """Set (or, with None, clear) the TTL of an existing directory, such
+        as one that was implicitly created by setting a value under it.
+
+        :param path: Key
+        :type path: string
+
+        :param ttl: Time until removed
+        :type ttl: int or None
+
+        :returns: Response object
+        :rtype: :class:`etcd.response.ResponseV2`
+        :raises: KeyError
+        """
+
+        fq_path = self.get_fq_node_path(path)
+        parameters = { 'prevExist': 'true' }
+        data = { 'dir': 'true',
+                 'ttl': ttl if ttl is not None else '' }
+
+        return self.client.send(2, 'put', fq_path, data=data,
+                                parameters=parameters)
+
+    @measure_operation('directory.delete')
     @translate_exceptions
     def delete(self, path, current_value=None, current_index=None):
         """Delete the given directory. It must be empty.
@@ -104,6 +269,7 @@ class DirectoryOps(CommonOps):
         parameters = { 'dir': 'true' }
         return self.client.send(2, 'delete', fq_path, parameters=parameters)
 
+    @measure_operation('directory.delete_if_index')
     @translate_exceptions
     def delete_if_index(self, path, current_index):
         """Only delete the given directory if the node is at the given index. 
@@ -122,6 +288,7 @@ class DirectoryOps(CommonOps):
         return self.compare_and_delete(path, is_dir=True, 
                                        current_index=current_index)
 
+    @measure_operation('directory.delete_recursive')
     @translate_exceptions
     def delete_recursive(self, path, current_index=None):
         """Delete the given directory, along with any children.
@@ -145,6 +312,7 @@ class DirectoryOps(CommonOps):
         parameters = { 'dir': 'true', 'recursive': 'true' }
         return self.client.send(2, 'delete', fq_path, parameters=parameters)
 
+    @measure_operation('directory.delete_recursive_if_index')
     @translate_exceptions
     def delete_recursive_if_index(self, path, current_index):
         """Only delete the given directory (and its children) if the node is at 
@@ -162,3 +330,234 @@ class DirectoryOps(CommonOps):
 
         return self.compare_and_delete(path, is_recursive=True, 
                                        current_index=current_index)
+
+    @measure_operation('directory.delete_many')
+    def delete_many(self, path, predicate=None, 
+                    max_concurrency=etcd.config.BULK_MAX_CONCURRENCY, 
+                    batch_size=etcd.config.BULK_BATCH_SIZE, max_rate=None, 
+                    progress_cb=None, remove_directories=False):
+        """Walk the given directory and delete the values (optionally only 
+        those matching a predicate) in parallel batches, rather than with a 
+        single recursive delete that the cluster has to perform all at once.
+
+        Each value is deleted on the condition that it hasn't been modified 
+        since it was enumerated, so a value that changes during the operation 
+        is reported as a failure rather than being deleted on the basis of 
+        stale information. Values that disappear on their own are ignored.
+
+        :param path: Key
+        :type path: string
+
+        :param predicate: Callback that receives each value node and returns 
+                          whether it should be deleted, or None for all.
+        :type predicate: callable or None
+
+        :param max_concurrency: Maximum number of concurrent requests.
+        :type max_concurrency: int
+
+        :param batch_size: Number of deletes per batch. Progress is reported 
+                           after every batch.
+        :type batch_size: int
+
+        :param max_rate: Maximum number of deletes per second, or None for no 
+                         limit.
+        :type max_rate: float or None
+
+        :param progress_cb: Callback that receives the running counts of 
+                            deleted and failed keys after every batch.
+        :type progress_cb: callable or None
+
+        :param remove_directories: Afterwards, remove any directories 
+                                   (including the given one) that were left 
+                                   empty.
+        :type remove_directories: bool
+
+        :returns: The count of deleted keys, the count of removed 
+                  directories, and a dictionary of failed keys to exceptions.
+        :rtype: :class:`etcd.directory_ops.BulkDeleteResult`
+
+        :raises: KeyError
+        """
+
+        rate_limiter = RateLimiter(max_rate) if max_rate is not None else None
+
+        def delete_value(node):
+            if rate_limiter is not None:
+                rate_limiter.wait()
+
+            self.client.node.delete_if_index(node.key, node.modified_index)
+
+        def run_batch(batch):
+            for (node, result, e) in imap_unordered(delete_value, batch, 
+                                                    max_concurrency):
+                if e is None:
+                    counts[0] += 1
+                elif isinstance(e, KeyError) is False:
+                    failures[node.key] = e
+
+            if progress_cb is not None:
+                progress_cb(counts[0], len(failures))
+
+        counts = [0]
+        removed_directories = 0
+        failures = {}
+        directories = []
+        batch = []
+
+        for node in self.walk(path, max_concurrency=max_concurrency):
+            if node.is_directory is True:
+                directories.append(node.key)
+                continue
+
+            if predicate is not None and not predicate(node):
+                continue
+
+            batch.append(node)
+            if len(batch) >= batch_size:
+                run_batch(batch)
+                batch = []
+
+        if batch:
+            run_batch(batch)
+
+        if remove_directories is True:
+            # Deepest first, so that parents are empty by the time we get to 
+            # them.
+            directories.sort(key=lambda key: key.count('/'), reverse=True)
+            directories.append(path)
+
+            for key in directories:
+                if rate_limiter is not None:
+                    rate_limiter.wait()
+
+                try:
+                    self.delete(key)
+                except KeyError:
+                    pass
+                except HTTPError as e:
+                    try:
+                        j = e.response.json()
+                    except ValueError:
+                        j = {}
+
+                    if j.get('errorCode') != _ERROR_CODE_DIR_NOT_EMPTY:
+                        failures[key] = e
+                else:
+                    removed_directories += 1
+
+        return BulkDeleteResult(deleted=counts[0], 
+                                removed_directories=removed_directories, 
+                                failures=failures)
+
+    @measure_operation('directory.sync')
+    def sync(self, path, desired, delete=True, use_cas=False, 
+             max_concurrency=etcd.config.BULK_MAX_CONCURRENCY, dry_run=False):
+        """Make the values under the given directory match a dictionary, by 
+        fetching the current tree once and only writing the keys that differ.
+
+        :param path: Key of the directory
+        :type path: string
+
+        :param desired: Dictionary of keys, relative to the directory, to 
+                        values.
+        :type desired: dict
+
+        :param delete: Delete values that aren't in the dictionary. 
+                       Directories that are left empty are not removed.
+        :type delete: bool
+
+        :param use_cas: Only change or delete a value if it hasn't been 
+                        modified since the tree was fetched, and only add it if 
+                        it still doesn't exist. Otherwise, it's reported as a 
+                        failure.
+        :type use_cas: bool
+
+        :param max_concurrency: Maximum number of concurrent writes.
+        :type max_concurrency: int
+
+        :param dry_run: Only compute the differences.
+        :type dry_run: bool
+
+        :returns: Lists of the relative keys that were added, changed, deleted, 
+                  and left alone, and a dictionary of relative keys that 
+                  failed to exceptions.
+        :rtype: :class:`etcd.directory_ops.SyncResult`
+        """
+
+        self.validate_path(path)
+        root = path.rstrip('/')
+
+        try:
+            r = self.list(path, recursive=True)
+        except KeyError:
+            current = {}
+        else:
+            current = dict((node.key[len(root):], node) 
+                           for node 
+                           in _get_values(r.node))
+
+        wanted = {}
+        for (key, value) in desired.items():
+            if isinstance(value, (str, type(u''))) is False:
+                value = str(value)
+
+            wanted['/' + key.lstrip('/')] = value
+
+        added = []
+        changed = []
+        unchanged = []
+        operations = []
+        for (key, value) in wanted.items():
+            node = current.get(key)
+            if node is None:
+                added.append(key)
+                operations.append(('add', key, value, None))
+            elif node.value != value:
+                changed.append(key)
+                operations.append(('change', key, value, node.modified_index))
+            else:
+                unchanged.append(key)
+
+        deleted = []
+        if delete is True:
+            for (key, node) in current.items():
+                if key not in wanted:
+                    deleted.append(key)
+                    operations.append(
+                        ('delete', key, None, node.modified_index))
+
+        failures = {}
+        if dry_run is False:
+            node_ops = self.client.node
+
+            def apply_operation(operation):
+                (type_, key, value, index) = operation
+                fq_key = root + key
+
+                if type_ == 'delete':
+                    if use_cas is True:
+                        node_ops.delete_if_index(fq_key, index)
+                    else:
+                        node_ops.delete(fq_key)
+                elif use_cas is False:
+                    node_ops.set(fq_key, value)
+                elif type_ == 'add':
+                    node_ops.create_only(fq_key, value)
+                else:
+                    node_ops.update_if_index(fq_key, value, index)
+
+            for (operation, result, e) in imap_unordered(apply_operation, 
+                                                         operations, 
+                                                         max_concurrency):
+                # A value that we wanted to delete is already gone.
+                if e is not None and (operation[0] != 'delete' or 
+                                      isinstance(e, KeyError) is False):
+                    failures[operation[1]] = e
+
+            if failures:
+                added = [key for key in added if key not in failures]
+                changed = [key for key in changed if key not in failures]
+                deleted = [key for key in deleted if key not in failures]
+
+        return SyncResult(added=added, changed=changed, deleted=deleted, 
+                          unchanged=unchanged, failures=failures)
@@ -38,6 +38,14 @@ class EtcdAtomicWriteError(EtcdError):
     pass
 
 
+class EtcdEventIndexClearedException(EtcdException):
+    """Raised when waiting from an index that is older than the history that 
+    the server retains.
+    """
+
+    pass
+
+
 def translate_exceptions(method):
    def op_wrapper(self, path, *args, **kwargs):
         try:
@@ -0,0 +1,1174 @@
+"""An in-process stand-in for an etcd (v2 API) member, so that the client can
+be exercised and benchmarked without a real cluster. Several servers can
+share a store to act as the members of one cluster.
+"""
+
+import sys
+import logging
+import threading
+import collections
+import heapq
+import math
+import random
+import select
+import socket
+import struct
+import json
+import time
+import datetime
+
+from etcd.compat import urlencode, parse_qsl, urlsplit, unquote, \
+                        HTTPServer, BaseHTTPRequestHandler, ThreadingMixIn
+
+_logger = logging.getLogger(__name__)
+
+_VERSION = '0.4.6'
+
+# The number of events that are kept for waits (like etcd).
+_HISTORY_SIZE = 1000
+
+# How often a blocked wait checks whether its server is stopping, or its 
+# client has gone.
+_WAIT_POLL_INTERVAL_S = .25
+
+# The longest that the reaper sleeps, in case the clock isn't the real one.
+_REAP_INTERVAL_S = .5
+
+ERROR_KEY_NOT_FOUND = 100
+ERROR_COMPARE_FAILED = 101
+ERROR_NOT_FILE = 102
+ERROR_NOT_DIR = 104
+ERROR_NODE_EXISTS = 105
+ERROR_ROOT_READ_ONLY = 107
+ERROR_DIR_NOT_EMPTY = 108
+ERROR_TTL_NAN = 202
+ERROR_INDEX_NAN = 203
+ERROR_INVALID_FIELD = 209
+ERROR_EVENT_INDEX_CLEARED = 401
+
+_ERRORS = {
+    ERROR_KEY_NOT_FOUND: (404, "Key not found"),
+    ERROR_COMPARE_FAILED: (412, "Compare failed"),
+    ERROR_NOT_FILE: (403, "Not a file"),
+    ERROR_NOT_DIR: (403, "Not a directory"),
+    ERROR_NODE_EXISTS: (412, "Key already exists"),
+    ERROR_ROOT_READ_ONLY: (403, "Root is read only"),
+    ERROR_DIR_NOT_EMPTY: (403, "Directory not empty"),
+    ERROR_TTL_NAN: (400, "The given TTL in POST form is not a number"),
+    ERROR_INDEX_NAN: (400, "The given index in POST form is not a number"),
+    ERROR_INVALID_FIELD: (400, "Invalid field"),
+    ERROR_EVENT_INDEX_CLEARED: (400, "The event in requested index is "
+                                     "outdated and cleared"),
+}
+
+_MACHINES_KEY = '/_etcd/machines'
+
+# The faults that a request can be given (see FakeFaults).
+FAULT_RESET = 'reset'
+FAULT_ERROR = 'error'
+FAULT_EMPTY_WAIT = 'empty_wait'
+
+# The counters reported by "/v2/stats/store", each of which (but the last)
+# has a "Success" and a "Fail" variant.
+_STORE_STATS = ['gets', 'sets', 'delete', 'update', 'create',
+                'compareAndSwap', 'compareAndDelete', 'expire']
+
+
+class FakeEtcdError(Exception):
+    """An error that the server reports with an etcd error-code.
+
+    :param error_code: etcd error-code
+    :type error_code: int
+
+    :param cause: The key or comparison that caused it
+    :type cause: string
+    """
+
+    def __init__(self, error_code, cause):
+        super(FakeEtcdError, self).__init__(error_code, cause)
+
+        self.error_code = error_code
+        self.cause = cause
+
+
+class FakeFaults(object):
+    """Faults for a fake server to inject, to exercise the client's failover
+    and retry paths. Each request is given at most one fault, besides the
+    latency. The attributes can be changed while the server is serving.
+
+    :param latency_s: Seconds to delay every request by
+    :type latency_s: float
+
+    :param reset_rate: Probability (from 0 to 1) of resetting the connection
+                       rather than responding
+    :type reset_rate: float
+
+    :param error_rate: Probability of responding with a server error
+    :type error_rate: float
+
+    :param error_status: HTTP status of the server errors
+    :type error_status: int
+
+    :param empty_wait_rate: Probability of ending a wait immediately, with an
+                            empty body (like etcd does when a wait times out)
+    :type empty_wait_rate: float
+
+    :param seed: Seed of the random choices, for repeatable runs
+    :type seed: int or None
+    """
+
+    def __init__(self, latency_s=0, reset_rate=0, error_rate=0,
+                 error_status=500, empty_wait_rate=0, seed=None):
+        self.latency_s = latency_s
+        self.reset_rate = reset_rate
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.empty_wait_rate = empty_wait_rate
+
+        self.__random = random.Random(seed)
+        self.__lock = threading.Lock()
+        self.__burst_remaining = 0
+        self.__counts = { FAULT_RESET: 0, FAULT_ERROR: 0,
+                          FAULT_EMPTY_WAIT: 0 }
+
+    def add_error_burst(self, count):
+        """Respond to the next requests with server errors.
+
+        :param count: Number of requests
+        :type count: int
+        """
+
+        with self.__lock:
+            self.__burst_remaining += count
+
+    def draw(self, is_wait):
+        """Choose the fault for a request.
+
+        :param is_wait: Whether the request is a wait
+        :type is_wait: bool
+
+        :returns: One of the FAULT_* constants, or None
+        :rtype: string or None
+        """
+
+        with self.__lock:
+            if self.__burst_remaining > 0:
+                self.__burst_remaining -= 1
+                fault = FAULT_ERROR
+            else:
+                r = self.__random.random()
+
+                if r < self.reset_rate:
+                    fault = FAULT_RESET
+                elif r < self.reset_rate + self.error_rate:
+                    fault = FAULT_ERROR
+                elif is_wait is True and \
+                     r < self.reset_rate + self.error_rate + \
+                         self.empty_wait_rate:
+                    fault = FAULT_EMPTY_WAIT
+                else:
+                    return None
+
+            self.__counts[fault] += 1
+            return fault
+
+    @property
+    def counts(self):
+        """The number of each fault given so far.
+
+        :rtype: dict
+        """
+
+        with self.__lock:
+            return dict(self.__counts)
+
+
+def _format_time(timestamp):
+    """Format a time like etcd does (RFC 3339, with nanoseconds)."""
+
+    dt = datetime.datetime.utcfromtimestamp(timestamp)
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.%f') + '000+00:00'
+
+def _format_duration(seconds):
+    """Format a duration like Go does (e.g. "1h2m3.5s")."""
+
+    (minutes, seconds) = divmod(seconds, 60)
+    (hours, minutes) = divmod(int(minutes), 60)
+
+    if hours > 0:
+        return '%dh%dm%.6fs' % (hours, minutes, seconds)
+    elif minutes > 0:
+        return '%dm%.6fs' % (minutes, seconds)
+    else:
+        return '%.6fs' % (seconds,)
+
+def _is_hidden(name):
+    return name.startswith('_')
+
+
+class _Node(object):
+    def __init__(self, key, value, is_directory, index):
+        self.key = key
+        self.value = value
+        self.children = {} if is_directory is True else None
+        self.created_index = index
+        self.modified_index = index
+        self.expires_at = None
+
+    def to_dict(self, now, recursive=False, sorted_=False,
+                with_children=True):
+        d = { 'key': self.key,
+              'createdIndex': self.created_index,
+              'modifiedIndex': self.modified_index }
+
+        if self.expires_at is not None:
+            d['expiration'] = _format_time(self.expires_at)
+            d['ttl'] = max(1, int(math.ceil(self.expires_at - now)))
+
+        if self.children is None:
+            d['value'] = self.value
+            return d
+
+        d['dir'] = True
+
+        if with_children is True and self.children:
+            # Hidden children are only returned when asked for by name.
+            children = [node
+                        for (name, node)
+                        in self.children.items()
+                        if _is_hidden(name) is False]
+
+            if sorted_ is True:
+                children.sort(key=lambda node: node.key)
+
+            if children:
+                d['nodes'] = [node.to_dict(now, recursive, sorted_,
+                                           recursive)
+                              for node
+                              in children]
+
+        return d
+
+    @property
+    def is_directory(self):
+        return self.children is not None
+
+
+class _Event(object):
+    def __init__(self, index, action, node, prev_node):
+        self.index = index
+        self.action = action
+        self.node = node
+        self.prev_node = prev_node
+
+    def to_dict(self):
+        d = { 'action': self.action, 'node': self.node }
+        if self.prev_node is not None:
+            d['prevNode'] = self.prev_node
+
+        return d
+
+
+def _normalize_key(key):
+    parts = [part for part in key.split('/') if part != '']
+    return '/' + '/'.join(parts)
+
+def _split_key(key):
+    (parent_key, name) = key.rsplit('/', 1)
+    return (parent_key or '/', name)
+
+
+class FakeStore(object):
+    """The keys and the event history, which are shared by the servers of a
+    cluster. All changes are serialized by one lock. Nodes with TTLs are
+    expired by a background thread (while there are any), and whenever the
+    store is accessed.
+
+    :param clock: Returns the current time, as a timestamp. Tests can pass
+                  their own, and call *expire()* after advancing it.
+    :type clock: callable
+    """
+
+    def __init__(self, clock=time.time):
+        self.__clock = clock
+        self.__condition = threading.Condition()
+        self.__index = 0
+        self.__root = _Node('/', None, True, 0)
+        self.__history = collections.deque(maxlen=_HISTORY_SIZE)
+        self.__members = []
+
+        # A heap of (expiration, key, created-index). Entries for nodes that
+        # have since been replaced or given other TTLs are skipped.
+        self.__expirations = []
+        self.__is_reaping = False
+
+        self.__stats = {}
+        for name in _STORE_STATS:
+            self.__stats[name + 'Success'] = 0
+            self.__stats[name + 'Fail'] = 0
+
+        self.__watchers = 0
+
+    def __find(self, key):
+        node = self.__root
+        if key == '/':
+            return node
+
+        for part in key[1:].split('/'):
+            if node.children is None:
+                raise FakeEtcdError(ERROR_NOT_DIR, node.key)
+
+            try:
+                node = node.children[part]
+            except KeyError:
+                return None
+
+        return node
+
+    def __make_directory(self, key):
+        """Return the directory at the key, creating it (and its ancestors)
+        if necessary.
+        """
+
+        node = self.__root
+        if key == '/':
+            return node
+
+        for part in key[1:].split('/'):
+            child = node.children.get(part)
+            if child is None:
+                child_key = node.key.rstrip('/') + '/' + part
+                child = _Node(child_key, None, True, self.__index)
+                node.children[part] = child
+            elif child.is_directory is False:
+                raise FakeEtcdError(ERROR_NOT_DIR, child.key)
+
+            node = child
+
+        return node
+
+    def __attach(self, node):
+        (parent_key, name) = _split_key(node.key)
+        self.__make_directory(parent_key).children[name] = node
+
+    def __detach(self, key):
+        (parent_key, name) = _split_key(key)
+        del self.__find(parent_key).children[name]
+
+    def __set_ttl(self, node, ttl, now):
+        if ttl is None:
+            node.expires_at = None
+            return
+
+        node.expires_at = now + ttl
+
+        heapq.heappush(self.__expirations,
+                       (node.expires_at, node.key, node.created_index))
+
+        if self.__is_reaping is False:
+            self.__is_reaping = True
+
+            t = threading.Thread(target=self.__reap)
+            t.daemon = True
+            t.start()
+
+    def __expire(self):
+        now = self.__clock()
+
+        while self.__expirations and self.__expirations[0][0] <= now:
+            (expires_at, key, created_index) = \
+                heapq.heappop(self.__expirations)
+
+            try:
+                node = self.__find(key)
+            except FakeEtcdError:
+                continue
+
+            if node is None or node.created_index != created_index or \
+               node.expires_at != expires_at:
+                continue
+
+            self.__index += 1
+            self.__detach(key)
+            self.__stats['expireSuccess'] += 1
+
+            expired = { 'key': key,
+                        'createdIndex': node.created_index,
+                        'modifiedIndex': self.__index }
+
+            if node.is_directory is True:
+                expired['dir'] = True
+
+            self.__record('expire', expired,
+                          node.to_dict(now, with_children=False))
+
+    def __reap(self):
+        with self.__condition:
+            while self.__expirations:
+                self.__expire()
+                if not self.__expirations:
+                    break
+
+                delay_s = self.__expirations[0][0] - self.__clock()
+                self.__condition.wait(min(max(delay_s, .001),
+                                          _REAP_INTERVAL_S))
+
+            self.__is_reaping = False
+
+    def __record(self, action, node, prev_node):
+        event = _Event(self.__index, action, node, prev_node)
+
+        self.__history.append(event)
+        self.__condition.notify_all()
+
+        return event
+
+    def __apply(self, stat_name, method, *args):
+        with self.__condition:
+            self.__expire()
+
+            try:
+                result = method(*args)
+            except FakeEtcdError:
+                self.__stats[stat_name + 'Fail'] += 1
+                raise
+
+            self.__stats[stat_name + 'Success'] += 1
+            return result
+
+    def __check(self, node, prev_value, prev_index):
+        if prev_value is not None and node.value != prev_value:
+            raise FakeEtcdError(ERROR_COMPARE_FAILED,
+                                "[%s != %s]" % (prev_value, node.value))
+
+        if prev_index is not None and node.modified_index != prev_index:
+            raise FakeEtcdError(ERROR_COMPARE_FAILED,
+                                "[%d != %d]" %
+                                (prev_index, node.modified_index))
+
+    def __get_machines(self):
+        nodes = []
+        for (name, prefix) in self.__members:
+            raft_prefix = prefix.rsplit(':', 1)[0] + ':7001'
+            value = urlencode([('raft', raft_prefix), ('etcd', prefix)])
+
+            nodes.append({ 'key': _MACHINES_KEY + '/' + name,
+                           'value': value,
+                           'createdIndex': 1,
+                           'modifiedIndex': 1 })
+
+        return { 'key': _MACHINES_KEY, 'dir': True, 'nodes': nodes,
+                 'createdIndex': 1, 'modifiedIndex': 1 }
+
+    def __get(self, key, recursive, sorted_):
+        if key == _MACHINES_KEY:
+            return self.__get_machines()
+
+        node = self.__find(key)
+        if node is None:
+            raise FakeEtcdError(ERROR_KEY_NOT_FOUND, key)
+
+        return node.to_dict(self.__clock(), recursive, sorted_)
+
+    def __set(self, key, value, ttl, is_directory, prev_value, prev_index,
+              prev_exist, action):
+        if key == '/':
+            raise FakeEtcdError(ERROR_ROOT_READ_ONLY, key)
+
+        existing = self.__find(key)
+        is_compare = prev_value is not None or prev_index is not None
+
+        if existing is not None and prev_exist is False:
+            raise FakeEtcdError(ERROR_NODE_EXISTS, key)
+
+        if existing is None and (is_compare is True or prev_exist is True):
+            raise FakeEtcdError(ERROR_KEY_NOT_FOUND, key)
+
+        if existing is not None:
+            if existing.is_directory is True:
+                # Only the TTL of a directory can be updated.
+                if is_directory is False or prev_exist is not True or \
+                   is_compare is True:
+                    raise FakeEtcdError(ERROR_NOT_FILE, key)
+            elif is_directory is True:
+                raise FakeEtcdError(ERROR_NOT_FILE, key)
+
+            self.__check(existing, prev_value, prev_index)
+
+        now = self.__clock()
+        self.__index += 1
+
+        prev_node = existing.to_dict(now, with_children=False) \
+                        if existing is not None \
+                        else None
+
+        if existing is not None and action != 'set':
+            # Updates keep the node, so its created-index is unchanged.
+            node = existing
+            if is_directory is False:
+                node.value = value
+
+            node.modified_index = self.__index
+        else:
+            node = _Node(key, None if is_directory is True else value,
+                         is_directory, self.__index)
+
+            self.__attach(node)
+
+        self.__set_ttl(node, ttl, now)
+
+        return self.__record(action, node.to_dict(now, with_children=False),
+                             prev_node)
+
+    def __post(self, key, value, ttl):
+        existing = self.__find(key)
+        if existing is not None and existing.is_directory is False:
+            raise FakeEtcdError(ERROR_NOT_DIR, key)
+
+        self.__index += 1
+        directory = self.__make_directory(key)
+
+        name = '%020d' % (self.__index,)
+        node = _Node(directory.key.rstrip('/') + '/' + name, value, False,
+                     self.__index)
+
+        directory.children[name] = node
+
+        now = self.__clock()
+        self.__set_ttl(node, ttl, now)
+
+        return self.__record('create', node.to_dict(now), None)
+
+    def __delete(self, key, is_directory, is_recursive, prev_value,
+                 prev_index, action):
+        if key == '/':
+            raise FakeEtcdError(ERROR_ROOT_READ_ONLY, key)
+
+        existing = self.__find(key)
+        if existing is None:
+            raise FakeEtcdError(ERROR_KEY_NOT_FOUND, key)
+
+        if existing.is_directory is True:
+            if is_directory is False and is_recursive is False:
+                raise FakeEtcdError(ERROR_NOT_FILE, key)
+
+            if existing.children and is_recursive is False:
+                raise FakeEtcdError(ERROR_DIR_NOT_EMPTY, key)
+
+        self.__check(existing, prev_value, prev_index)
+
+        self.__index += 1
+        self.__detach(key)
+
+        node = { 'key': key,
+                 'createdIndex': existing.created_index,
+                 'modifiedIndex': self.__index }
+
+        if existing.is_directory is True:
+            node['dir'] = True
+
+        prev_node = existing.to_dict(self.__clock(), with_children=False)
+        return self.__record(action, node, prev_node)
+
+    def add_member(self, name, prefix):
+        """Publish a member, for discovery.
+
+        :param name: Name of the member
+        :type name: string
+
+        :param prefix: URL prefix of the member
+        :type prefix: string
+        """
+
+        with self.__condition:
+            # A member that's restarted keeps its place.
+            for (i, (existing_name, existing_prefix)) in \
+                    enumerate(self.__members):
+                if existing_name == name:
+                    self.__members[i] = (name, prefix)
+                    return
+
+            self.__members.append((name, prefix))
+
+    def expire(self):
+        """Expire every node whose TTL has passed, now."""
+
+        with self.__condition:
+            self.__expire()
+
+    def get(self, key, recursive=False, sorted_=False):
+        """Return the node at the key, as it would be reported.
+
+        :rtype: dict
+        """
+
+        key = _normalize_key(key)
+        return self.__apply('gets', self.__get, key, recursive, sorted_)
+
+    def set(self, key, value, ttl=None, is_directory=False, prev_value=None,
+            prev_index=None, prev_exist=None):
+        """Set the value of the key (or create a directory), subject to the
+        given conditions. Any TTL that the node had is replaced by the given
+        one.
+
+        :returns: The event
+        :rtype: :class:`etcd.fake_server._Event`
+        """
+
+        if prev_value is not None or prev_index is not None:
+            action = 'compareAndSwap'
+        elif prev_exist is True:
+            action = 'update'
+        elif prev_exist is False:
+            action = 'create'
+        else:
+            action = 'set'
+
+        key = _normalize_key(key)
+        stat_name = 'sets' if action == 'set' else action
+
+        return self.__apply(stat_name, self.__set, key, value, ttl,
+                            is_directory, prev_value, prev_index, prev_exist,
+                            action)
+
+    def post(self, key, value, ttl=None):
+        """Create an in-order node in the directory at the key. Its name is
+        the index of the change, so that it sorts after every earlier one.
+
+        :returns: The event
+        :rtype: :class:`etcd.fake_server._Event`
+        """
+
+        key = _normalize_key(key)
+        return self.__apply('create', self.__post, key, value, ttl)
+
+    def delete(self, key, is_directory=False, is_recursive=False,
+               prev_value=None, prev_index=None):
+        """Delete the node at the key, subject to the given conditions. A
+        directory is only deleted if flagged as one, and only if it's empty
+        unless the delete is recursive.
+
+        :returns: The event
+        :rtype: :class:`etcd.fake_server._Event`
+        """
+
+        if prev_value is not None or prev_index is not None:
+            action = 'compareAndDelete'
+        else:
+            action = 'delete'
+
+        key = _normalize_key(key)
+
+        return self.__apply(action, self.__delete, key, is_directory,
+                            is_recursive, prev_value, prev_index, action)
+
+    def wait(self, key, wait_index=None, recursive=False, is_stopped=None):
+        """Return the first event for the key (or, if recursive, any key
+        under it that isn't hidden) at or after the wait-index, blocking until
+        there is one.
+
+        :param is_stopped: Callable that returns True if the wait should be
+                           abandoned, in which case None is returned.
+        :type is_stopped: callable or None
+
+        :returns: The event, or None
+        :rtype: :class:`etcd.fake_server._Event`
+        """
+
+        key = _normalize_key(key)
+        prefix = key.rstrip('/') + '/'
+
+        def matches(event):
+            event_key = event.node['key']
+            if event_key == key:
+                return True
+
+            if recursive is True and event_key.startswith(prefix) is True:
+                relative = event_key[len(prefix):]
+                return any(_is_hidden(part) for part in relative.split('/')) \
+                        is False
+
+            # Deleting a directory also deletes what's under it.
+            return event.node.get('dir') is True and \
+                   event.action in ('delete', 'compareAndDelete', 'expire') \
+                        and \
+                   key.startswith(event_key.rstrip('/') + '/') is True
+
+        with self.__condition:
+            self.__expire()
+
+            if wait_index is None:
+                wait_index = self.__index + 1
+            elif self.__history and \
+                 wait_index < self.__history[0].index and \
+                 wait_index <= self.__index - _HISTORY_SIZE:
+                raise FakeEtcdError(ERROR_EVENT_INDEX_CLEARED,
+                                    "the requested history has been "
+                                    "cleared [%d/%d]" %
+                                    (self.__history[0].index, wait_index))
+
+            self.__watchers += 1
+
+            try:
+                while 1:
+                    for event in self.__history:
+                        if event.index >= wait_index and \
+                           matches(event) is True:
+                            return event
+
+                    # Everything up to now has been checked.
+                    wait_index = max(wait_index, self.__index + 1)
+
+                    if is_stopped is not None and is_stopped() is True:
+                        return None
+
+                    self.__condition.wait(_WAIT_POLL_INTERVAL_S)
+            finally:
+                self.__watchers -= 1
+
+    def get_stats(self):
+        """Return the operation counts, like "/v2/stats/store".
+
+        :rtype: dict
+        """
+
+        with self.__condition:
+            stats = dict(self.__stats)
+
+            stats['expireCount'] = stats.pop('expireSuccess')
+            del stats['expireFail']
+            stats['watchers'] = self.__watchers
+
+            return stats
+
+    @property
+    def index(self):
+        return self.__index
+
+    @property
+    def members(self):
+        """The published members, as (name, URL prefix) tuples. The first is
+        reported as the leader.
+        """
+
+        with self.__condition:
+            return list(self.__members)
+
+
+def _get_bool(parameters, name):
+    value = parameters.get(name)
+    if value is None:
+        return None
+
+    if value not in ('true', 'false'):
+        raise FakeEtcdError(ERROR_INVALID_FIELD, name)
+
+    return value == 'true'
+
+def _get_int(parameters, name, error_code=ERROR_INDEX_NAN):
+    value = parameters.get(name)
+    if value is None:
+        return None
+
+    try:
+        return int(value)
+    except ValueError:
+        raise FakeEtcdError(error_code, name)
+
+def _get_ttl(parameters):
+    # An empty TTL removes it.
+    if parameters.get('ttl') == '':
+        return None
+
+    return _get_int(parameters, 'ttl', ERROR_TTL_NAN)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'etcd-fake'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+
+        # Responses are written in pieces, which Nagle's algorithm would
+        # delay.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.fake.track_connection(self.connection, True)
+
+    def finish(self):
+        self.server.fake.track_connection(self.connection, False)
+        BaseHTTPRequestHandler.finish(self)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.__handle('get')
+
+    def do_PUT(self):
+        self.__handle('put')
+
+    def do_POST(self):
+        self.__handle('post')
+
+    def do_DELETE(self):
+        self.__handle('delete')
+
+    def __is_abandoned(self):
+        """Whether the server is stopping or the client has closed the 
+        connection, so that a wait should end.
+        """
+
+        if self.server.fake.is_stopped() is True:
+            return True
+
+        # The client doesn't send anything else while waiting, so the 
+        # connection only becomes readable when it's closed.
+        try:
+            (readable, writable, errored) = \
+                select.select([self.connection], [], [], 0)
+
+            if not readable:
+                return False
+
+            return self.connection.recv(1, socket.MSG_PEEK) == b''
+        except (socket.error, ValueError):
+            return True
+
+    def __send(self, status, body, content_type='application/json'):
+        if not isinstance(body, bytes):
+            body = body.encode('utf-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Etcd-Index', str(self.server.fake.store.index))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def __send_json(self, status, data):
+        self.__send(status, json.dumps(data))
+
+    def __send_error(self, e):
+        (status, message) = _ERRORS[e.error_code]
+        self.__send_json(status, { 'errorCode': e.error_code,
+                                   'message': message,
+                                   'cause': e.cause,
+                                   'index': self.server.fake.store.index })
+
+    def __inject(self, fault, faults):
+        if fault == FAULT_RESET:
+            # Closing with a zero linger-time sends a reset.
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER,
+                                       struct.pack('ii', 1, 0))
+
+            self.close_connection = True
+            self.connection.close()
+        elif fault == FAULT_ERROR:
+            self.__send_json(faults.error_status,
+                             { 'errorCode': 300,
+                               'message': "Raft Internal Error",
+                               'cause': "injected",
+                               'index': self.server.fake.store.index })
+        elif fault == FAULT_EMPTY_WAIT:
+            self.__send(200, b'')
+
+    def __handle(self, verb):
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+
+        parameters = dict(parse_qsl(url.query, keep_blank_values=True))
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > 0:
+            body = self.rfile.read(length).decode('utf-8')
+            parameters.update(parse_qsl(body, keep_blank_values=True))
+
+        fake = self.server.fake
+
+        faults = fake.faults
+        if faults.latency_s > 0:
+            time.sleep(faults.latency_s)
+
+        fault = faults.draw(parameters.get('wait') == 'true')
+        if fault is not None:
+            self.__inject(fault, faults)
+            return
+
+        try:
+            if path.startswith('/v2/keys') is True:
+                self.__handle_keys(verb, path[len('/v2/keys'):] or '/',
+                                   parameters)
+            elif path == '/version':
+                self.__send(200, 'etcd v' + _VERSION, 'text/plain')
+            elif path == '/v2/machines':
+                prefixes = [prefix for (name, prefix) in fake.store.members]
+                self.__send(200, ', '.join(prefixes), 'text/plain')
+            elif path == '/v2/leader':
+                (name, prefix) = fake.store.members[0]
+                self.__send(200, prefix, 'text/plain')
+            elif path == '/v2/stats/self':
+                self.__send_json(200, fake.get_self_stats())
+            elif path == '/v2/stats/leader':
+                stats = fake.get_leader_stats()
+                if stats is None:
+                    self.__send(403, 'not current leader', 'text/plain')
+                else:
+                    self.__send_json(200, stats)
+            elif path == '/v2/stats/store':
+                self.__send_json(200, fake.store.get_stats())
+            else:
+                self.__send(404, '404 page not found\n', 'text/plain')
+        except FakeEtcdError as e:
+            self.__send_error(e)
+
+    def __handle_keys(self, verb, key, parameters):
+        store = self.server.fake.store
+
+        if verb == 'get':
+            if _get_bool(parameters, 'wait') is True:
+                event = store.wait(
+                    key,
+                    wait_index=_get_int(parameters, 'waitIndex'),
+                    recursive=_get_bool(parameters, 'recursive') is True,
+                    is_stopped=self.__is_abandoned)
+
+                if event is None:
+                    self.close_connection = True
+                    return
+
+                self.__send_json(200, event.to_dict())
+                return
+
+            node = store.get(
+                key,
+                recursive=_get_bool(parameters, 'recursive') is True,
+                sorted_=_get_bool(parameters, 'sorted') is True)
+
+            self.__send_json(200, { 'action': 'get', 'node': node })
+        elif verb == 'put':
+            is_directory = _get_bool(parameters, 'dir') is True
+
+            event = store.set(
+                key,
+                None if is_directory is True \
+                     else parameters.get('value', ''),
+                ttl=_get_ttl(parameters),
+                is_directory=is_directory,
+                prev_value=parameters.get('prevValue'),
+                prev_index=_get_int(parameters, 'prevIndex'),
+                prev_exist=_get_bool(parameters, 'prevExist'))
+
+            status = 201 if event.prev_node is None else 200
+            self.__send_json(status, event.to_dict())
+        elif verb == 'post':
+            event = store.post(key, parameters.get('value', ''),
+                               ttl=_get_ttl(parameters))
+
+            self.__send_json(201, event.to_dict())
+        elif verb == 'delete':
+            event = store.delete(
+                key,
+                is_directory=_get_bool(parameters, 'dir') is True,
+                is_recursive=_get_bool(parameters, 'recursive') is True,
+                prev_value=parameters.get('prevValue'),
+                prev_index=_get_int(parameters, 'prevIndex'))
+
+            self.__send_json(200, event.to_dict())
+        else:
+            self.__send(405, 'Method Not Allowed', 'text/plain')
+
+
+class _HttpServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        # Clients close connections (like abandoned waits) whenever they 
+        # like, and so do stopping servers and injected resets.
+        if isinstance(sys.exc_info()[1], socket.error) is True:
+            _logger.debug("Connection from [%s] failed: %s", 
+                          client_address, sys.exc_info()[1])
+
+            return
+
+        HTTPServer.handle_error(self, request, client_address)
+
+
+class FakeEtcdServer(object):
+    """Serves the etcd v2 API (keys, discovery, leader, and stats) from a
+    thread in this process. It publishes itself for discovery (in
+    "/_etcd/machines"), so a :class:`etcd.client.Client` can connect to it
+    like a real member. Every connection is served by its own thread, and
+    connections are kept alive.
+
+    Several servers given the same store act as the members of a cluster.
+    The first one is reported as the leader. Stopping a server is like the
+    member dying: its connections are closed, and new ones are refused. A
+    new server with the same name, port, and store is like it restarting.
+
+    :param host: Host to listen on
+    :type host: string
+
+    :param port: Port to listen on, or 0 to pick a free one
+    :type port: int
+
+    :param store: Store to serve, or None for a new one
+    :type store: :class:`etcd.fake_server.FakeStore` or None
+
+    :param name: Name to publish the member as
+    :type name: string or None
+
+    :param faults: Faults to inject, or None for none (until some are set on
+                   the *faults* property).
+    :type faults: :class:`etcd.fake_server.FakeFaults` or None
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, store=None, name=None,
+                 faults=None):
+        self.__store = store if store is not None else FakeStore()
+        self.__faults = faults if faults is not None else FakeFaults()
+        self.__stop_event = threading.Event()
+        self.__connections = set()
+        self.__connections_lock = threading.Lock()
+        self.__started_at = None
+
+        self.__server = _HttpServer((host, port), _Handler)
+        self.__server.fake = self
+
+        (self.__host, self.__port) = self.__server.server_address[:2]
+        self.__name = name if name is not None \
+                           else ('fake%d' % (self.__port,))
+
+        self.__thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def track_connection(self, connection, is_open):
+        with self.__connections_lock:
+            if is_open is True:
+                self.__connections.add(connection)
+            else:
+                self.__connections.discard(connection)
+
+    def start(self):
+        """Start serving, and publish the member."""
+
+        if self.__thread is not None:
+            raise ValueError("Server was already started.")
+
+        self.__started_at = time.time()
+        self.__store.add_member(self.__name, self.prefix)
+
+        self.__thread = threading.Thread(
+                            target=self.__server.serve_forever,
+                            kwargs={ 'poll_interval': .1 })
+
+        self.__thread.daemon = True
+        self.__thread.start()
+
+        _logger.debug("Fake etcd server started: %s", self.prefix)
+
+    def stop(self):
+        """Stop serving, and close every open connection (including waits).
+        """
+
+        self.__stop_event.set()
+
+        if self.__thread is not None:
+            self.__server.shutdown()
+            self.__thread.join()
+
+        self.__server.server_close()
+
+        with self.__connections_lock:
+            connections = list(self.__connections)
+
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+
+        _logger.debug("Fake etcd server stopped: %s", self.prefix)
+
+    def is_stopped(self):
+        return self.__stop_event.is_set()
+
+    def get_self_stats(self):
+        """Return the statistics of this member, like "/v2/stats/self".
+
+        :rtype: dict
+        """
+
+        (leader_name, leader_prefix) = self.__store.members[0]
+        uptime_s = time.time() - self.__started_at
+
+        return { 'name': self.__name,
+                 'state': 'leader' if leader_name == self.__name \
+                                   else 'follower',
+                 'startTime': _format_time(self.__started_at),
+                 'leaderInfo': { 'leader': leader_name,
+                                 'uptime': _format_duration(uptime_s),
+                                 'startTime': _format_time(
+                                                self.__started_at) },
+                 'recvAppendRequestCnt': 0,
+                 'sendAppendRequestCnt': 0,
+                 'sendPkgRate': 0.0,
+                 'sendBandwidthRate': 0.0 }
+
+    def get_leader_stats(self):
+        """Return the statistics of the followers, like "/v2/stats/leader",
+        or None if this member isn't the leader.
+
+        :rtype: dict or None
+        """
+
+        members = self.__store.members
+        if members[0][0] != self.__name:
+            return None
+
+        latency = { 'average': 0.0, 'current': 0.0, 'maximum': 0.0,
+                    'minimum': 0.0, 'standardDeviation': 0.0 }
+
+        followers = {}
+        for (name, prefix) in members[1:]:
+            followers[name] = { 'counts': { 'fail': 0, 'success': 0 },
+                                'latency': dict(latency) }
+
+        return { 'leader': self.__name, 'followers': followers }
+
+    @property
+    def store(self):
+        return self.__store
+
+    @property
+    def faults(self):
+        return self.__faults
+
+    @property
+    def name(self):
+        return self.__name
+
+    @property
+    def host(self):
+        return self.__host
+
+    @property
+    def port(self):
+        return self.__port
+
+    @property
+    def prefix(self):
+        """The URL prefix of the member (what the client is given).
+
+        :rtype: string
+        """
+
+        return 'http://%s:%d' % (self.__host, self.__port)
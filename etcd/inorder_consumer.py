@@ -0,0 +1,219 @@
+import logging
+import collections
+import itertools
+import random
+import time
+
+from requests.exceptions import Timeout
+
+import etcd.config
+
+from etcd.exceptions import EtcdPreconditionException, \
+                            EtcdAlreadyExistsException, \
+                            EtcdEventIndexClearedException, \
+                            EtcdWaitFaultException
+
+_logger = logging.getLogger(__name__)
+
+
+class InOrderConsumer(object):
+    """Consumes an in-order directory as a work queue, and can be used by
+    many workers (with their own consumers) at once. An entry is claimed by
+    deleting it on the condition that it hasn't changed since it was listed,
+    so exactly one worker gets each entry, roughly oldest first.
+
+    Rather than listing the directory for every entry, up to *prefetch* of the
+    oldest entries are kept as candidates, and claimed one at a time (in a
+    random order). Entries that were claimed by other workers in the meantime
+    are skipped. So that workers don't all contend for the same entries, a
+    worker whose candidates were contended takes its next ones from a window
+    chosen at random among more of the oldest entries (up to *max_spread*
+    windows). When the queue is empty, the consumer waits on the directory,
+    and lists it again once an entry arrives.
+
+    :param client: Client instance
+    :type client: :class:`etcd.client.Client`
+
+    :param inorder: In-order directory
+    :type inorder: :class:`etcd.inorder_ops._InOrder`
+
+    :param prefetch: Maximum number of entries to keep as candidates
+    :type prefetch: int
+
+    :param max_spread: Maximum number of windows of *prefetch* of the oldest
+                       entries to choose the candidates from
+    :type max_spread: int
+    """
+
+    def __init__(self, client, inorder,
+                 prefetch=etcd.config.INORDER_CONSUMER_PREFETCH,
+                 max_spread=etcd.config.INORDER_CONSUMER_MAX_SPREAD):
+        if prefetch < 1:
+            raise ValueError("Prefetch must be at least one: (%d)" %
+                             (prefetch,))
+
+        self.__client = client
+        self.__inorder = inorder
+        self.__prefetch = prefetch
+        self.__max_spread = max_spread
+
+        self.__candidates = collections.deque()
+        self.__wait_index = None
+
+        # The number of windows (of *prefetch* of the oldest entries) to 
+        # choose among, and the conflicts in the current one.
+        self.__spread = 1
+        self.__window_conflict_count = 0
+
+        self.__claimed_count = 0
+        self.__conflict_count = 0
+
+    def __iter__(self):
+        while 1:
+            yield self.get()
+
+    def __list(self):
+        """Replace the candidates with the oldest entries in the queue."""
+
+        try:
+            r = self.__inorder.list(sorted=True)
+        except KeyError:
+            # Create the directory so that there's something to wait on.
+            try:
+                self.__inorder.create()
+            except EtcdAlreadyExistsException:
+                pass
+
+            r = self.__inorder.list(sorted=True)
+
+        # Only build the nodes that we're going to use.
+        entries = (node
+                   for node
+                   in r.node.children
+                   if node.is_directory is False)
+
+        # Every consumer sees the same oldest entries. If they all tried the 
+        # same ones, they'd all contend for each of them. So, each chooses a 
+        # window at random, from among more of them the more its last window 
+        # was contended.
+        if self.__window_conflict_count > 0:
+            self.__spread = min(self.__spread * 2, self.__max_spread)
+        elif self.__spread > 1:
+            self.__spread -= 1
+
+        self.__window_conflict_count = 0
+
+        head = list(itertools.islice(entries, 
+                                     self.__prefetch * self.__spread))
+
+        window_count = (len(head) + self.__prefetch - 1) // self.__prefetch
+        if window_count > 1:
+            start = random.randrange(window_count) * self.__prefetch
+        else:
+            start = 0
+
+        candidates = head[start:start + self.__prefetch]
+
+        # In case another consumer chose the same window.
+        random.shuffle(candidates)
+
+        self.__candidates.extend(candidates)
+
+        self.__wait_index = r.etcd_index + 1 \
+                                if r.etcd_index is not None \
+                                else None
+
+    def __claim(self, node):
+        try:
+            self.__client.node.delete_if_index(node.key, node.modified_index)
+        except (EtcdPreconditionException, KeyError):
+            self.__conflict_count += 1
+            self.__window_conflict_count += 1
+            return False
+
+        self.__claimed_count += 1
+        return True
+
+    def __wait_for_entry(self, deadline):
+        """Wait for an entry to be added. Return False if we timed-out.
+        """
+
+        while 1:
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    return False
+
+            try:
+                r = self.__client.directory.wait(
+                        self.__inorder.path,
+                        recursive=True,
+                        wait_index=self.__wait_index,
+                        timeout=timeout)
+            except Timeout:
+                return False
+            except (EtcdEventIndexClearedException, EtcdWaitFaultException):
+                # We can't tell what changed, so list again.
+                return True
+
+            self.__wait_index = r.node.modified_index + 1
+
+            # Every waiting consumer is told about the same entry, so rather 
+            # than all of them trying to claim it, they list again and choose 
+            # among the entries that have arrived by then.
+            if r.node.is_deleted is False and r.node.is_directory is False:
+                return True
+
+    def get(self, block=True, timeout=None):
+        """Claim and return the oldest entry.
+
+        :param block: Wait for an entry if the queue is empty.
+        :type block: bool
+
+        :param timeout: Seconds to wait for an entry, or None to wait
+                        indefinitely
+        :type timeout: float or None
+
+        :returns: The claimed node (which has been deleted), or None if the
+                  queue was empty.
+        :rtype: :class:`etcd.response.ResponseV2AliveNode` or None
+        """
+
+        deadline = time.time() + timeout if timeout is not None else None
+
+        while 1:
+            while self.__candidates:
+                node = self.__candidates.popleft()
+                if self.__claim(node) is True:
+                    _logger.debug("Claimed queue entry: %s", node.key)
+                    return node
+
+            self.__list()
+            if self.__candidates:
+                continue
+
+            if block is False:
+                return None
+
+            if self.__wait_for_entry(deadline) is False:
+                return None
+
+    @property
+    def claimed_count(self):
+        """The number of entries that we've claimed.
+
+        :rtype: int
+        """
+
+        return self.__claimed_count
+
+    @property
+    def conflict_count(self):
+        """The number of candidates that had already been claimed by another
+        consumer.
+
+        :rtype: int
+        """
+
+        return self.__conflict_count
@@ -1,4 +1,15 @@
+from collections import namedtuple
+
+import etcd.config
+
 from etcd.common_ops import CommonOps
+from etcd.exceptions import translate_exceptions
+from etcd.metrics import measure_operation
+from etcd.inorder_consumer import InOrderConsumer
+from etcd.inorder_reader import InOrderReader
+from etcd.parallel import imap_unordered
+
+AddManyResult = namedtuple('AddManyResult', ['keys', 'failures'])
 
 
 class _InOrder(CommonOps):
@@ -35,21 +46,88 @@ class _InOrder(CommonOps):
     def pop(self, name):
         self.client.node.delete(self.__path + '/' + name)
 
-    def add(self, value):
+    @measure_operation('inorder.add')
+    def add(self, value, ttl=None):
         """Add an in-order value.
 
         :param value: Value to be automatically-assigned a key.
         :type value: string
 
+        :param ttl: Number of seconds until expiration
+        :type ttl: int or None
+
         :returns: Response object
         :rtype: :class:`etcd.response.ResponseV2`
         """
 
-# TODO: Can we send a TTL?
-
         fq_path = self.get_fq_node_path(self.__path)
-        return self.client.send(2, 'post', fq_path, value=value)
+        data = { }
+
+        if ttl is not None:
+            data['ttl'] = ttl
+
+        return self.client.send(2, 'post', fq_path, value=value, data=data)
+
+    def add_many(self, values, ttl=None, 
+                 max_concurrency=etcd.config.BULK_MAX_CONCURRENCY):
+        """Add many in-order values using concurrent requests. The values are 
+        consumed lazily, so a long iterable isn't materialized (unless there 
+        are per-value TTLs).
+
+        Because the requests are concurrent, the keys that the server assigns 
+        aren't necessarily in the order of the values. Use *add()* if the 
+        order in the directory matters.
+
+        :param values: Values to be automatically-assigned keys.
+        :type values: iterable
+
+        :param ttl: Number of seconds until expiration, either for every 
+                    value or as a list with one per value (each may be None).
+        :type ttl: int, list, or None
+
+        :param max_concurrency: Maximum number of concurrent requests.
+        :type max_concurrency: int
+
+        :returns: The keys, in the order of the values (None for a value that 
+                  couldn't be added), and a dictionary of the positions of 
+                  failed values to exceptions.
+        :rtype: :class:`etcd.inorder_ops.AddManyResult`
+
+        :raises: ValueError
+        """
+
+        if isinstance(ttl, (list, tuple)) is True:
+            values = list(values)
+            if len(ttl) != len(values):
+                raise ValueError("There must be one TTL per value: (%d) != "
+                                 "(%d)" % (len(ttl), len(values)))
+
+            items = zip(range(len(values)), values, ttl)
+        else:
+            items = ((i, value, ttl) for (i, value) in enumerate(values))
+
+        def add_value(item):
+            (i, value, ttl) = item
+            return self.add(value, ttl=ttl).node.key
+
+        keys = []
+        failures = {}
 
+        for (item, key, e) in imap_unordered(add_value, items, 
+                                             max_concurrency):
+            i = item[0]
+
+            if i >= len(keys):
+                keys.extend([None] * (i - len(keys) + 1))
+
+            if e is None:
+                keys[i] = key
+            else:
+                failures[i] = e
+
+        return AddManyResult(keys=keys, failures=failures)
+
+    @measure_operation('inorder.list')
     def list(self, sorted=False):
         """Return a list of the inserted nodes.
 
@@ -58,13 +136,56 @@ class _InOrder(CommonOps):
 
         :returns: Response object
         :rtype: :class:`etcd.response.ResponseV2`
+        :raises: KeyError
         """
 
+        return self.__list(self.__path, sorted)
+
+    @translate_exceptions
+    def __list(self, path, sorted):
+        fq_path = self.get_fq_node_path(path)
+
         parameters = {}
         if sorted is True:
             parameters['sorted'] = 'true'
 
-        return self.client.send(2, 'get', self.__path, parameters=parameters)
+        return self.client.send(2, 'get', fq_path, parameters=parameters)
+
+    def get_consumer(self, prefetch=etcd.config.INORDER_CONSUMER_PREFETCH,
+                     max_spread=etcd.config.INORDER_CONSUMER_MAX_SPREAD):
+        """Get a consumer that claims entries from this directory as a work 
+        queue, roughly oldest first. Every worker should have its own.
+
+        :param prefetch: Maximum number of entries to keep as candidates
+        :type prefetch: int
+
+        :param max_spread: Maximum number of windows of *prefetch* of the 
+                           oldest entries to choose the candidates from
+        :type max_spread: int
+
+        :returns: Consumer
+        :rtype: :class:`etcd.inorder_consumer.InOrderConsumer`
+        """
+
+        return InOrderConsumer(self.client, self, prefetch=prefetch, 
+                               max_spread=max_spread)
+
+    def get_reader(self, window_size=etcd.config.INORDER_READER_WINDOW_SIZE):
+        """Get a reader that returns the entries a window at a time, oldest 
+        first, rather than all at once.
+
+        :param window_size: Maximum number of entries per window
+        :type window_size: int
+
+        :returns: Reader
+        :rtype: :class:`etcd.inorder_reader.InOrderReader`
+        """
+
+        return InOrderReader(self.client, self, window_size=window_size)
+
+    @property
+    def path(self):
+        return self.__path
 
 
 class InOrderOps(CommonOps):
@@ -0,0 +1,147 @@
+from requests.exceptions import Timeout
+
+import etcd.config
+
+from etcd.exceptions import EtcdEventIndexClearedException, \
+                            EtcdWaitFaultException
+
+
+class InOrderReader(object):
+    """Reads an in-order directory a window of entries at a time, oldest
+    first, without consuming them.
+
+    etcd can't return part of a directory, so the reader keeps the last
+    listing and serves windows from it, building node objects only for the
+    entries in each window. The directory is only listed again once the
+    cached listing has no entries after the last one returned, and then
+    only the entries after that one are returned.
+
+    :param client: Client instance
+    :type client: :class:`etcd.client.Client`
+
+    :param inorder: In-order directory
+    :type inorder: :class:`etcd.inorder_ops._InOrder`
+
+    :param window_size: Maximum number of entries per window
+    :type window_size: int
+    """
+
+    def __init__(self, client, inorder,
+                 window_size=etcd.config.INORDER_READER_WINDOW_SIZE):
+        if window_size < 1:
+            raise ValueError("Window size must be at least one: (%d)" %
+                             (window_size,))
+
+        self.__client = client
+        self.__inorder = inorder
+        self.__window_size = window_size
+
+        self.__listing = None
+        self.__last_key = None
+        self.__last_index = None
+        self.__list_count = 0
+
+    def __list(self):
+        try:
+            self.__listing = self.__inorder.list(sorted=True)
+        except KeyError:
+            self.__listing = None
+        else:
+            self.__list_count += 1
+
+    def __has_changed(self, wait_s):
+        """Wait for the directory to change after the cached listing."""
+
+        if self.__listing is None or self.__listing.etcd_index is None:
+            return True
+
+        try:
+            self.__client.directory.wait(
+                self.__inorder.path,
+                recursive=True,
+                wait_index=self.__listing.etcd_index + 1,
+                timeout=wait_s)
+        except Timeout:
+            return False
+        except (EtcdEventIndexClearedException, EtcdWaitFaultException):
+            pass
+
+        return True
+
+    def __get_window(self):
+        while self.__listing is not None:
+            nodes = self.__listing.node.get_children(
+                        after_key=self.__last_key,
+                        limit=self.__window_size)
+
+            if not nodes:
+                break
+
+            self.__last_key = nodes[-1].key
+            self.__last_index = nodes[-1].modified_index
+
+            # Skip any directories, and keep going if that's all there was.
+            nodes = [node for node in nodes if node.is_directory is False]
+            if nodes:
+                return nodes
+
+        return []
+
+    def next_window(self, wait_s=None):
+        """Return the next entries after the last ones returned.
+
+        :param wait_s: When the cached listing is exhausted, list again
+                       only if the directory changes within this many seconds,
+                       rather than immediately (an unchanged directory isn't
+                       transferred again).
+        :type wait_s: float or None
+
+        :returns: Up to *window_size* nodes, which is empty if there were no
+                  new entries.
+        :rtype: list
+        """
+
+        nodes = self.__get_window()
+
+        if not nodes:
+            if wait_s is not None and self.__has_changed(wait_s) is False:
+                return []
+
+            self.__list()
+            nodes = self.__get_window()
+
+        return nodes
+
+    def reset(self):
+        """Start again from the oldest entry, with a new listing."""
+
+        self.__listing = None
+        self.__last_key = None
+        self.__last_index = None
+
+    @property
+    def last_key(self):
+        """The key of the last entry returned, or None.
+
+        :rtype: string or None
+        """
+
+        return self.__last_key
+
+    @property
+    def last_index(self):
+        """The modified-index of the last entry returned, or None.
+
+        :rtype: int or None
+        """
+
+        return self.__last_index
+
+    @property
+    def list_count(self):
+        """The number of times that the directory has been listed.
+
+        :rtype: int
+        """
+
+        return self.__list_count
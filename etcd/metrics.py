@@ -0,0 +1,329 @@
+import threading
+import functools
+import time
+
+from collections import namedtuple
+
+# Values below this many microseconds are counted exactly. Above it, every
+# power-of-two range is split into this many buckets, so a percentile is
+# never off by more than (1 / _SUB_BUCKET_COUNT) of its value.
+_SUB_BUCKET_BITS = 5
+_SUB_BUCKET_COUNT = 1 << _SUB_BUCKET_BITS
+
+OperationStats = namedtuple('OperationStats',
+                            ['count', 'errors', 'per_s', 'mean_s', 'p50_s',
+                             'p90_s', 'p99_s', 'max_s'])
+
+_local = threading.local()
+
+# The code-flag of generator functions (inspect.CO_GENERATOR, without the 
+# import).
+_CO_GENERATOR = 0x20
+
+
+def _get_bucket_index(value_us):
+    if value_us < _SUB_BUCKET_COUNT:
+        return value_us
+
+    shift = value_us.bit_length() - _SUB_BUCKET_BITS - 1
+    return (shift + 1) * _SUB_BUCKET_COUNT + \
+           ((value_us >> shift) - _SUB_BUCKET_COUNT)
+
+def _get_bucket_value(index):
+    """Return the middle of the range of values counted by the bucket."""
+
+    if index < _SUB_BUCKET_COUNT:
+        return index
+
+    shift = index // _SUB_BUCKET_COUNT - 1
+    low = (index % _SUB_BUCKET_COUNT + _SUB_BUCKET_COUNT) << shift
+
+    return low + ((1 << shift) - 1) // 2
+
+
+class LatencyHistogram(object):
+    """Counts latencies in log-linear buckets (like an HDR histogram), so that
+    recording is cheap, memory is bounded, and percentiles have a bounded
+    relative error. Not thread-safe by itself.
+    """
+
+    def __init__(self):
+        self.__counts = {}
+        self.__count = 0
+        self.__total_s = 0.0
+        self.__max_s = 0.0
+
+    def record(self, value_s):
+        """Count a latency.
+
+        :param value_s: Latency in seconds
+        :type value_s: float
+        """
+
+        index = _get_bucket_index(int(value_s * 1000000))
+        self.__counts[index] = self.__counts.get(index, 0) + 1
+
+        self.__count += 1
+        self.__total_s += value_s
+
+        if value_s > self.__max_s:
+            self.__max_s = value_s
+
+    def get_percentiles(self, percentiles):
+        """Return the latencies at the given percentiles.
+
+        :param percentiles: Percentiles, from 0 to 100, in ascending order
+        :type percentiles: list
+
+        :returns: A latency in seconds for each percentile, or None for each
+                  if nothing has been recorded.
+        :rtype: list
+        """
+
+        if self.__count == 0:
+            return [None] * len(percentiles)
+
+        values = []
+        indices = sorted(self.__counts.keys())
+        i = 0
+        seen = self.__counts[indices[0]]
+
+        for percentile in percentiles:
+            target = max(1, percentile / 100.0 * self.__count)
+            while seen < target and i < len(indices) - 1:
+                i += 1
+                seen += self.__counts[indices[i]]
+
+            value_s = _get_bucket_value(indices[i]) / 1000000.0
+            values.append(min(value_s, self.__max_s))
+
+        return values
+
+    @property
+    def count(self):
+        return self.__count
+
+    @property
+    def mean_s(self):
+        return self.__total_s / self.__count if self.__count > 0 else None
+
+    @property
+    def max_s(self):
+        return self.__max_s if self.__count > 0 else None
+
+
+class _Operation(object):
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = {}
+
+
+class OperationMetrics(object):
+    """Keeps a latency histogram and error counts for every operation (like
+    "node.get" or "lock.acquire"). Operations are only measured at the
+    outermost level: the requests made by an operation on behalf of another
+    (like the waits done while acquiring a lock) count toward the outer one.
+    """
+
+    def __init__(self):
+        self.__operations = {}
+        self.__lock = threading.Lock()
+        self.__since = time.time()
+
+    def record(self, name, elapsed_s, exception=None):
+        """Count an operation.
+
+        :param name: Name of the operation
+        :type name: string
+
+        :param elapsed_s: Seconds that the operation took
+        :type elapsed_s: float
+
+        :param exception: The exception that the operation raised, if any.
+        :type exception: Exception or None
+        """
+
+        with self.__lock:
+            try:
+                operation = self.__operations[name]
+            except KeyError:
+                operation = _Operation()
+                self.__operations[name] = operation
+
+            operation.histogram.record(elapsed_s)
+
+            if exception is not None:
+                error_name = exception.__class__.__name__
+                operation.errors[error_name] = \
+                    operation.errors.get(error_name, 0) + 1
+
+    def snapshot(self, reset=False):
+        """Return the statistics of every operation since the metrics were
+        created or last reset.
+
+        :param reset: Start counting again afterward.
+        :type reset: bool
+
+        :returns: Dictionary of operation names to statistics. The errors are
+                  a dictionary of exception class-names to counts. Not-found
+                  and failed-precondition outcomes are counted there too,
+                  since they're only errors to some callers.
+        :rtype: dict of :class:`etcd.metrics.OperationStats`
+        """
+
+        with self.__lock:
+            operations = self.__operations
+            elapsed_s = time.time() - self.__since
+
+            if reset is True:
+                self.__operations = {}
+                self.__since = time.time()
+
+            stats = {}
+            for (name, operation) in operations.items():
+                histogram = operation.histogram
+                (p50_s, p90_s, p99_s) = \
+                    histogram.get_percentiles([50, 90, 99])
+
+                stats[name] = OperationStats(
+                                count=histogram.count,
+                                errors=dict(operation.errors),
+                                per_s=histogram.count / elapsed_s \
+                                        if elapsed_s > 0 \
+                                        else None,
+                                mean_s=histogram.mean_s,
+                                p50_s=p50_s,
+                                p90_s=p90_s,
+                                p99_s=p99_s,
+                                max_s=histogram.max_s)
+
+        return stats
+
+    def reset(self):
+        """Discard everything counted so far."""
+
+        with self.__lock:
+            self.__operations = {}
+            self.__since = time.time()
+
+
+def _call_measured(metrics, name, method, ops, args, kwargs):
+    if metrics is None or getattr(_local, 'is_measuring', False):
+        return method(ops, *args, **kwargs)
+
+    _local.is_measuring = True
+    start = time.time()
+
+    try:
+        result = method(ops, *args, **kwargs)
+    except Exception as e:
+        metrics.record(name, time.time() - start, e)
+        raise
+    finally:
+        _local.is_measuring = False
+
+    metrics.record(name, time.time() - start)
+    return result
+
+def _iterate_measured(client, name, span_name, method, ops, args, kwargs):
+    """Measure a generator operation from its first item until it's 
+    exhausted (or closed). The caller's own work between items is in that 
+    time, but it isn't counted as part of the operation, and the span isn't 
+    made current while the caller has control.
+    """
+
+    metrics = client.metrics
+    tracer = client.tracer
+
+    if (metrics is None and tracer is None) or \
+       getattr(_local, 'is_measuring', False):
+        for item in method(ops, *args, **kwargs):
+            yield item
+
+        return
+
+    span = None
+    if tracer is not None:
+        import etcd.tracing
+
+        key = etcd.tracing.get_operation_key(ops, args)
+        attributes = { 'etcd.key': key } if key is not None else {}
+        span = tracer.start_span(span_name, attributes=attributes)
+
+    start = time.time()
+    error = None
+
+    try:
+        generator = method(ops, *args, **kwargs)
+
+        while 1:
+            _local.is_measuring = True
+
+            try:
+                item = next(generator)
+            except StopIteration:
+                return
+            finally:
+                _local.is_measuring = False
+
+            yield item
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        if metrics is not None:
+            metrics.record(name, time.time() - start, error)
+
+        if span is not None:
+            if error is not None:
+                span.record_exception(error)
+
+            span.end()
+
+def measure_operation(name):
+    """Decorate an operation so that it's counted under the given name when
+    the client has metrics enabled, and so that it gets a span (named with an
+    "etcd." prefix) when the client has tracing enabled. The decorated
+    method's object must have a *client* property. A generator is measured 
+    while it's iterated.
+
+    :param name: Name of the operation
+    :type name: string
+    """
+
+    span_name = 'etcd.' + name
+
+    def decorator(method):
+        if method.__code__.co_flags & _CO_GENERATOR:
+            @functools.wraps(method)
+            def generator_wrapper(self, *args, **kwargs):
+                return _iterate_measured(self.client, name, span_name, 
+                                         method, self, args, kwargs)
+
+            return generator_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            client = self.client
+            tracer = client.tracer
+
+            if tracer is None:
+                return _call_measured(client.metrics, name, method, self, 
+                                      args, kwargs)
+
+            import etcd.tracing
+
+            key = etcd.tracing.get_operation_key(self, args)
+            attributes = { 'etcd.key': key } if key is not None else {}
+
+            with tracer.start_as_current_span(span_name, 
+                                              attributes=attributes) as span:
+                result = _call_measured(client.metrics, name, method, self, 
+                                        args, kwargs)
+
+                etcd.tracing.set_response_attributes(span, result)
+                return result
+
+        return wrapper
+
+    return decorator
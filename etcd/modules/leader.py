@@ -1,6 +1,11 @@
+import logging
+
 from requests.exceptions import HTTPError
 
 from etcd.common_ops import CommonOps
+from etcd.metrics import measure_operation
+
+_logger = logging.getLogger(__name__)
 
 
 class LeaderMod(CommonOps):
@@ -13,9 +18,9 @@ class LeaderMod(CommonOps):
     def __get_path(self, leader_key):
         return ('/' + leader_key)
 
+    @measure_operation('leader.set_or_renew')
     def set_or_renew(self, key, value, ttl):
-        self.client.debug("LEADER: Setting key [%s] with value [%s]." % 
-                          (key, value))
+        _logger.debug("LEADER: Setting key [%s] with value [%s].", key, value)
 
         fq_path = self.__get_path(key)
 
@@ -27,8 +32,9 @@ class LeaderMod(CommonOps):
                          parameters=parameters, module='leader', 
                          return_raw=True)
 
+    @measure_operation('leader.get')
     def get(self, key):
-        self.client.debug("LEADER: Getting value for key [%s]." % (key))
+        _logger.debug("LEADER: Getting value for key [%s].", key)
 
         fq_path = self.__get_path(key)
 
@@ -52,9 +58,9 @@ class LeaderMod(CommonOps):
 
         return result
 
+    @measure_operation('leader.delete')
     def delete(self, key, value):
-        self.client.debug("LEADER: Deleting key [%s] with value [%s]." % 
-                          (key, value))
+        _logger.debug("LEADER: Deleting key [%s] with value [%s].", key, value)
 
 # TODO: 
 #
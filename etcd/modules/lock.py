@@ -1,17 +1,42 @@
+import logging
+import threading
+
 import requests
 
 from requests.status_codes import codes
-from requests.exceptions import HTTPError
+from requests.exceptions import HTTPError, Timeout
+
+import etcd.config
 
 from etcd.common_ops import CommonOps
+from etcd.metrics import measure_operation
+from etcd.renewer import Renewer
+
+_logger = logging.getLogger(__name__)
 
 
 class _LockBase(object):
-    def __init__(self, client, lock_name, ttl):
+    """The base of the lock classes. 
+
+    If *auto_renew* is True, the lock is renewed in the background (with its 
+    original TTL) every *renew_fraction* of its TTL while it is held. If a 
+    renewal fails, the lock is considered lost: *is_lost* becomes True, 
+    *lost_event* is set, and *on_lost* (if given) is called with the lock and 
+    the exception.
+    """
+
+    def __init__(self, client, lock_name, ttl, auto_renew=False, 
+                 renew_fraction=etcd.config.LOCK_RENEW_FRACTION, 
+                 on_lost=None):
         self.__client = client
         self.__lock_name = lock_name
         self.__path = '/' + lock_name
         self.__ttl = ttl
+        self.__auto_renew = auto_renew
+        self.__renew_fraction = renew_fraction
+        self.__on_lost = on_lost
+        self.__renewer = None
+        self.__lost_event = threading.Event()
 
     def __enter__(self):
         self.acquire()
@@ -20,13 +45,78 @@ class _LockBase(object):
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.release()
 
-    def acquire(self):
+    def __renewal_failed(self, e):
+        self.__lost_event.set()
+
+        if self.__on_lost is not None:
+            self.__on_lost(self, e)
+
+    @measure_operation('lock.acquire')
+    def acquire(self, blocking=True, timeout=None):
+        """Acquire the lock.
+
+        :param blocking: If False, only wait briefly (see 
+                         LOCK_NONBLOCKING_TIMEOUT_S).
+        :type blocking: bool
+
+        :param timeout: Seconds to wait, or None to wait indefinitely. Can't 
+                        be given if not blocking.
+        :type timeout: float or None
+
+        :returns: Whether the lock was acquired.
+        :rtype: bool
+
+        :raises: ValueError
+        """
+
+        if blocking is False:
+            if timeout is not None:
+                raise ValueError("A timeout can't be given for a "
+                                 "non-blocking acquire: %s" % (self.path,))
+
+            timeout = etcd.config.LOCK_NONBLOCKING_TIMEOUT_S
+
+        # If we give up waiting, the server discards our place in line when 
+        # the connection is closed.
+        try:
+            self._acquire(timeout)
+        except Timeout:
+            return False
+
+        self.__lost_event.clear()
+
+        # A reentrant lock may be acquired again while it's held.
+        if self.__renewer is not None:
+            self.__renewer.stop()
+            self.__renewer = None
+
+        if self.__auto_renew is True:
+            self.__renewer = Renewer(
+                                lambda: self.renew(self.ttl), 
+                                self.ttl * self.__renew_fraction, 
+                                on_failure=self.__renewal_failed)
+
+            self.__renewer.start()
+
+        return True
+
+    def _acquire(self, timeout):
         raise NotImplementedError()
 
     def renew(self, ttl):
         raise NotImplementedError()
 
+    @measure_operation('lock.release')
     def release(self):
+        """Release the lock, and stop renewing it."""
+
+        if self.__renewer is not None:
+            self.__renewer.stop()
+            self.__renewer = None
+
+        self._release()
+
+    def _release(self):
         raise NotImplementedError()
 
     @property
@@ -45,17 +135,39 @@ class _LockBase(object):
     def ttl(self):
         return self.__ttl
 
+    @property
+    def renew_fraction(self):
+        return self.__renew_fraction
+
+    @property
+    def is_lost(self):
+        """Whether an automatic renewal failed since the lock was acquired.
+
+        :rtype: bool
+        """
+
+        return self.__lost_event.is_set()
+
+    @property
+    def lost_event(self):
+        """An event that is set if an automatic renewal fails.
+
+        :rtype: threading.Event
+        """
+
+        return self.__lost_event
+
 
 class _Lock(_LockBase):
     """This lock will seek acquire an exclusive lock every time."""
 
-    def __init__(self, client, lock_name, ttl):
-        super(_Lock, self).__init__(client, lock_name, ttl)
+    def __init__(self, client, lock_name, ttl, **kwargs):
+        super(_Lock, self).__init__(client, lock_name, ttl, **kwargs)
 
         self.__index = None
 
-    def acquire(self):
-        self.client.debug("Acquiring lock: %s" % (self.path))
+    def _acquire(self, timeout):
+        _logger.debug("Acquiring lock: %s", self.path)
 
         parameters = { 'ttl': self.ttl }
 
@@ -65,23 +177,25 @@ class _Lock(_LockBase):
                                self.path, 
                                module='lock', 
                                parameters=parameters,
-                               return_raw=True)
+                               return_raw=True,
+                               timeout=timeout)
         except HTTPError as e:
           if e.response.status_code == codes.internal_server_error:
-            self.client.debug("There was a server-error while trying to "
-                              "ACQUIRE an index lock. Make sure the key "
-                              "hasn't been used for any other data: %s" % 
-                              (self.path))
+            _logger.debug("There was a server-error while trying to "
+                          "ACQUIRE an index lock. Make sure the key "
+                          "hasn't been used for any other data: %s", self.path)
 
           raise
         else:
           self.__index = int(r.text)
 
+    @measure_operation('lock.renew')
     def renew(self, ttl):
         if self.__index is None:
-          raise ValueError("Could not renew unacquired lock: %s" % (path))
+          raise ValueError("Could not renew unacquired lock: %s" % 
+                           (self.path))
 
-        self.client.debug("Renewing lock: %s" % (self.path))
+        _logger.debug("Renewing lock: %s", self.path)
 
         parameters = { 'ttl': ttl }
         data = { 'index': self.__index }
@@ -96,9 +210,9 @@ class _Lock(_LockBase):
                            return_raw=True)
         except HTTPError as e:
           if e.response.status_code == codes.internal_server_error:
-            self.client.debug("There was a server-error while trying to "
-                              "RENEW an index lock. Make sure the key "
-                              "has been acquired: %s" % (self.path))
+            _logger.debug("There was a server-error while trying to "
+                          "RENEW an index lock. Make sure the key "
+                          "has been acquired: %s", self.path)
 
           raise
 
@@ -114,20 +228,21 @@ class _Lock(_LockBase):
                                return_raw=True)
         except HTTPError as e:
           if e.response.status_code == codes.internal_server_error:
-            self.client.debug("There was a server-error while trying to "
-                              "get the active index of an index lock. Make "
-                              "sure the key hasn't been used for any other "
-                              "data: %s" % (self.path))
+            _logger.debug("There was a server-error while trying to "
+                          "get the active index of an index lock. Make "
+                          "sure the key hasn't been used for any other "
+                          "data: %s", self.path)
 
           raise
         else:
           return int(r.text) if r.text != '' else None
 
-    def release(self):
+    def _release(self):
         if self.__index is None:
-          raise ValueError("Could not release unacquired lock: %s" % (path))
+          raise ValueError("Could not release unacquired lock: %s" % 
+                           (self.path))
 
-        self.client.debug("Releasing lock: %s" % (self.path))
+        _logger.debug("Releasing lock: %s", self.path)
 
         parameters = { 'index': self.__index }
 
@@ -140,10 +255,9 @@ class _Lock(_LockBase):
                            return_raw=True)
         except HTTPError as e:
           if e.response.status_code == codes.internal_server_error:
-            self.client.debug("There was a server-error while trying to "
-                              "release an index lock. Make sure the key "
-                              "hasn't been used for any other data: %s" % 
-                              (self.path))
+            _logger.debug("There was a server-error while trying to "
+                          "release an index lock. Make sure the key "
+                          "hasn't been used for any other data: %s", self.path)
 
           raise
         finally:
@@ -155,14 +269,14 @@ class _ReentrantLock(_LockBase):
     anything with the same instance-value.
     """
 
-    def __init__(self, client, lock_name, instance_value, ttl):
-        super(_ReentrantLock, self).__init__(client, lock_name, ttl)
+    def __init__(self, client, lock_name, instance_value, ttl, **kwargs):
+        super(_ReentrantLock, self).__init__(client, lock_name, ttl, **kwargs)
 
         self.__instance_value = instance_value
 
-    def acquire(self):
-        self.client.debug("Acquiring rlock [%s]: %s" % 
-                          (self.__instance_value, self.path))
+    def _acquire(self, timeout):
+        _logger.debug("Acquiring rlock [%s]: %s",
+                      self.__instance_value, self.path)
 
         parameters = { 'ttl': self.ttl }
 
@@ -173,19 +287,21 @@ class _ReentrantLock(_LockBase):
                            module='lock', 
                            parameters=parameters,
                            value=self.__instance_value,
-                           return_raw=True)
+                           return_raw=True,
+                           timeout=timeout)
         except HTTPError as e:
           if e.response.status_code == codes.internal_server_error:
-            self.client.debug("There was a server-error while trying to "
-                              "ACQUIRE a value lock [%s]. Make sure the key "
-                              "hasn't been used for any other data: %s" % 
-                              (self.__instance_value, self.path))
+            _logger.debug("There was a server-error while trying to "
+                          "ACQUIRE a value lock [%s]. Make sure the key "
+                          "hasn't been used for any other data: %s",
+                          self.__instance_value, self.path)
 
           raise
 
+    @measure_operation('lock.renew')
     def renew(self, ttl):
-        self.client.debug("Renewing rlock [%s]: %s" % 
-                          (self.__instance_value, self.path))
+        _logger.debug("Renewing rlock [%s]: %s",
+                      self.__instance_value, self.path)
 
         parameters = { 'ttl': ttl }
 
@@ -199,10 +315,10 @@ class _ReentrantLock(_LockBase):
                            return_raw=True)
         except HTTPError as e:
           if e.response.status_code == codes.internal_server_error:
-            self.client.debug("There was a server-error while trying to "
-                              "RENEW a value lock [%s]. Make sure the key "
-                              "has been acquired: %s" % 
-                              (self.__instance_value, self.path))
+            _logger.debug("There was a server-error while trying to "
+                          "RENEW a value lock [%s]. Make sure the key "
+                          "has been acquired: %s",
+                          self.__instance_value, self.path)
 
           raise
 
@@ -215,19 +331,18 @@ class _ReentrantLock(_LockBase):
                                return_raw=True)
         except HTTPError as e:
           if e.response.status_code == codes.internal_server_error:
-            self.client.debug("There was a server-error while trying to "
-                              "get the active value of a value lock [%s]. "
-                              "Make sure the key hasn't been used for any "
-                              "other data: %s" % 
-                              (self.__instance_value, self.path))
+            _logger.debug("There was a server-error while trying to "
+                          "get the active value of a value lock [%s]. "
+                          "Make sure the key hasn't been used for any "
+                          "other data: %s", self.__instance_value, self.path)
 
           raise
 
         return r.text if r.text != '' else None
 
-    def release(self):
-        self.client.debug("Releasing rlock [%s]: %s" % 
-                          (self.__instance_value, self.path))
+    def _release(self):
+        _logger.debug("Releasing rlock [%s]: %s",
+                      self.__instance_value, self.path)
 
         parameters = { 'value': self.__instance_value }
 
@@ -240,10 +355,10 @@ class _ReentrantLock(_LockBase):
                            return_raw=True)
         except HTTPError as e:
           if e.response.status_code == codes.internal_server_error:
-            self.client.debug("There was a server-error while trying to "
-                              "release a value lock [%s]. Make "
-                              "sure the key hasn't been used for any other "
-                              "data: %s" % (self.__instance_value, self.path))
+            _logger.debug("There was a server-error while trying to "
+                          "release a value lock [%s]. Make "
+                          "sure the key hasn't been used for any other "
+                          "data: %s", self.__instance_value, self.path)
 
           raise
 
@@ -251,10 +366,17 @@ class _ReentrantLock(_LockBase):
 
 
 class LockMod(CommonOps):
-    def get_lock(self, lock_name, ttl):
-        return _Lock(self.client, lock_name, ttl)
-
-    def get_rlock(self, lock_name, instance_value, ttl):
-        return _ReentrantLock(self.client, lock_name, instance_value, ttl)
+    def get_lock(self, lock_name, ttl, auto_renew=False, 
+                 renew_fraction=etcd.config.LOCK_RENEW_FRACTION, 
+                 on_lost=None):
+        return _Lock(self.client, lock_name, ttl, auto_renew=auto_renew, 
+                     renew_fraction=renew_fraction, on_lost=on_lost)
+
+    def get_rlock(self, lock_name, instance_value, ttl, auto_renew=False, 
+                  renew_fraction=etcd.config.LOCK_RENEW_FRACTION, 
+                  on_lost=None):
+        return _ReentrantLock(self.client, lock_name, instance_value, ttl, 
+                              auto_renew=auto_renew, 
+                              renew_fraction=renew_fraction, on_lost=on_lost)
 
 # TODO: Is a lock deleted implicitly after expiration, or is it just somehow deactivated? I tried one key with the index lock, and I subsequently used the same key for a value lock, and I got a 500.
@@ -1,21 +1,63 @@
 import logging
+import threading
+
+from collections import namedtuple, OrderedDict
 
 from requests.exceptions import HTTPError, ChunkedEncodingError
 from requests.status_codes import codes
 
 import etcd.config
+import etcd.backoff
 
 from etcd.exceptions import EtcdPreconditionException, EtcdAtomicWriteError, \
                             translate_exceptions
 from etcd.common_ops import CommonOps
+from etcd.metrics import measure_operation
 from etcd.response import ResponseV2 
+from etcd.prepared import PreparedOperation
+from etcd.parallel import imap_unordered
+from etcd.write_behind import WriteBehindBuffer
+from etcd.ttl_refresher import TtlRefresher
 
 _logger = logging.getLogger(__name__)
 
+TransactionResult = namedtuple('TransactionResult', ['attempts', 'responses'])
+
 
 class NodeOps(CommonOps):
     """Common key-value functions."""
 
+    def __init__(self, *args, **kwargs):
+        super(NodeOps, self).__init__(*args, **kwargs)
+
+        # The (value, modified-index) written by the last successful atomic 
+        # update of each key, least-recently used first.
+        self.__known_states = OrderedDict()
+        self.__known_states_lock = threading.Lock()
+
+    def __get_known_state(self, path):
+        with self.__known_states_lock:
+            try:
+                state = self.__known_states.pop(path)
+            except KeyError:
+                return None
+
+            self.__known_states[path] = state
+            return state
+
+    def __set_known_state(self, path, state):
+        with self.__known_states_lock:
+            self.__known_states.pop(path, None)
+
+            if state is None:
+                return
+
+            self.__known_states[path] = state
+
+            while len(self.__known_states) > etcd.config.ATOMIC_CACHE_SIZE:
+                self.__known_states.popitem(last=False)
+
+    @measure_operation('node.get')
     @translate_exceptions
     def get(self, path, force_consistent=False, force_quorum=False):
         """Get the given node.
@@ -43,6 +85,54 @@ class NodeOps(CommonOps):
         fq_path = self.get_fq_node_path(path)
         return self.client.send(2, 'get', fq_path, parameters=parameters)
 
+    @measure_operation('node.get_value')
+    @translate_exceptions
+    def get_value(self, path, with_index=False, force_consistent=False,
+                  force_quorum=False):
+        """Get just the value of the given node. This skips building the
+        response and node objects (and parsing the expiration), so it's
+        cheaper than *get()* for keys that are read in a loop.
+
+        :param path: Node key
+        :type path: string
+
+        :param with_index: Also return the node's modified-index.
+        :type with_index: bool
+
+        :param force_consistent: Only interact with the current leader so
+                                 propagation is not a concern.
+        :type force_consistent: bool
+
+        :returns: The value, or the value and the modified-index
+        :rtype: string or tuple
+
+        :raises: KeyError, ValueError if the node is a directory
+        """
+
+        parameters = {}
+        if force_consistent is True:
+            parameters['consistent'] = 'true'
+
+        if force_quorum is True:
+            parameters['quorum'] = 'true'
+
+        fq_path = self.get_fq_node_path(path)
+        r = self.client.send(2, 'get', fq_path, parameters=parameters,
+                             return_raw=True)
+
+        node = r.json()['node']
+
+        try:
+            value = node['value']
+        except KeyError:
+            raise ValueError("Node is a directory: %s" % (path,))
+
+        if with_index is True:
+            return (value, node['modifiedIndex'])
+
+        return value
+
+    @measure_operation('node.set')
     @translate_exceptions
     def set(self, path, value, ttl=None):
         """Set the given node.
@@ -68,6 +158,63 @@ class NodeOps(CommonOps):
 
         return self.client.send(2, 'put', fq_path, value, data=data)
 
+    def prepare_get(self, path, force_consistent=False, force_quorum=False):
+        """Build a get of the given node once, for keys that are read 
+        repeatedly. Sending it is cheaper than calling *get()*, and has the 
+        same result.
+
+        :param path: Node key
+        :type path: string
+
+        :param force_consistent: Only interact with the current leader so 
+                                 propagation is not a concern.
+        :type force_consistent: bool
+
+        :returns: Prepared operation
+        :rtype: :class:`etcd.prepared.PreparedOperation`
+        """
+
+        parameters = {}
+        if force_consistent is True:
+            parameters['consistent'] = 'true'
+
+        if force_quorum is True:
+            parameters['quorum'] = 'true'
+
+        fq_path = self.get_fq_node_path(path)
+        request = self.client.prepare(2, 'get', fq_path, 
+                                      parameters=parameters)
+
+        return PreparedOperation(self, 'node.get', path, request)
+
+    def prepare_set(self, path, value, ttl=None):
+        """Build a set of the given node to the given value once, for keys 
+        that are written repeatedly (like heartbeats). Sending it is cheaper 
+        than calling *set()*, and has the same result.
+
+        :param path: Node key
+        :type path: string
+
+        :param value: Value to assign
+        :type value: scalar
+
+        :param ttl: Number of seconds until expiration
+        :type ttl: int or None
+
+        :returns: Prepared operation
+        :rtype: :class:`etcd.prepared.PreparedOperation`
+        """
+
+        fq_path = self.get_fq_node_path(path)
+        data = { }
+
+        if ttl is not None:
+            data['ttl'] = ttl
+
+        request = self.client.prepare(2, 'put', fq_path, value, data=data)
+        return PreparedOperation(self, 'node.set', path, request)
+
+    @measure_operation('node.delete')
     @translate_exceptions
     def delete(self, path, current_value=None, current_index=None):
         """Delete the given node.
@@ -93,6 +240,7 @@ class NodeOps(CommonOps):
         fq_path = self.get_fq_node_path(path)
         return self.client.send(2, 'delete', fq_path)
 
+    @measure_operation('node.delete_if_value')
     @translate_exceptions
     def delete_if_value(self, path, current_value):
         """Only delete the given node if it's at the given value. 
@@ -110,6 +258,7 @@ class NodeOps(CommonOps):
         return self.compare_and_delete(path, is_dir=False, 
                                        current_value=current_value)
 
+    @measure_operation('node.delete_if_index')
     @translate_exceptions
     def delete_if_index(self, path, current_index):
         """Only delete the given node if it's at the given index. 
@@ -127,6 +276,7 @@ class NodeOps(CommonOps):
         return self.compare_and_delete(path, is_dir=False, 
                                        current_index=current_index)
 
+    @measure_operation('node.compare_and_swap')
     @translate_exceptions
     def compare_and_swap(self, path, value, current_value=None, 
                          current_index=None, prev_exists=None, ttl=None):
@@ -181,6 +331,7 @@ class NodeOps(CommonOps):
         return self.client.send(2, 'put', fq_path, value, data=data, 
                                 parameters=parameters)
 
+    @measure_operation('node.create_only')
     @translate_exceptions
     def create_only(self, path, value, ttl=None):
         """A convenience function that will only set a node if it doesn't 
@@ -202,6 +353,7 @@ class NodeOps(CommonOps):
         # This will have a return "action" of "create".
         return self.compare_and_swap(path, value, prev_exists=False, ttl=ttl)
 
+    @measure_operation('node.update_only')
     @translate_exceptions
     def update_only(self, path, value, ttl=None):
         """A convenience function that will only set a node if it already
@@ -223,6 +375,7 @@ class NodeOps(CommonOps):
         # This will have a return "action" of "update".
         return self.compare_and_swap(path, value, prev_exists=True, ttl=ttl)
 
+    @measure_operation('node.update_if_index')
     @translate_exceptions
     def update_if_index(self, path, value, current_index, ttl=None):
         """A convenience function that will only set a node if its existing
@@ -247,6 +400,7 @@ class NodeOps(CommonOps):
         # This will have a return "action" of "compareAndSwap".
         return self.compare_and_swap(path, value, current_index=current_index, ttl=ttl)
 
+    @measure_operation('node.update_if_value')
     @translate_exceptions
     def update_if_value(self, path, value, current_value, ttl=None):
         """A convenience function that will only set a node if its existing value
@@ -271,38 +425,304 @@ class NodeOps(CommonOps):
         # This will have a return "action" of "compareAndSwap".
         return self.compare_and_swap(path, value, current_value=current_value, ttl=ttl)
 
-    @translate_exceptions
-    def wait(self, path, force_consistent=False):
-        return super(NodeOps, self).wait(path, force_consistent=force_consistent)
+    def get_write_behind_buffer(
+            self, 
+            flush_interval_s=etcd.config.WRITE_BEHIND_FLUSH_INTERVAL_S,
+            max_concurrency=etcd.config.BULK_MAX_CONCURRENCY):
+        """Get a buffer that coalesces frequent sets and writes them in the 
+        background.
+
+        :param flush_interval_s: Seconds between flushes
+        :type flush_interval_s: float
 
+        :param max_concurrency: Maximum number of concurrent writes per flush
+        :type max_concurrency: int
+
+        :returns: Buffer
+        :rtype: :class:`etcd.write_behind.WriteBehindBuffer`
+        """
+
+        return WriteBehindBuffer(self.client, 
+                                 flush_interval_s=flush_interval_s, 
+                                 max_concurrency=max_concurrency)
+
+    def get_ttl_refresher(
+            self, 
+            refresh_fraction=etcd.config.TTL_REFRESH_FRACTION,
+            jitter=etcd.config.TTL_REFRESH_JITTER,
+            max_concurrency=etcd.config.BULK_MAX_CONCURRENCY):
+        """Get a scheduler that keeps many TTL'd keys alive from a single 
+        thread.
+
+        :param refresh_fraction: Fraction of the TTL between refreshes
+        :type refresh_fraction: float
+
+        :param jitter: Fraction of the refresh interval to randomize by
+        :type jitter: float
+
+        :param max_concurrency: Maximum number of concurrent refreshes
+        :type max_concurrency: int
+
+        :returns: Refresher
+        :rtype: :class:`etcd.ttl_refresher.TtlRefresher`
+        """
+
+        return TtlRefresher(self.client, 
+                            refresh_fraction=refresh_fraction, 
+                            jitter=jitter, 
+                            max_concurrency=max_concurrency)
+
+    @translate_exceptions
+    def wait(self, path, force_consistent=False, wait_index=None, 
+             timeout=None):
+        return super(NodeOps, self).wait(path, 
+                                         force_consistent=force_consistent, 
+                                         wait_index=wait_index, 
+                                         timeout=timeout)
+
+    @measure_operation('node.atomic_update')
     @translate_exceptions
     def atomic_update(self, path, update_value_cb,
-                      max_attempts=etcd.config.ATOMIC_MAX_ATTEMPTS, ttl=None):
+                      max_attempts=etcd.config.ATOMIC_MAX_ATTEMPTS, ttl=None,
+                      current_value=None, current_index=None, use_cache=False,
+                      backoff_base_s=etcd.config.ATOMIC_BACKOFF_BASE_S,
+                      backoff_max_s=etcd.config.ATOMIC_BACKOFF_MAX_S):
         """Retrieve the value for the given path, pass it to the callback, get 
         an update value back, and try updating. Loop until the update can be 
-        performed atomically.
+        performed atomically, waiting a randomized, exponentially-increasing 
+        delay after each conflict so that contending clients spread out.
+
+        If the current value and index are already known, the first attempt 
+        skips the read. They can be passed explicitly (both of them), or, with
+        *use_cache*, remembered from the last successful update of the same
+        key by this client (for the most recently used keys, up to 
+        ATOMIC_CACHE_SIZE of them). If they turn out to be stale, the write is
+        rejected, they're forgotten, and we fall back to reading.
 
         :param path: Node key
         :type path: string
 
         :param update_value_cb: Callback
         :type update_value_cb: callback
+
+        :param max_attempts: Number of writes to attempt
+        :type max_attempts: int
+
+        :param ttl: The number of seconds until the node expires
+        :type ttl: int or None
+
+        :param current_value: Known value of the node
+        :type current_value: scalar or None
+
+        :param current_index: Known modified-index of the node
+        :type current_index: int or None
+
+        :param use_cache: Use and remember the state from successful updates.
+        :type use_cache: bool
+
+        :param backoff_base_s: Ceiling of the first delay
+        :type backoff_base_s: float
+
+        :param backoff_max_s: Largest ceiling of the delay
+        :type backoff_max_s: float
+
+        :returns: Response object
+        :rtype: :class:`etcd.response.ResponseV2`
+
+        :raises: :class:`etcd.exceptions.EtcdAtomicWriteError`, ValueError if 
+                 only one of *current_value* and *current_index* is given
         """
 
-        i = max_attempts
-        while i > 0:
-            response = self.get(path)
-            value = update_value_cb(response.node.value)
+        if (current_value is None) != (current_index is None):
+            raise ValueError("The current value and index must be given "
+                             "together: %s" % (path,))
+
+        if current_index is not None:
+            known_state = (current_value, current_index)
+        elif use_cache is True:
+            known_state = self.__get_known_state(path)
+        else:
+            known_state = None
+
+        for attempt in range(max_attempts):
+            if attempt > 0:
+                etcd.backoff.sleep(attempt - 1, backoff_base_s, backoff_max_s)
+
+            if known_state is not None:
+                (current_value, current_index) = known_state
+                known_state = None
+            else:
+                response = self.get(path)
+                current_value = response.node.value
+                current_index = response.node.modified_index
+
+            value = update_value_cb(current_value)
 
             try:
-                return self.update_if_index(
-                        path, 
-                        value, 
-                        response.node.modified_index, 
-                        ttl=ttl)
+                response = self.update_if_index(
+                            path, 
+                            value, 
+                            current_index, 
+                            ttl=ttl)
             except EtcdPreconditionException:
-                pass
+                # The error only describes the conflict (not the current 
+                # value), so we have to read the node again. What we 
+                # remembered is stale.
+                _logger.debug("Atomic update of [%s] conflicted on attempt "
+                              "(%d).", path, attempt + 1)
+
+                if use_cache is True:
+                    self.__set_known_state(path, None)
+
+                continue
+
+            if use_cache is True:
+                self.__set_known_state(path, 
+                                       (response.node.value, 
+                                        response.node.modified_index))
 
-            i -= 1
+            return response
 
-        raise EtcdAtomicWriteError("Atomic update failed (%d): %s" % (i, path))
+        raise EtcdAtomicWriteError("Atomic update failed (%d): %s" % 
+                                   (max_attempts, path))
+
+    @measure_operation('node.transaction')
+    def transaction(self, paths, update_values_cb, 
+                    max_attempts=etcd.config.ATOMIC_MAX_ATTEMPTS, 
+                    backoff_base_s=etcd.config.ATOMIC_BACKOFF_BASE_S,
+                    backoff_max_s=etcd.config.ATOMIC_BACKOFF_MAX_S):
+        """Optimistically update several keys together. The keys are read 
+        concurrently and passed to the callback, which returns the new values. 
+        Those are then written concurrently, each on the condition that its 
+        key hasn't changed since it was read. If any write conflicts, the 
+        writes that succeeded are reverted (again, conditionally), and we 
+        back off and start over.
+
+        The callback receives a dictionary of keys to values (None if a key 
+        doesn't exist), and returns a dictionary of the keys to change, with a 
+        value of None to delete one. It may be called more than once.
+
+        Changed keys keep their TTLs (what remained of them when they were 
+        read), and so do keys that are restored by a revert.
+
+        This doesn't provide isolation: other clients may observe some of the 
+        writes before all of them are done, or before they're reverted.
+
+        :param paths: Node keys
+        :type paths: list
+
+        :param update_values_cb: Callback
+        :type update_values_cb: callback
+
+        :param max_attempts: Number of times to try
+        :type max_attempts: int
+
+        :param backoff_base_s: Ceiling of the first delay
+        :type backoff_base_s: float
+
+        :param backoff_max_s: Largest ceiling of the delay
+        :type backoff_max_s: float
+
+        :returns: The number of attempts that were needed, and a dictionary of 
+                  the changed keys to the responses of their writes.
+        :rtype: :class:`etcd.node_ops.TransactionResult`
+
+        :raises: :class:`etcd.exceptions.EtcdAtomicWriteError`
+        """
+
+        paths = list(paths)
+        max_concurrency = len(paths) or 1
+
+        def read(path):
+            try:
+                return self.get(path).node
+            except KeyError:
+                return None
+
+        def write(entry):
+            (path, value, node) = entry
+
+            # An update replaces the TTL, so we keep what remained of it.
+            if node is None:
+                return self.create_only(path, value)
+            elif value is None:
+                return self.delete_if_index(path, node.modified_index)
+            else:
+                return self.update_if_index(path, value, node.modified_index, 
+                                            ttl=node.ttl)
+
+        def revert(entry):
+            (path, value, node, response) = entry
+            index = response.node.modified_index
+
+            if node is None:
+                self.delete_if_index(path, index)
+            elif value is None:
+                self.create_only(path, node.value, ttl=node.ttl)
+            else:
+                self.update_if_index(path, node.value, index, ttl=node.ttl)
+
+        for attempt in range(max_attempts):
+            if attempt > 0:
+                etcd.backoff.sleep(attempt - 1, backoff_base_s, backoff_max_s)
+
+            nodes = {}
+            for (path, node, e) in imap_unordered(read, paths, 
+                                                  max_concurrency):
+                if e is not None:
+                    raise e
+
+                nodes[path] = node
+
+            current_values = dict((path, node.value if node is not None 
+                                                    else None)
+                                  for (path, node) 
+                                  in nodes.items())
+
+            writes = []
+            for (path, value) in update_values_cb(current_values).items():
+                if path not in nodes:
+                    raise ValueError("Key was not read as part of the "
+                                     "transaction: %s" % (path,))
+
+                if value is None and nodes[path] is None:
+                    continue
+
+                writes.append((path, value, nodes[path]))
+
+            responses = {}
+            written = []
+            conflicted = False
+            error = None
+            for (entry, response, e) in imap_unordered(write, writes, 
+                                                       len(writes) or 1):
+                if e is None:
+                    responses[entry[0]] = response
+                    written.append(entry + (response,))
+                elif isinstance(e, (EtcdPreconditionException, KeyError)):
+                    conflicted = True
+                else:
+                    error = e
+
+            if conflicted is False and error is None:
+                return TransactionResult(attempts=attempt + 1, 
+                                         responses=responses)
+
+            _logger.debug("Transaction on %s conflicted on attempt (%d). "
+                          "Reverting (%d) writes.", 
+                          paths, attempt + 1, len(written))
+
+            # If a revert conflicts, someone else has already overwritten our 
+            # value, which is just as good.
+            for (entry, result, e) in imap_unordered(revert, written, 
+                                                     len(written) or 1):
+                if e is not None and \
+                   isinstance(e, (EtcdPreconditionException, KeyError)) is \
+                        False:
+                    error = error or e
+
+            if error is not None:
+                raise error
+
+        raise EtcdAtomicWriteError("Transaction failed (%d): %s" % 
+                                   (max_attempts, paths))
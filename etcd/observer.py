@@ -0,0 +1,148 @@
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+
+class RequestInfo(object):
+    """Describes a single call to :meth:`etcd.client.Client.send`, which may
+    span several attempts if the client fails over to other members. It's
+    updated as the request progresses, and passed to every observer
+    callback.
+
+    Requests doesn't report the connect and TLS handshake times separately,
+    so they're included in the time to the first byte of the response
+    whenever a new connection had to be made.
+
+    :param verb: Request verb ('get', 'post', etc..)
+    :type verb: string
+
+    :param path: URL path (after the version and module)
+    :type path: string
+
+    :param module: Name of the etcd module, or None
+    :type module: string or None
+    """
+
+    def __init__(self, verb, path, module):
+        self.verb = verb
+        self.path = path
+        self.module = module
+
+        self.started_at = time.time()
+
+        # The member (URL prefix) of the current or last attempt.
+        self.member = None
+
+        self.attempts = 0
+        self.failovers = 0
+
+        self.status_code = None
+
+        # The cluster index reported with the response.
+        self.etcd_index = None
+
+        self.request_bytes = None
+        self.response_bytes = None
+
+        # The seconds until the response headers arrived, the seconds spent
+        # decoding the response, and the seconds for the whole call.
+        self.first_byte_s = None
+        self.decode_s = None
+        self.elapsed_s = None
+
+        # The exception that the call raised, if any.
+        self.error = None
+
+    def __repr__(self):
+        return ('<REQUEST [%s] [%s] MEMBER=[%s] STATUS=(%s) ATTEMPTS=(%d) '
+                'ELAPSED=(%s)>' %
+                (self.verb, self.path, self.member, self.status_code,
+                 self.attempts, self.elapsed_s))
+
+    @property
+    def path_template(self):
+        """The path with the key replaced by a placeholder, so that it can
+        name a metric without creating one per key.
+
+        :rtype: string
+        """
+
+        if self.module is not None:
+            prefix = '/mod/' + self.module
+            if self.path in ('', '/'):
+                return prefix
+
+            return prefix + '/{key}'
+
+        if self.path.startswith('/keys/') is True:
+            return '/keys/{key}'
+
+        return self.path
+
+
+class RequestObserver(object):
+    """The base-class of request observers. Register them with
+    :meth:`etcd.client.Client.add_observer`, and override the callbacks of
+    interest. Callbacks are called from the thread making the request, so they
+    should be quick. Exceptions that they raise are logged and ignored.
+    """
+
+    def request_started(self, info):
+        """Called before the first attempt.
+
+        :param info: Request information
+        :type info: :class:`etcd.observer.RequestInfo`
+        """
+
+        pass
+
+    def attempt_started(self, info):
+        """Called before every attempt, after *info.member* has been set.
+
+        :param info: Request information
+        :type info: :class:`etcd.observer.RequestInfo`
+        """
+
+        pass
+
+    def attempt_finished(self, info, exception):
+        """Called after every attempt.
+
+        :param info: Request information
+        :type info: :class:`etcd.observer.RequestInfo`
+
+        :param exception: The exception that failed the attempt (like a 
+                          connection error or a timeout), or None if a 
+                          response was received.
+        :type exception: Exception or None
+        """
+
+        pass
+
+    def request_finished(self, info):
+        """Called after the request has completed or failed.
+
+        :param info: Request information
+        :type info: :class:`etcd.observer.RequestInfo`
+        """
+
+        pass
+
+
+def notify(observers, callback_name, *args):
+    """Call the given callback on every observer, logging any failures.
+
+    :param observers: Observers
+    :type observers: list
+
+    :param callback_name: Name of the callback
+    :type callback_name: string
+    """
+
+    for observer in observers:
+        try:
+            getattr(observer, callback_name)(*args)
+        except Exception:
+            _logger.exception("Request observer [%s] failed: %s",
+                              observer, callback_name)
@@ -0,0 +1,143 @@
+import threading
+import time
+
+from etcd.compat import Queue, Full
+
+_QUEUE_POLL_INTERVAL_S = .25
+
+_DONE = object()
+
+
+class _IterationError(object):
+    """Carries an exception raised by the source iterable back to the
+    consumer.
+    """
+
+    def __init__(self, exception):
+        self.exception = exception
+
+
+def imap_unordered(func, items, max_concurrency):
+    """Call the function for every item using a bounded pool of threads, and
+    yield `(item, result, exception)` tuples as the calls complete. At most
+    `max_concurrency` calls are ever in-flight, and the items are consumed
+    lazily so that a long iterable (like a walk) is never materialized.
+
+    Exceptions raised by the function are returned in the tuple. Exceptions
+    raised by the iterable stop the pool and are re-raised to the consumer.
+
+    :param func: Callable taking a single item
+    :type func: callable
+
+    :param items: Items to process
+    :type items: iterable
+
+    :param max_concurrency: Maximum number of concurrent calls
+    :type max_concurrency: int
+
+    :returns: Generator of (item, result, exception) tuples
+    :rtype: generator
+
+    :raises: ValueError
+    """
+
+    if max_concurrency < 1:
+        raise ValueError("Concurrency must be at least one: (%d)" %
+                         (max_concurrency,))
+
+    items = iter(items)
+    items_lock = threading.Lock()
+    results = Queue(maxsize=max_concurrency)
+    stop_event = threading.Event()
+
+    def put(entry):
+        while stop_event.is_set() is False:
+            try:
+                results.put(entry, timeout=_QUEUE_POLL_INTERVAL_S)
+            except Full:
+                pass
+            else:
+                return True
+
+        return False
+
+    def work():
+        try:
+            while stop_event.is_set() is False:
+                with items_lock:
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        break
+                    except Exception as e:
+                        error = e
+                    else:
+                        error = None
+
+                if error is not None:
+                    put(_IterationError(error))
+                    stop_event.set()
+                    break
+
+                try:
+                    result = func(item)
+                except Exception as e:
+                    entry = (item, None, e)
+                else:
+                    entry = (item, result, None)
+
+                if put(entry) is False:
+                    break
+        finally:
+            put(_DONE)
+
+    threads = []
+    for i in range(max_concurrency):
+        t = threading.Thread(target=work)
+        t.daemon = True
+        t.start()
+
+        threads.append(t)
+
+    remaining = len(threads)
+
+    try:
+        while remaining > 0:
+            entry = results.get()
+            if entry is _DONE:
+                remaining -= 1
+                continue
+            elif isinstance(entry, _IterationError):
+                raise entry.exception
+
+            yield entry
+    finally:
+        stop_event.set()
+
+
+class RateLimiter(object):
+    """Paces callers, across threads, so that no more than the given number of
+    operations start per second.
+
+    :param rate: Operations per second
+    :type rate: float
+    """
+
+    def __init__(self, rate):
+        if rate <= 0:
+            raise ValueError("Rate must be positive: (%s)" % (rate,))
+
+        self.__interval_s = 1.0 / rate
+        self.__next_at = time.time()
+        self.__lock = threading.Lock()
+
+    def wait(self):
+        """Block until the caller is allowed to proceed."""
+
+        with self.__lock:
+            now = time.time()
+            at = max(now, self.__next_at)
+            self.__next_at = at + self.__interval_s
+
+        if at > now:
+            time.sleep(at - now)
@@ -0,0 +1,163 @@
+import requests
+
+from etcd.exceptions import translate_exceptions
+from etcd.metrics import measure_operation
+
+
+class PreparedRequest(object):
+    """A request that's built once, and can then be sent many times without
+    building its URL, encoding its parameters, or collecting the proxy and SSL
+    settings again. It's only rebuilt when the client has moved to another
+    member since it was last sent. It can be sent from several threads at
+    once.
+
+    Create with :meth:`etcd.client.Client.prepare`.
+    """
+
+    def __init__(self, client, verb, path, url_suffix, parameters=None,
+                 data=None, module=None, return_raw=False,
+                 allow_reconnect=True, timeout=None, verify=True, cert=None):
+        self.__client = client
+        self.__verb = verb
+        self.__path = path
+        self.__url_suffix = url_suffix
+        self.__parameters = dict(parameters) if parameters is not None else {}
+        self.__data = dict(data) if data is not None else {}
+        self.__module = module
+        self.__return_raw = return_raw
+        self.__allow_reconnect = allow_reconnect
+        self.__timeout = timeout
+        self.__verify = verify
+        self.__cert = cert
+
+        # The (prefix, Requests prepared-request, send arguments) last built.
+        # Replaced as a whole, so that it can be read without locking.
+        self.__built = None
+
+    def __repr__(self):
+        return ('<PREPARED [%s] [%s]>' % (self.__verb, self.__url_suffix))
+
+    def __build(self, prefix):
+        session = self.__client.session
+
+        request = requests.Request(self.__verb.upper(),
+                                   prefix + self.__url_suffix,
+                                   params=self.__parameters,
+                                   data=self.__data)
+
+        prepared = session.prepare_request(request)
+
+        kwargs = session.merge_environment_settings(
+                    prepared.url, {}, None, self.__verify, self.__cert)
+
+        if self.__timeout is not None:
+            kwargs['timeout'] = self.__timeout
+
+        return (prefix, prepared, kwargs)
+
+    def send(self):
+        """Send the request.
+
+        :returns: Response object
+        :rtype: :class:`etcd.response.ResponseV2`
+        """
+
+        return self.__client.send_prepared(self)
+
+    def send_to(self, prefix):
+        """Make a single attempt with the given member. This is called by the
+        client.
+
+        :param prefix: URL prefix of the member
+        :type prefix: string
+
+        :returns: Raw Requests response
+        :rtype: requests.models.Response
+        """
+
+        built = self.__built
+        if built is None or built[0] != prefix:
+            built = self.__build(prefix)
+            self.__built = built
+
+        (prefix, prepared, kwargs) = built
+        return self.__client.session.send(prepared, **kwargs)
+
+    @property
+    def verb(self):
+        return self.__verb
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def url_suffix(self):
+        return self.__url_suffix
+
+    @property
+    def module(self):
+        return self.__module
+
+    @property
+    def return_raw(self):
+        return self.__return_raw
+
+    @property
+    def allow_reconnect(self):
+        return self.__allow_reconnect
+
+
+def _send(operation, path):
+    return operation.request.send()
+
+
+class PreparedOperation(object):
+    """A prepared request for an operation on a key (like "node.get"). It's
+    measured and traced like the operation, and raises the same exceptions.
+
+    :param ops: The ops object that prepared it
+    :type ops: :class:`etcd.common_ops.CommonOps`
+
+    :param name: Name of the operation, for metrics and tracing
+    :type name: string
+
+    :param path: Key
+    :type path: string
+
+    :param request: Prepared request
+    :type request: :class:`etcd.prepared.PreparedRequest`
+    """
+
+    def __init__(self, ops, name, path, request):
+        self.__ops = ops
+        self.__path = path
+        self.__request = request
+
+        self.__send = measure_operation(name)(translate_exceptions(_send))
+
+    def __repr__(self):
+        return ('<PREPARED-OPERATION [%s] %s>' % (self.__path, self.__request))
+
+    def send(self):
+        """Send the request.
+
+        :returns: Response object
+        :rtype: :class:`etcd.response.ResponseV2`
+
+        :raises: KeyError, :class:`etcd.exceptions.EtcdPreconditionException`
+        """
+
+        return self.__send(self, self.__path)
+
+    @property
+    def client(self):
+        return self.__ops.client
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def request(self):
+        return self.__request
@@ -0,0 +1,6 @@
+"""
+.. module:: Recipes Package
+.. moduleauthor:: Dustin Oprea <myselfasunder@gmail.com>
+
+Coordination recipes built purely on the keys API.
+"""
@@ -0,0 +1,282 @@
+import logging
+import threading
+import time
+
+from requests.exceptions import Timeout
+
+import etcd.config
+
+from etcd.common_ops import CommonOps
+from etcd.exceptions import EtcdPreconditionException, \
+                            EtcdEventIndexClearedException, \
+                            EtcdWaitFaultException
+
+_logger = logging.getLogger(__name__)
+
+# How long to wait before retrying after an unexpected error.
+_ERROR_RETRY_INTERVAL_S = 1
+
+
+class LeaderElection(object):
+    """Campaigns for leadership of a key from a background thread. The key
+    holds the leader's value and has a TTL, which the leader renews. Both the
+    leader and the followers watch the key rather than polling it: the leader
+    notices if it's deleted or overwritten, and the followers campaign as soon
+    as it's deleted or expires.
+
+    *on_elected* is called when this candidate becomes the leader, and
+    *on_lost* when it stops being the leader (including when it resigns).
+    Both receive the election, and are called from the election thread.
+
+    :param client: Client instance
+    :type client: :class:`etcd.client.Client`
+
+    :param name: Name of the election (its key, without the leading slash)
+    :type name: string
+
+    :param value: Value identifying this candidate
+    :type value: string
+
+    :param ttl: Seconds that the leadership survives without renewal
+    :type ttl: int
+
+    :param on_elected: Callback
+    :type on_elected: callable or None
+
+    :param on_lost: Callback
+    :type on_lost: callable or None
+
+    :param renew_fraction: Fraction of the TTL between renewals
+    :type renew_fraction: float
+    """
+
+    def __init__(self, client, name, value, ttl, on_elected=None,
+                 on_lost=None, renew_fraction=etcd.config.LOCK_RENEW_FRACTION):
+        self.__client = client
+        self.__name = name
+        self.__path = '/' + name
+        self.__value = value
+        self.__ttl = ttl
+        self.__on_elected = on_elected
+        self.__on_lost = on_lost
+        self.__renew_interval_s = ttl * renew_fraction
+
+        self.__is_leader = False
+        self.__resign_on_stop = True
+        self.__stop_event = threading.Event()
+        self.__thread = None
+
+    def __call(self, cb):
+        if cb is None:
+            return
+
+        try:
+            cb(self)
+        except Exception:
+            _logger.exception("Election callback failed: %s", self.__path)
+
+    def __run(self):
+        while self.__stop_event.is_set() is False:
+            try:
+                self.__campaign()
+            except Exception:
+                _logger.exception("Election failed. Retrying: %s",
+                                  self.__path)
+
+                self.__stop_event.wait(_ERROR_RETRY_INTERVAL_S)
+
+    def __campaign(self):
+        node_ops = self.__client.node
+
+        try:
+            r = node_ops.create_only(self.__path, self.__value, ttl=self.__ttl)
+        except EtcdPreconditionException:
+            self.__follow()
+        else:
+            _logger.debug("Elected: %s", self.__path)
+
+            self.__is_leader = True
+            self.__call(self.__on_elected)
+
+            try:
+                self.__lead(r.node.modified_index)
+            finally:
+                self.__is_leader = False
+
+                if self.__stop_event.is_set() is True and \
+                   self.__resign_on_stop is True:
+                    try:
+                        node_ops.delete_if_value(self.__path, self.__value)
+                    except (EtcdPreconditionException, KeyError):
+                        pass
+
+                self.__call(self.__on_lost)
+
+    def __follow(self):
+        """Return when the key has gone away."""
+
+        node_ops = self.__client.node
+
+        try:
+            r = node_ops.get(self.__path)
+        except KeyError:
+            return
+
+        wait_index = r.etcd_index + 1 if r.etcd_index is not None \
+                                      else r.node.modified_index + 1
+
+        while self.__stop_event.is_set() is False:
+            try:
+                r = node_ops.wait(self.__path, wait_index=wait_index,
+                                  timeout=self.__renew_interval_s)
+            except Timeout:
+                continue
+            except (EtcdEventIndexClearedException, EtcdWaitFaultException):
+                return
+
+            if r.node.is_deleted is True:
+                return
+
+            # The leader renewed.
+            wait_index = r.node.modified_index + 1
+
+    def __lead(self, modified_index):
+        """Renew the key until stopped, and return if the leadership is lost.
+        """
+
+        node_ops = self.__client.node
+
+        wait_index = modified_index + 1
+        renewed_at = time.time()
+        renew_at = renewed_at + self.__renew_interval_s
+
+        while self.__stop_event.is_set() is False:
+            now = time.time()
+
+            if now >= renew_at:
+                try:
+                    r = node_ops.compare_and_swap(
+                            self.__path,
+                            self.__value,
+                            current_value=self.__value,
+                            ttl=self.__ttl)
+                except (EtcdPreconditionException, KeyError):
+                    _logger.debug("Leadership lost: %s", self.__path)
+                    return
+                except Exception as e:
+                    if now - renewed_at >= self.__ttl:
+                        _logger.warning("Could not renew leadership before "
+                                        "it expired: %s", self.__path)
+                        return
+
+                    _logger.warning("Could not renew leadership: %s", e)
+                    renew_at = now + min(_ERROR_RETRY_INTERVAL_S,
+                                         self.__renew_interval_s)
+                else:
+                    wait_index = r.node.modified_index + 1
+                    renewed_at = now
+                    renew_at = now + self.__renew_interval_s
+
+                continue
+
+            try:
+                r = node_ops.wait(self.__path, wait_index=wait_index,
+                                  timeout=renew_at - now)
+            except Timeout:
+                continue
+            except (EtcdEventIndexClearedException, EtcdWaitFaultException):
+                # Our next renewal will tell us if we're still the leader.
+                renew_at = now
+                continue
+
+            if r.node.is_deleted is True or r.node.value != self.__value:
+                _logger.debug("Leadership lost: %s", self.__path)
+                return
+
+            wait_index = r.node.modified_index + 1
+
+    def start(self):
+        """Start campaigning."""
+
+        if self.__thread is not None:
+            raise ValueError("Election was already started.")
+
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self, resign=True):
+        """Stop campaigning, and wait for the election thread to finish (which
+        can take up to the renewal interval).
+
+        :param resign: If we're the leader, delete the key so that another
+                       candidate can take over immediately, rather than after
+                       it expires.
+        :type resign: bool
+        """
+
+        self.__resign_on_stop = resign
+        self.__stop_event.set()
+
+        # Resign from here, rather than waiting for the election thread to
+        # notice, so that another candidate can take over immediately.
+        if resign is True and self.__is_leader is True:
+            try:
+                self.__client.node.delete_if_value(self.__path, self.__value)
+            except (EtcdPreconditionException, KeyError):
+                pass
+
+        if self.__thread is not None:
+            self.__thread.join()
+
+    @property
+    def is_leader(self):
+        """Whether this candidate is currently the leader.
+
+        :rtype: bool
+        """
+
+        return self.__is_leader
+
+    @property
+    def name(self):
+        return self.__name
+
+    @property
+    def value(self):
+        return self.__value
+
+
+class ElectionRecipe(CommonOps):
+    """Leader elections that are built on the keys API."""
+
+    def get_election(self, name, value, ttl, on_elected=None, on_lost=None,
+                     renew_fraction=etcd.config.LOCK_RENEW_FRACTION):
+        """Get a candidate for the given election. Call *start()* to begin
+        campaigning.
+
+        :param name: Name of the election (its key, without the leading slash)
+        :type name: string
+
+        :param value: Value identifying this candidate
+        :type value: string
+
+        :param ttl: Seconds that the leadership survives without renewal
+        :type ttl: int
+
+        :param on_elected: Callback
+        :type on_elected: callable or None
+
+        :param on_lost: Callback
+        :type on_lost: callable or None
+
+        :param renew_fraction: Fraction of the TTL between renewals
+        :type renew_fraction: float
+
+        :returns: Election
+        :rtype: :class:`etcd.recipes.election.LeaderElection`
+        """
+
+        return LeaderElection(self.client, name, value, ttl,
+                              on_elected=on_elected, on_lost=on_lost,
+                              renew_fraction=renew_fraction)
@@ -0,0 +1,228 @@
+import logging
+import time
+
+from requests.exceptions import Timeout
+
+import etcd.config
+
+from etcd.common_ops import CommonOps
+from etcd.exceptions import EtcdEventIndexClearedException, \
+                            EtcdWaitFaultException
+from etcd.metrics import measure_operation
+from etcd.modules.lock import _LockBase
+
+_logger = logging.getLogger(__name__)
+
+
+class _InOrderLockBase(_LockBase):
+    """The base of the locks that are built on in-order keys. Each contender 
+    adds a TTL'd in-order key to the lock's directory, and the contenders 
+    with the *limit* oldest keys hold the lock. The subclasses decide how to 
+    wait for a turn.
+
+    The contender's key is kept alive while it waits. Once acquired, it 
+    expires unless the lock is renewed (see *auto_renew*).
+    """
+
+    def __init__(self, client, lock_name, ttl, limit, value='', **kwargs):
+        super(_InOrderLockBase, self).__init__(client, lock_name, ttl, 
+                                               **kwargs)
+
+        self.__limit = limit
+        self.__value = value
+        self.__key = None
+
+        # How long to wait for our turn before refreshing our own key.
+        self.__refresh_interval_s = ttl * self.renew_fraction
+
+    def __get_keys_ahead(self):
+        """Return the keys ahead of ours, oldest first, and the index at which 
+        they were observed.
+        """
+
+        r = self.client.directory.list(self.path)
+        keys = [node.key 
+                for node 
+                in sorted(r.node.children, key=lambda node: node.created_index)]
+
+        try:
+            position = keys.index(self.__key)
+        except ValueError:
+            raise KeyError("Lock key expired before the lock was acquired: "
+                           "%s" % (self.__key,))
+
+        return (keys[:position], r.etcd_index)
+
+    def __delete_key(self):
+        try:
+            self.client.node.delete(self.__key)
+        except KeyError:
+            pass
+
+        self.__key = None
+
+    def _wait_for_turn(self, keys_ahead, wait_index, timeout):
+        """Return when our position may have improved. Events that don't 
+        improve it don't extend the timeout.
+
+        :param keys_ahead: The keys ahead of ours, oldest first
+        :type keys_ahead: list
+
+        :param wait_index: The index from which changes haven't been seen
+        :type wait_index: int or None
+
+        :param timeout: Seconds to wait before raising 
+                        requests.exceptions.Timeout
+        :type timeout: float
+        """
+
+        raise NotImplementedError()
+
+    def _acquire(self, timeout):
+        _logger.debug("Acquiring in-order lock: %s", self.path)
+
+        if timeout is not None:
+            deadline = time.time() + timeout
+
+        inorder = self.client.inorder.get_inorder(self.path)
+        self.__key = inorder.add(self.__value, ttl=self.ttl).node.key
+        refresh_at = time.time() + self.__refresh_interval_s
+
+        try:
+            while 1:
+                (keys_ahead, etcd_index) = self.__get_keys_ahead()
+                if len(keys_ahead) < self.__limit:
+                    _logger.debug("Acquired in-order lock: %s", self.__key)
+                    return
+
+                # Our key is refreshed on schedule however often we're woken 
+                # up, and the acquire gives up on schedule too.
+                now = time.time()
+                if timeout is not None and now >= deadline:
+                    raise Timeout()
+
+                if now >= refresh_at:
+                    self.renew(self.ttl)
+                    refresh_at = now + self.__refresh_interval_s
+
+                wait_until = refresh_at
+                if timeout is not None:
+                    wait_until = min(wait_until, deadline)
+
+                wait_index = etcd_index + 1 if etcd_index is not None \
+                                            else None
+
+                try:
+                    self._wait_for_turn(keys_ahead, wait_index, 
+                                        wait_until - now)
+                except (EtcdEventIndexClearedException, 
+                        EtcdWaitFaultException, Timeout):
+                    # Either we can't tell what changed or it's time to 
+                    # refresh or give up. Either way, check again.
+                    pass
+        except Exception:
+            self.__delete_key()
+            raise
+
+    @measure_operation('lock.renew')
+    def renew(self, ttl):
+        if self.__key is None:
+            raise ValueError("Could not renew unacquired lock: %s" % 
+                             (self.path))
+
+        self.client.node.update_only(self.__key, self.__value, ttl=ttl)
+
+    def _release(self):
+        if self.__key is None:
+            raise ValueError("Could not release unacquired lock: %s" % 
+                             (self.path))
+
+        _logger.debug("Releasing in-order lock: %s", self.__key)
+
+        self.__delete_key()
+
+    @property
+    def key(self):
+        """The in-order key representing this contender, or None if not 
+        acquired.
+
+        :rtype: string or None
+        """
+
+        return self.__key
+
+    @property
+    def limit(self):
+        """The number of contenders that may hold the lock at once.
+
+        :rtype: int
+        """
+
+        return self.__limit
+
+
+class _KeyLock(_InOrderLockBase):
+    """An exclusive lock built on in-order keys, which doesn't need the lock 
+    module. Each contender waits on the key directly ahead of their own, so a 
+    release only wakes the next contender in line.
+    """
+
+    def __init__(self, client, lock_name, ttl, value='', **kwargs):
+        super(_KeyLock, self).__init__(client, lock_name, ttl, 1, 
+                                       value=value, **kwargs)
+
+    def _wait_for_turn(self, keys_ahead, wait_index, timeout):
+        predecessor = keys_ahead[-1]
+        deadline = time.time() + timeout
+
+        while 1:
+            remaining_s = deadline - time.time()
+            if remaining_s <= 0:
+                raise Timeout()
+
+            r = self.client.node.wait(predecessor, wait_index=wait_index, 
+                                      timeout=remaining_s)
+
+            if r.node.is_deleted is True:
+                return
+
+            # Just a renewal.
+            wait_index = r.node.modified_index + 1
+
+
+class LockRecipe(CommonOps):
+    """Locks that are built on the keys API, rather than the lock module."""
+
+    def get_lock(self, lock_name, ttl, value='', auto_renew=False,
+                 renew_fraction=etcd.config.LOCK_RENEW_FRACTION,
+                 on_lost=None):
+        """Get an exclusive lock. The lock is a directory of in-order keys
+        named by the lock-name.
+
+        :param lock_name: Name of the lock (its key, without the leading
+                          slash).
+        :type lock_name: string
+
+        :param ttl: Seconds that the lock survives without renewal
+        :type ttl: int
+
+        :param value: Value stored in this contender's key, to identify it.
+        :type value: string
+
+        :param auto_renew: Renew the lock in the background while it's held.
+        :type auto_renew: bool
+
+        :param renew_fraction: Fraction of the TTL between renewals
+        :type renew_fraction: float
+
+        :param on_lost: Callback receiving the lock and exception if a renewal
+                        fails.
+        :type on_lost: callable or None
+
+        :returns: Lock
+        :rtype: :class:`etcd.recipes.lock._KeyLock`
+        """
+
+        return _KeyLock(self.client, lock_name, ttl, value=value,
+                        auto_renew=auto_renew, renew_fraction=renew_fraction,
+                        on_lost=on_lost)
@@ -0,0 +1,86 @@
+import time
+
+from requests.exceptions import Timeout
+
+import etcd.config
+
+from etcd.common_ops import CommonOps
+from etcd.recipes.lock import _InOrderLockBase
+
+
+class _Semaphore(_InOrderLockBase):
+    """A counting semaphore built on in-order keys: up to *limit* contenders
+    may hold it at once. Waiting contenders watch the semaphore's directory,
+    but only check their position again when a key ahead of theirs goes away
+    (renewals and newer contenders are ignored).
+    """
+
+    def __init__(self, client, name, limit, ttl, value='', **kwargs):
+        if limit < 1:
+            raise ValueError("Limit must be at least one: (%d)" % (limit,))
+
+        super(_Semaphore, self).__init__(client, name, ttl, limit,
+                                         value=value, **kwargs)
+
+    def _wait_for_turn(self, keys_ahead, wait_index, timeout):
+        keys_ahead = set(keys_ahead)
+        deadline = time.time() + timeout
+
+        while 1:
+            remaining_s = deadline - time.time()
+            if remaining_s <= 0:
+                raise Timeout()
+
+            r = self.client.directory.wait(self.path, recursive=True,
+                                           wait_index=wait_index,
+                                           timeout=remaining_s)
+
+            if r.node.is_deleted is True and r.node.key in keys_ahead:
+                return
+
+            wait_index = r.node.modified_index + 1
+
+
+class SemaphoreRecipe(CommonOps):
+    """Counting semaphores that are built on the keys API."""
+
+    def get_semaphore(self, name, limit, ttl, value='', auto_renew=True,
+                      renew_fraction=etcd.config.LOCK_RENEW_FRACTION,
+                      on_lost=None):
+        """Get a semaphore that admits up to *limit* holders at once. The
+        semaphore is a directory of in-order keys named by the name. It has
+        the same interface as the locks.
+
+        :param name: Name of the semaphore (its key, without the leading
+                     slash).
+        :type name: string
+
+        :param limit: Maximum number of holders
+        :type limit: int
+
+        :param ttl: Seconds that a holder survives without renewal
+        :type ttl: int
+
+        :param value: Value stored in this holder's key, to identify it.
+        :type value: string
+
+        :param auto_renew: Renew the holder in the background while it's 
+                           held. Unlike the locks, this is the default, since 
+                           holders of a shared resource tend to hold it for 
+                           longer than a TTL.
+        :type auto_renew: bool
+
+        :param renew_fraction: Fraction of the TTL between renewals
+        :type renew_fraction: float
+
+        :param on_lost: Callback receiving the semaphore and exception if a
+                        renewal fails.
+        :type on_lost: callable or None
+
+        :returns: Semaphore
+        :rtype: :class:`etcd.recipes.semaphore._Semaphore`
+        """
+
+        return _Semaphore(self.client, name, limit, ttl, value=value,
+                          auto_renew=auto_renew,
+                          renew_fraction=renew_fraction, on_lost=on_lost)
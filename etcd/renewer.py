@@ -0,0 +1,66 @@
+import logging
+import threading
+
+_logger = logging.getLogger(__name__)
+
+
+class Renewer(object):
+    """Calls a renewal callback periodically from a background thread until
+    stopped. If the callback fails, the failure callback is called with the
+    exception and renewal stops.
+
+    :param renew_cb: Callback that renews something
+    :type renew_cb: callable
+
+    :param interval_s: Seconds between renewals
+    :type interval_s: float
+
+    :param on_failure: Callback receiving the exception from a failed renewal
+    :type on_failure: callable or None
+    """
+
+    def __init__(self, renew_cb, interval_s, on_failure=None):
+        self.__renew_cb = renew_cb
+        self.__interval_s = interval_s
+        self.__on_failure = on_failure
+        self.__stop_event = threading.Event()
+        self.__thread = None
+
+    def __run(self):
+        while self.__stop_event.wait(self.__interval_s) is not True:
+            try:
+                self.__renew_cb()
+            except Exception as e:
+                if self.__stop_event.is_set() is True:
+                    return
+
+                _logger.warning("Renewal failed: %s", e)
+
+                if self.__on_failure is not None:
+                    try:
+                        self.__on_failure(e)
+                    except Exception:
+                        _logger.exception("Renewal-failure callback failed.")
+
+                return
+
+    def start(self):
+        """Start renewing."""
+
+        if self.__thread is not None:
+            raise ValueError("Renewer was already started.")
+
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self):
+        """Stop renewing. If called from the renewal thread itself (like from
+        the failure callback), it doesn't wait for the thread to finish.
+        """
+
+        self.__stop_event.set()
+
+        if self.__thread is not None and \
+           self.__thread is not threading.current_thread():
+            self.__thread.join()
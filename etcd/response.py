@@ -1,11 +1,9 @@
-import pytz
-import simplejson
+import bisect
 
 import etcd.exceptions
 
 from collections import namedtuple
 from os.path import basename
-from pytz import timezone
 from datetime import datetime, timedelta
 
 A__PREVNODE = '_(pnode)'
@@ -17,19 +15,23 @@ A_CREATE = 'create'
 A_DELETE = 'delete'
 A_CAS = 'compareAndSwap'
 A_CAD = 'compareAndDelete'
+A_EXPIRE = 'expire'
+
+# Actions after which the node no longer exists.
+_DELETE_ACTIONS = (A_DELETE, A_CAD, A_EXPIRE)
 
 def _build_node_object(action, node):
     if 'dir' not in node:
         node['dir'] = False
 
     if node['dir'] == True:
-        if action in (A_DELETE, A_CAD):
+        if action in _DELETE_ACTIONS:
             return ResponseV2DeletedDirectoryNode(action, node)
 # TODO: Specifically, what actions can happen for a DIRECTORY?
         else:
             return ResponseV2AliveDirectoryNode(action, node)
     else:
-        if action in (A_DELETE, A_CAD):
+        if action in _DELETE_ACTIONS:
             return ResponseV2DeletedNode(action, node)
 # TODO: Specifically, what actions can happen for a non-directory?
         else:
@@ -80,6 +82,9 @@ class ResponseV2BasicNode(object):
             tz_offset = timedelta(seconds=(tz_offset_hours * 60 * 60 + 
                                            tz_offset_minutes * 60))
 
+            # Most nodes don't expire, so only pay for this when one does.
+            import pytz
+
             self.expiration = (naive_dt + tz_offset).replace(tzinfo=pytz.UTC)
             self.ttl_phrase = ('%d: %s' % (self.ttl, self.expiration))
 
@@ -165,6 +170,8 @@ class ResponseV2AliveDirectoryNode(ResponseV2DirectoryNode):
     """
 
     def initialize(self, node):
+        self.__raw_keys = None
+
         if node.get('dir', False) is True:
             self.__is_collection = True
             self.__raw_nodes = node.get('nodes', [])
@@ -197,6 +204,38 @@ class ResponseV2AliveDirectoryNode(ResponseV2DirectoryNode):
         for node in self.__raw_nodes:
             yield _build_node_object(self.action, node)
 
+    def get_children(self, after_key=None, limit=None):
+        """Build and return only some of the children: those with keys after 
+        the given key, up to the limit. The children must be sorted by key 
+        (like those of a sorted listing).
+
+        :param after_key: Only return children with keys that sort after this 
+                          one, or None to start with the first.
+        :type after_key: string or None
+
+        :param limit: Maximum number of children to return, or None for all.
+        :type limit: int or None
+
+        :returns: Child nodes
+        :rtype: list
+        """
+
+        if self.__is_collection is False:
+            raise ValueError("This directory node is not a collection.")
+
+        start = 0
+        if after_key is not None:
+            if self.__raw_keys is None:
+                self.__raw_keys = [node['key'] for node in self.__raw_nodes]
+
+            start = bisect.bisect_right(self.__raw_keys, after_key)
+
+        stop = start + limit if limit is not None else None
+
+        return [_build_node_object(self.action, node) 
+                for node 
+                in self.__raw_nodes[start:stop]]
+
 
 class ResponseV2DeletedDirectoryNode(ResponseV2DirectoryNode):
     """Represents a single DIRECTORY node either appearing in isolation or
@@ -226,7 +265,10 @@ class ResponseV2(object):
     def __init__(self, response, request_verb, request_path):
         try:
             response_raw = response.json()
-        except simplejson.JSONDecodeError:
+        except ValueError:
+            # Whichever JSON library Requests uses, decode errors are 
+            # ValueErrors.
+            #
             # Bug #1120: Wait will timeout with a JSON-message of zero-length.
             if response.text == '':
                 raise etcd.exceptions.EtcdEmptyResponseError()
@@ -236,6 +278,11 @@ class ResponseV2(object):
         self.node = _build_node_object(response_raw['action'], 
                                        response_raw['node'])
 
+        # The index of the cluster at the time of the response. Waiting from 
+        # the next index will catch every change that happens afterward.
+        etcd_index = response.headers.get('X-Etcd-Index')
+        self.etcd_index = int(etcd_index) if etcd_index is not None else None
+
         # We have to fake the action (since we don't know what the last actual 
         # was), but we can reasonably assume it was a SET action (it doesn't 
         # really matter, as long as it's not a DELETE/CAD action).
@@ -28,7 +28,7 @@ class StatOps(CommonOps):
                         'standard_deviation'])
 
         followers = {}
-        for name, block in data['followers'].iteritems():
+        for name, block in data['followers'].items():
             counts_raw = block['counts']
             counts = C(fail=counts_raw['fail'], 
                        success=counts_raw['success'])
@@ -0,0 +1,137 @@
+import threading
+
+from etcd.compat import string_types
+from etcd.observer import RequestObserver
+
+_TRACER_NAME = 'etcd'
+
+# OpenTelemetry's trace module, or None if it isn't installed. It's only
+# imported once tracing is used.
+_trace = None
+_is_trace_loaded = False
+
+
+def _get_trace():
+    global _trace, _is_trace_loaded
+
+    if _is_trace_loaded is False:
+        try:
+            import opentelemetry.trace as trace
+        except ImportError:
+            trace = None
+
+        _trace = trace
+        _is_trace_loaded = True
+
+    return _trace
+
+def get_default_tracer():
+    """Return the OpenTelemetry tracer for the client, or None if
+    OpenTelemetry isn't installed.
+    """
+
+    trace = _get_trace()
+    if trace is None:
+        return None
+
+    return trace.get_tracer(_TRACER_NAME)
+
+def get_operation_key(ops, args):
+    """Return the key that an operation acts on. Most operations take it as
+    their first argument, but some objects (in-order directories and locks)
+    are bound to one.
+    """
+
+    try:
+        return ops.path
+    except AttributeError:
+        pass
+
+    if args and isinstance(args[0], string_types):
+        return args[0]
+
+    return None
+
+def set_response_attributes(span, result):
+    """Record the cluster index and node of a response on a span."""
+
+    etcd_index = getattr(result, 'etcd_index', None)
+    if etcd_index is not None:
+        span.set_attribute('etcd.index', etcd_index)
+
+    node = getattr(result, 'node', None)
+    if node is not None:
+        span.set_attribute('etcd.modified_index', node.modified_index)
+
+
+class TracingObserver(RequestObserver):
+    """Creates a span for every HTTP attempt that the client makes, including
+    the attempts with other members after a failure. The spans are children
+    of the current span, which is the operation's span when tracing is
+    enabled on the client.
+
+    :param tracer: OpenTelemetry (or compatible) tracer
+    :type tracer: opentelemetry.trace.Tracer
+    """
+
+    def __init__(self, tracer):
+        self.__tracer = tracer
+        self.__local = threading.local()
+
+    def attempt_started(self, info):
+        attributes = {
+            'http.method': info.verb.upper(),
+            'etcd.path': info.path,
+            'etcd.member': info.member,
+            'etcd.attempt': info.attempts,
+        }
+
+        if info.module is not None:
+            attributes['etcd.module'] = info.module
+
+        kwargs = {}
+
+        trace = _get_trace()
+        if trace is not None:
+            kwargs['kind'] = trace.SpanKind.CLIENT
+
+        self.__local.span = self.__tracer.start_span(
+                                'etcd.http.' + info.verb,
+                                attributes=attributes,
+                                **kwargs)
+
+    def attempt_finished(self, info, exception):
+        span = getattr(self.__local, 'span', None)
+        if span is None:
+            return
+
+        self.__local.span = None
+
+        if exception is not None:
+            span.record_exception(exception)
+
+            trace = _get_trace()
+            if trace is not None:
+                span.set_status(trace.Status(trace.StatusCode.ERROR,
+                                             str(exception)))
+        else:
+            span.set_attribute('http.status_code', info.status_code)
+
+            if info.etcd_index is not None:
+                span.set_attribute('etcd.index', info.etcd_index)
+
+        span.end()
+
+    def request_finished(self, info):
+        # Every attempt should have been finished already, but a span must 
+        # never be left open (or leak into the thread's next request).
+        span = getattr(self.__local, 'span', None)
+        if span is None:
+            return
+
+        self.__local.span = None
+
+        if info.error is not None:
+            span.record_exception(info.error)
+
+        span.end()
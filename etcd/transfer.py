@@ -0,0 +1,203 @@
+import os
+import json
+import logging
+
+from collections import namedtuple
+
+import etcd.config
+
+from etcd.common_ops import CommonOps
+from etcd.exceptions import EtcdAlreadyExistsException
+from etcd.metrics import measure_operation
+from etcd.parallel import imap_unordered
+
+_logger = logging.getLogger(__name__)
+
+_FORMAT_NAME = 'pec-dump'
+_FORMAT_VERSION = 1
+
+LoadResult = namedtuple('LoadResult', ['loaded', 'skipped', 'failures'])
+
+
+class TransferOps(CommonOps):
+    """Functions that copy a subtree to and from a local file. The file is
+    line-delimited JSON: a header followed by one compact record per node,
+    with keys stored relative to the exported directory so that a dump can be
+    loaded under a different one.
+    """
+
+    @measure_operation('transfer.dump')
+    def dump(self, path, f, max_concurrency=etcd.config.WALK_MAX_CONCURRENCY):
+        """Write every node under the given directory to a file. The tree is
+        walked level-by-level, so it never has to fit in a single response.
+
+        :param path: Key of the directory to export
+        :type path: string
+
+        :param f: File-like object opened for writing text
+        :type f: file
+
+        :param max_concurrency: Maximum number of listings in-flight at once.
+        :type max_concurrency: int
+
+        :returns: Number of nodes written
+        :rtype: int
+
+        :raises: KeyError
+        """
+
+        self.validate_path(path)
+        root = path.rstrip('/')
+
+        header = { 'format': _FORMAT_NAME,
+                   'version': _FORMAT_VERSION,
+                   'root': path }
+
+        f.write(json.dumps(header, separators=(',', ':')) + '\n')
+
+        i = 0
+        for node in self.client.directory.walk(
+                        path,
+                        max_concurrency=max_concurrency):
+            record = { 'k': node.key[len(root):] }
+
+            if node.is_directory is True:
+                record['d'] = 1
+            else:
+                record['v'] = node.value
+
+            if node.ttl is not None:
+                record['t'] = node.ttl
+
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+            i += 1
+
+        return i
+
+    @measure_operation('transfer.load')
+    def load(self, f, path=None,
+             max_concurrency=etcd.config.BULK_MAX_CONCURRENCY,
+             checkpoint_filepath=None,
+             checkpoint_interval=etcd.config.BULK_BATCH_SIZE,
+             preserve_ttl=True):
+        """Write the nodes from a dump back to the server, in parallel.
+
+        If a checkpoint file is given, the position up to which every record
+        has been written is periodically saved to it, and a subsequent load
+        with the same checkpoint file resumes from there. Records that failed
+        are reported and hold the checkpoint back, so that a resumed load
+        retries them.
+
+        :param f: File-like object opened for reading text
+        :type f: file
+
+        :param path: Key of the directory to load into, or None to use the one
+                     that was exported.
+        :type path: string or None
+
+        :param max_concurrency: Maximum number of concurrent writes.
+        :type max_concurrency: int
+
+        :param checkpoint_filepath: File to record progress in.
+        :type checkpoint_filepath: string or None
+
+        :param checkpoint_interval: Number of records between checkpoints.
+        :type checkpoint_interval: int
+
+        :param preserve_ttl: Whether to set the TTLs that were remaining at
+                             the time of the export.
+        :type preserve_ttl: bool
+
+        :returns: Counts of the records loaded and skipped (by a checkpoint),
+                  and a dictionary of failed keys to exceptions.
+        :rtype: :class:`etcd.transfer.LoadResult`
+
+        :raises: ValueError
+        """
+
+        header = json.loads(f.readline())
+        if header.get('format') != _FORMAT_NAME:
+            raise ValueError("File is not a dump.")
+        elif header.get('version') != _FORMAT_VERSION:
+            raise ValueError("Dump version (%s) is not supported." %
+                             (header.get('version'),))
+
+        if path is None:
+            path = header['root']
+
+        self.validate_path(path)
+        root = path.rstrip('/')
+
+        skip_count = 0
+        if checkpoint_filepath is not None and \
+           os.path.exists(checkpoint_filepath) is True:
+            with open(checkpoint_filepath) as g:
+                skip_count = int(g.read().strip() or '0')
+
+            _logger.debug("Resuming load from record (%d).", skip_count)
+
+        def read_records():
+            i = 0
+            for line in f:
+                if i >= skip_count:
+                    yield (i, json.loads(line))
+
+                i += 1
+
+        def write_record(entry):
+            (i, record) = entry
+            key = root + record['k']
+            ttl = record.get('t') if preserve_ttl is True else None
+
+            if 'd' in record:
+                try:
+                    self.client.directory.create(key, ttl=ttl)
+                except EtcdAlreadyExistsException:
+                    # Records are written in parallel, so a value under the 
+                    # directory may have implicitly created it (without a 
+                    # TTL) first.
+                    if ttl is not None:
+                        self.client.directory.update_ttl(key, ttl)
+            else:
+                self.client.node.set(key, record['v'], ttl=ttl)
+
+        def write_checkpoint(position):
+            temp_filepath = checkpoint_filepath + '.tmp'
+            with open(temp_filepath, 'w') as g:
+                g.write(str(position))
+
+            os.rename(temp_filepath, checkpoint_filepath)
+
+        # The checkpoint is the position before which every record has been
+        # written. Records complete out of order, so we track the ones ahead
+        # of it until the gap is filled.
+        checkpoint = skip_count
+        completed = set()
+        loaded = 0
+        failures = {}
+        since_checkpoint = 0
+
+        for ((i, record), result, e) in imap_unordered(write_record,
+                                                       read_records(),
+                                                       max_concurrency):
+            if e is not None:
+                failures[root + record['k']] = e
+                continue
+
+            loaded += 1
+            completed.add(i)
+
+            while checkpoint in completed:
+                completed.remove(checkpoint)
+                checkpoint += 1
+
+            since_checkpoint += 1
+            if checkpoint_filepath is not None and \
+               since_checkpoint >= checkpoint_interval:
+                write_checkpoint(checkpoint)
+                since_checkpoint = 0
+
+        if checkpoint_filepath is not None:
+            write_checkpoint(checkpoint)
+
+        return LoadResult(loaded=loaded, skipped=skip_count, failures=failures)
@@ -0,0 +1,246 @@
+import logging
+import threading
+import heapq
+import random
+import time
+
+import etcd.config
+
+from etcd.parallel import imap_unordered
+
+_logger = logging.getLogger(__name__)
+
+
+class _Registration(object):
+    def __init__(self, path, value, ttl, on_failure):
+        self.path = path
+        self.value = value
+        self.ttl = ttl
+        self.on_failure = on_failure
+
+        # Until the first write, this is when the key would have expired had
+        # it been written when it was registered.
+        self.expires_at = time.time() + ttl
+
+
+class TtlRefresher(object):
+    """Keeps many TTL'd keys alive from a single scheduler thread, rather than
+    a thread per key. Each key is rewritten (with its TTL) after a fraction of
+    its TTL has elapsed, with some jitter so that keys registered together
+    don't stay aligned. Refreshes that come due together are written
+    concurrently.
+
+    If a refresh fails, the key's failure callback (if any) is called with
+    the path, the exception, and the number of seconds until the key expires,
+    and the refresh is retried sooner. Once the key has expired, the callback
+    is called a last time (with zero or less seconds) and the key is
+    unregistered.
+
+    :param client: Client instance
+    :type client: :class:`etcd.client.Client`
+
+    :param refresh_fraction: Fraction of the TTL between refreshes
+    :type refresh_fraction: float
+
+    :param jitter: Fraction of the refresh interval to randomize by
+    :type jitter: float
+
+    :param max_concurrency: Maximum number of concurrent refreshes
+    :type max_concurrency: int
+    """
+
+    def __init__(self, client,
+                 refresh_fraction=etcd.config.TTL_REFRESH_FRACTION,
+                 jitter=etcd.config.TTL_REFRESH_JITTER,
+                 max_concurrency=etcd.config.BULK_MAX_CONCURRENCY):
+        self.__client = client
+        self.__refresh_fraction = refresh_fraction
+        self.__jitter = jitter
+        self.__max_concurrency = max_concurrency
+
+        self.__registrations = {}
+
+        # Entries are (due time, sequence, registration). A registration that
+        # has been replaced or removed is skipped when it comes due.
+        self.__schedule = []
+        self.__sequence = 0
+        self.__condition = threading.Condition()
+        self.__is_stopped = False
+
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __schedule_at(self, registration, due_at):
+        heapq.heappush(self.__schedule,
+                       (due_at, self.__sequence, registration))
+
+        self.__sequence += 1
+
+    def __get_interval_s(self, registration):
+        interval_s = registration.ttl * self.__refresh_fraction
+        return interval_s * random.uniform(1 - self.__jitter, 1 + self.__jitter)
+
+    def __get_retry_interval_s(self, registration, now):
+        # Retry well before the key expires, without spinning as the 
+        # expiration approaches.
+        interval_s = self.__get_interval_s(registration) / 4
+        interval_s = min(interval_s, 
+                         max(interval_s / 4, 
+                             (registration.expires_at - now) / 2))
+
+        return interval_s
+
+    def __get_due(self):
+        """Wait until at least one registration is due, and return all of the
+        ones that are. Returns None when stopped.
+        """
+
+        with self.__condition:
+            while self.__is_stopped is False:
+                now = time.time()
+                due = []
+                while self.__schedule and self.__schedule[0][0] <= now:
+                    (due_at, sequence, registration) = \
+                        heapq.heappop(self.__schedule)
+
+                    if self.__registrations.get(registration.path) is \
+                            registration:
+                        due.append(registration)
+
+                if due:
+                    return due
+
+                timeout_s = self.__schedule[0][0] - now \
+                                if self.__schedule \
+                                else None
+
+                self.__condition.wait(timeout_s)
+
+        return None
+
+    def __refresh(self, registration):
+        self.__client.node.set(registration.path, registration.value,
+                               ttl=registration.ttl)
+
+    def __run(self):
+        while 1:
+            due = self.__get_due()
+            if due is None:
+                return
+
+            for (registration, result, e) in imap_unordered(
+                                                self.__refresh,
+                                                due,
+                                                self.__max_concurrency):
+                now = time.time()
+
+                if e is None:
+                    registration.expires_at = now + registration.ttl
+                    interval_s = self.__get_interval_s(registration)
+                else:
+                    interval_s = self.__get_retry_interval_s(registration,
+                                                             now)
+
+                expires_in_s = registration.expires_at - now
+                is_expired = e is not None and expires_in_s <= 0
+
+                with self.__condition:
+                    if self.__registrations.get(registration.path) is not \
+                            registration:
+                        continue
+
+                    if is_expired is True:
+                        del self.__registrations[registration.path]
+                    else:
+                        self.__schedule_at(registration, now + interval_s)
+
+                if e is None:
+                    continue
+
+                if is_expired is True:
+                    _logger.warning("Could not refresh [%s], and it has "
+                                    "expired. It's no longer being "
+                                    "refreshed: %s", registration.path, e)
+                else:
+                    _logger.warning("Could not refresh [%s] (expires in "
+                                    "(%.1f) seconds): %s",
+                                    registration.path, expires_in_s, e)
+
+                if registration.on_failure is not None:
+                    try:
+                        registration.on_failure(registration.path, e,
+                                                expires_in_s)
+                    except Exception:
+                        _logger.exception("Refresh-failure callback for [%s] "
+                                          "failed.", registration.path)
+
+    def register(self, path, value, ttl, on_failure=None):
+        """Start keeping the given key alive. It's written immediately, and
+        then periodically. Registering a key again replaces its value, TTL,
+        and callback.
+
+        :param path: Node key
+        :type path: string
+
+        :param value: Value to assign
+        :type value: scalar
+
+        :param ttl: Number of seconds until expiration
+        :type ttl: int
+
+        :param on_failure: Callback receiving the path, the exception, and the
+                           seconds until expiration when a refresh fails. 
+                           It's called a last time when the key has expired 
+                           and is no longer being refreshed.
+        :type on_failure: callable or None
+        """
+
+        self.__client.node.validate_path(path)
+
+        registration = _Registration(path, value, ttl, on_failure)
+
+        with self.__condition:
+            if self.__is_stopped is True:
+                raise ValueError("TTL refresher is stopped.")
+
+            self.__registrations[path] = registration
+            self.__schedule_at(registration, time.time())
+            self.__condition.notify()
+
+    def unregister(self, path):
+        """Stop keeping the given key alive. The key is left to expire.
+
+        :param path: Node key
+        :type path: string
+
+        :raises: KeyError
+        """
+
+        with self.__condition:
+            del self.__registrations[path]
+
+    def stop(self):
+        """Stop refreshing all keys. The keys are left to expire."""
+
+        with self.__condition:
+            self.__is_stopped = True
+            self.__condition.notify()
+
+        self.__thread.join()
+
+    @property
+    def paths(self):
+        """The keys being kept alive.
+
+        :rtype: list
+        """
+
+        with self.__condition:
+            return list(self.__registrations.keys())
@@ -0,0 +1,169 @@
+import logging
+import threading
+import atexit
+
+import etcd.config
+
+from etcd.parallel import imap_unordered
+
+_logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer(object):
+    """Coalesces frequent sets (like heartbeats and progress counters) and
+    writes them in the background. Only the latest value set for a key during
+    a flush interval is written. A final flush happens when the buffer is
+    closed, which is done automatically at interpreter shutdown.
+
+    A write that fails is retried on the next flush, unless it has been
+    superseded by a newer value by then.
+
+    :param client: Client instance
+    :type client: :class:`etcd.client.Client`
+
+    :param flush_interval_s: Seconds between flushes
+    :type flush_interval_s: float
+
+    :param max_concurrency: Maximum number of concurrent writes per flush
+    :type max_concurrency: int
+    """
+
+    def __init__(self, client,
+                 flush_interval_s=etcd.config.WRITE_BEHIND_FLUSH_INTERVAL_S,
+                 max_concurrency=etcd.config.BULK_MAX_CONCURRENCY):
+        self.__client = client
+        self.__flush_interval_s = flush_interval_s
+        self.__max_concurrency = max_concurrency
+
+        self.__pending = {}
+        self.__pending_lock = threading.Lock()
+        self.__flush_lock = threading.Lock()
+        self.__stop_event = threading.Event()
+
+        self.__set_count = 0
+        self.__suppressed_count = 0
+        self.__write_count = 0
+        self.__failed_count = 0
+
+        self.__thread = threading.Thread(target=self.__flush_periodically)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __flush_periodically(self):
+        while self.__stop_event.wait(self.__flush_interval_s) is not True:
+            try:
+                self.flush()
+            except Exception:
+                _logger.exception("Write-behind flush failed.")
+
+    def set(self, path, value, ttl=None):
+        """Queue a value to be set at the next flush, replacing any value that
+        is already queued for the key.
+
+        :param path: Node key
+        :type path: string
+
+        :param value: Value to assign
+        :type value: scalar
+
+        :param ttl: Number of seconds until expiration
+        :type ttl: int or None
+        """
+
+        if self.__stop_event.is_set() is True:
+            raise ValueError("Write-behind buffer is closed.")
+
+        with self.__pending_lock:
+            if path in self.__pending:
+                self.__suppressed_count += 1
+
+            self.__pending[path] = (value, ttl)
+            self.__set_count += 1
+
+    def flush(self):
+        """Write everything that's queued, and wait for it to finish.
+
+        :returns: Number of failed writes
+        :rtype: int
+        """
+
+        with self.__flush_lock:
+            with self.__pending_lock:
+                pending = self.__pending
+                self.__pending = {}
+
+            def write(entry):
+                (path, (value, ttl)) = entry
+                self.__client.node.set(path, value, ttl=ttl)
+
+            failed_count = 0
+            for (entry, result, e) in imap_unordered(write,
+                                                     pending.items(),
+                                                     self.__max_concurrency):
+                if e is None:
+                    self.__write_count += 1
+                    continue
+
+                (path, value_and_ttl) = entry
+
+                _logger.warning("Write-behind set of [%s] failed: %s",
+                                path, e)
+
+                failed_count += 1
+
+                with self.__pending_lock:
+                    self.__pending.setdefault(path, value_and_ttl)
+
+            self.__failed_count += failed_count
+            return failed_count
+
+    def close(self):
+        """Stop the background flushes and do a final one. Calling it again
+        has no effect.
+        """
+
+        if self.__stop_event.is_set() is True:
+            return
+
+        self.__stop_event.set()
+        self.__thread.join()
+
+        self.flush()
+
+        # Not available in Python 2.
+        if hasattr(atexit, 'unregister') is True:
+            atexit.unregister(self.close)
+
+    @property
+    def set_count(self):
+        """Number of sets that were requested."""
+
+        return self.__set_count
+
+    @property
+    def suppressed_count(self):
+        """Number of sets that were superseded before being written."""
+
+        return self.__suppressed_count
+
+    @property
+    def write_count(self):
+        """Number of writes that reached the server."""
+
+        return self.__write_count
+
+    @property
+    def failed_count(self):
+        """Number of writes that failed (and were retried, if not
+        superseded).
+        """
+
+        return self.__failed_count
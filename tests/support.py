@@ -0,0 +1,72 @@
+import threading
+import time
+import unittest
+
+from etcd.client import Client
+from etcd.fake_server import FakeEtcdServer, FakeStore, FakeEtcdError
+
+
+class ManualClock(object):
+    """A clock for the fake store that only moves when it's advanced, so that
+    keys only expire when a test says so.
+    """
+
+    def __init__(self):
+        self.__now = time.time()
+        self.__lock = threading.Lock()
+
+    def __call__(self):
+        with self.__lock:
+            return self.__now
+
+    def advance(self, seconds):
+        with self.__lock:
+            self.__now += seconds
+
+
+class FakeServerTestCase(unittest.TestCase):
+    """Serves a fresh fake etcd, on a manual clock, for every test."""
+
+    def setUp(self):
+        self.clock = ManualClock()
+        self.store = FakeStore(clock=self.clock)
+        self.server = FakeEtcdServer(store=self.store)
+        self.server.start()
+
+    def tearDown(self):
+        if self.server.is_stopped() is False:
+            self.server.stop()
+
+    def get_client(self):
+        return Client(host=self.server.host, port=self.server.port)
+
+    def advance(self, seconds):
+        """Move the store's clock forward, and expire what that expires."""
+
+        self.clock.advance(seconds)
+        self.store.expire()
+
+    def exists(self, key):
+        try:
+            self.store.get(key)
+        except FakeEtcdError:
+            return False
+
+        return True
+
+    def wait_for(self, predicate, timeout_s=5):
+        """Wait for the predicate (in real time) to become true."""
+
+        deadline = time.time() + timeout_s
+        while predicate() is False:
+            if time.time() >= deadline:
+                self.fail("Timed-out waiting for a condition.")
+
+            time.sleep(.01)
+
+    def start_thread(self, target):
+        t = threading.Thread(target=target)
+        t.daemon = True
+        t.start()
+
+        return t
@@ -0,0 +1,240 @@
+import threading
+import time
+import unittest
+
+from support import FakeServerTestCase
+
+
+class WalkTest(FakeServerTestCase):
+    def setUp(self):
+        super(WalkTest, self).setUp()
+
+        self.client = self.get_client()
+
+        # /test_walk/dN/sM/v
+        for i in range(4):
+            self.client.node.set('/test_walk/d%d/value' % (i,), 'value')
+
+            for j in range(2):
+                self.client.node.set('/test_walk/d%d/s%d/v' % (i, j), 'value')
+
+    def walk(self, **kwargs):
+        return sorted(node.key
+                      for node
+                      in self.client.directory.walk('/test_walk', **kwargs))
+
+    def test_walk(self):
+        expected = []
+        for i in range(4):
+            expected += ['/test_walk/d%d' % (i,),
+                         '/test_walk/d%d/value' % (i,)]
+
+            for j in range(2):
+                expected += ['/test_walk/d%d/s%d' % (i, j),
+                             '/test_walk/d%d/s%d/v' % (i, j)]
+
+        self.assertEqual(self.walk(), sorted(expected))
+        self.assertEqual(self.walk(max_concurrency=1), sorted(expected))
+
+    def test_max_depth(self):
+        self.assertEqual(self.walk(max_depth=1),
+                         ['/test_walk/d%d' % (i,) for i in range(4)])
+
+        self.assertEqual(len(self.walk(max_depth=2)), 4 * 4)
+
+    def test_max_concurrency(self):
+        directory = self.client.directory
+        original_list = directory.list
+
+        in_flight = [0]
+        peak = [0]
+        lock = threading.Lock()
+
+        def list_(*args, **kwargs):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+
+            try:
+                time.sleep(.05)
+                return original_list(*args, **kwargs)
+            finally:
+                with lock:
+                    in_flight[0] -= 1
+
+        directory.list = list_
+
+        try:
+            self.assertEqual(len(self.walk(max_concurrency=2)), 4 * 6)
+            self.assertEqual(peak[0], 2)
+        finally:
+            del directory.list
+
+    def test_errors(self):
+        self.assertRaises(ValueError, self.walk, max_concurrency=0)
+        self.assertRaises(KeyError, list,
+                          self.client.directory.walk('/test_missing'))
+        self.assertRaises(ValueError, list,
+                          self.client.directory.walk('/test_walk/d0/value'))
+
+
+class DeleteManyTest(FakeServerTestCase):
+    def setUp(self):
+        super(DeleteManyTest, self).setUp()
+
+        self.client = self.get_client()
+
+        for i in range(10):
+            self.client.node.set('/test_delete/d%d/v%d' % (i % 2, i), str(i))
+
+    def test_delete_many(self):
+        progress = []
+        r = self.client.directory.delete_many(
+                '/test_delete',
+                batch_size=4,
+                progress_cb=lambda deleted, failed: 
+                                progress.append((deleted, failed)))
+
+        self.assertEqual(r.deleted, 10)
+        self.assertEqual(r.removed_directories, 0)
+        self.assertEqual(r.failures, {})
+        self.assertEqual(progress, [(4, 0), (8, 0), (10, 0)])
+
+        # The directories are left.
+        self.assertEqual(sorted(node.key
+                                for node
+                                in self.client.directory.walk('/test_delete')),
+                         ['/test_delete/d0', '/test_delete/d1'])
+
+    def test_predicate_and_directories(self):
+        r = self.client.directory.delete_many(
+                '/test_delete',
+                predicate=lambda node: int(node.value) % 2 == 0,
+                remove_directories=True)
+
+        # Only d0 (and not the root, which still has d1 in it) was emptied.
+        self.assertEqual(r.deleted, 5)
+        self.assertEqual(r.removed_directories, 1)
+        self.assertEqual(r.failures, {})
+        self.assertFalse(self.exists('/test_delete/d0'))
+        self.assertEqual(len(list(self.client.directory.walk(
+                                    '/test_delete/d1'))), 5)
+
+        r = self.client.directory.delete_many('/test_delete',
+                                              remove_directories=True)
+
+        self.assertEqual(r.deleted, 5)
+        self.assertEqual(r.removed_directories, 2)
+        self.assertFalse(self.exists('/test_delete'))
+
+    def test_modified_values_fail(self):
+        def predicate(node):
+            # Modify the value after it was enumerated.
+            if node.key == '/test_delete/d1/v3':
+                self.client.node.set(node.key, 'changed')
+
+            return True
+
+        r = self.client.directory.delete_many('/test_delete', 
+                                              predicate=predicate,
+                                              remove_directories=True)
+
+        self.assertEqual(r.deleted, 9)
+        self.assertEqual(r.removed_directories, 1)
+        self.assertEqual(list(r.failures.keys()), ['/test_delete/d1/v3'])
+        self.assertEqual(self.client.node.get('/test_delete/d1/v3').node.value,
+                         'changed')
+
+    def test_missing(self):
+        self.assertRaises(KeyError, self.client.directory.delete_many,
+                          '/test_missing')
+
+
+class SyncTest(FakeServerTestCase):
+    def setUp(self):
+        super(SyncTest, self).setUp()
+
+        self.client = self.get_client()
+
+        self.client.node.set('/test_sync/same', 'value')
+        self.client.node.set('/test_sync/changed', 'old')
+        self.client.node.set('/test_sync/sub/extra', 'value')
+
+    def values(self):
+        return dict((node.key, node.value)
+                    for node
+                    in self.client.directory.walk('/test_sync')
+                    if node.is_directory is False)
+
+    def test_sync(self):
+        r = self.client.directory.sync('/test_sync',
+                                       { 'same': 'value',
+                                         'changed': 'new',
+                                         'sub/added': 1 })
+
+        self.assertEqual(r.added, ['/sub/added'])
+        self.assertEqual(r.changed, ['/changed'])
+        self.assertEqual(r.deleted, ['/sub/extra'])
+        self.assertEqual(r.unchanged, ['/same'])
+        self.assertEqual(r.failures, {})
+
+        self.assertEqual(self.values(),
+                         { '/test_sync/same': 'value',
+                           '/test_sync/changed': 'new',
+                           '/test_sync/sub/added': '1' })
+
+    def test_dry_run_and_no_delete(self):
+        desired = { 'changed': 'new' }
+
+        r = self.client.directory.sync('/test_sync', desired, dry_run=True)
+
+        self.assertEqual(r.changed, ['/changed'])
+        self.assertEqual(sorted(r.deleted), ['/same', '/sub/extra'])
+        self.assertEqual(self.values()['/test_sync/changed'], 'old')
+
+        r = self.client.directory.sync('/test_sync', desired, delete=False)
+
+        self.assertEqual(r.deleted, [])
+        self.assertEqual(len(self.values()), 3)
+
+    def test_missing_directory(self):
+        r = self.client.directory.sync('/test_missing', { 'a': 'b' })
+
+        self.assertEqual(r.added, ['/a'])
+        self.assertEqual(self.client.node.get('/test_missing/a').node.value,
+                         'b')
+
+    def test_cas_failures(self):
+        original_list = self.client.directory.list
+
+        def list_(*args, **kwargs):
+            # The tree is fetched, and then modified by someone else.
+            r = original_list(*args, **kwargs)
+            self.client.node.set('/test_sync/changed', 'other')
+            self.client.node.set('/test_sync/added', 'other')
+
+            return r
+
+        self.client.directory.list = list_
+
+        try:
+            r = self.client.directory.sync('/test_sync',
+                                           { 'same': 'value',
+                                             'changed': 'new',
+                                             'added': 'new' },
+                                           use_cas=True)
+        finally:
+            del self.client.directory.list
+
+        self.assertEqual(r.added, [])
+        self.assertEqual(r.changed, [])
+        self.assertEqual(r.deleted, ['/sub/extra'])
+        self.assertEqual(sorted(r.failures.keys()), ['/added', '/changed'])
+
+        self.assertEqual(self.values(),
+                         { '/test_sync/same': 'value',
+                           '/test_sync/changed': 'other',
+                           '/test_sync/added': 'other' })
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import threading
+import time
+import unittest
+
+from support import FakeServerTestCase
+
+
+class ElectionTest(FakeServerTestCase):
+    def setUp(self):
+        super(ElectionTest, self).setUp()
+
+        self.events = []
+        self.events_lock = threading.Lock()
+        self.elections = []
+
+    def tearDown(self):
+        for election in self.elections:
+            election.stop(resign=False)
+
+        super(ElectionTest, self).tearDown()
+
+    def record(self, event, election):
+        with self.events_lock:
+            self.events.append((event, election.value))
+
+    def get_election(self, value, ttl=2):
+        election = self.get_client().recipe.election.get_election(
+                    'test_election', value, ttl,
+                    on_elected=lambda e: self.record('elected', e),
+                    on_lost=lambda e: self.record('lost', e),
+                    renew_fraction=.1)
+
+        self.elections.append(election)
+        election.start()
+
+        return election
+
+    def get_leaders(self, elections):
+        return [election for election in elections if election.is_leader]
+
+    def wait_for_leader(self, elections):
+        self.wait_for(lambda: len(self.get_leaders(elections)) == 1)
+
+        leader = self.get_leaders(elections)[0]
+        self.assertEqual(self.store.get('/test_election')['value'],
+                         leader.value)
+
+        return leader
+
+    def test_one_leader(self):
+        elections = [self.get_election('candidate%d' % (i,))
+                     for i in range(3)]
+
+        leader = self.wait_for_leader(elections)
+
+        # Several TTLs pass, while the leader renews.
+        for i in range(6):
+            time.sleep(.3)
+            self.advance(1)
+
+        self.assertEqual(self.get_leaders(elections), [leader])
+        self.assertEqual(self.events, [('elected', leader.value)])
+
+    def test_resign(self):
+        elections = [self.get_election('candidate%d' % (i,))
+                     for i in range(2)]
+
+        leader = self.wait_for_leader(elections)
+        leader.stop()
+
+        # The other candidate takes over without the key having to expire.
+        successor = self.wait_for_leader(elections)
+
+        # The callbacks run just after the leadership changes, and the 
+        # successor may be elected before the leader's thread reports the 
+        # loss.
+        self.assertIsNot(successor, leader)
+        self.wait_for(lambda: len(self.events) == 3)
+        self.assertEqual(sorted(self.events), 
+                         sorted([('elected', leader.value),
+                                 ('lost', leader.value),
+                                 ('elected', successor.value)]))
+
+    def test_crash(self):
+        elections = [self.get_election('candidate%d' % (i,))
+                     for i in range(2)]
+
+        leader = self.wait_for_leader(elections)
+        leader.stop(resign=False)
+
+        time.sleep(.3)
+        self.assertEqual(self.get_leaders(elections), [])
+
+        # The other candidate takes over once the key expires.
+        self.advance(3)
+        successor = self.wait_for_leader(elections)
+
+        self.assertIsNot(successor, leader)
+
+    def test_overwritten(self):
+        election = self.get_election('candidate')
+        self.wait_for_leader([election])
+
+        self.get_client().node.set('/test_election', 'usurper', ttl=60)
+
+        self.wait_for(lambda: ('lost', 'candidate') in self.events)
+        self.assertFalse(election.is_leader)
+
+if __name__ == '__main__':
+    unittest.main()
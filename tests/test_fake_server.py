@@ -0,0 +1,51 @@
+import time
+import unittest
+
+import requests.exceptions
+
+from support import FakeServerTestCase
+
+
+class FakeServerTest(FakeServerTestCase):
+    def test_keys_expire_on_the_clock(self):
+        client = self.get_client()
+        client.node.set('/test_key', 'value', ttl=10)
+
+        self.advance(9)
+        self.assertTrue(self.exists('/test_key'))
+
+        self.advance(2)
+        self.assertFalse(self.exists('/test_key'))
+
+    def test_abandoned_wait_ends(self):
+        client = self.get_client()
+
+        start = time.time()
+        self.assertRaises(requests.exceptions.Timeout,
+                          client.node.wait, '/test_key', timeout=.3)
+        self.assertLess(time.time() - start, 2)
+
+        # The server notices the closed connection, and stops watching.
+        self.wait_for(lambda: self.store.get_stats()['watchers'] == 0)
+
+    def test_stop_ends_waits(self):
+        client = self.get_client()
+        errors = []
+
+        def wait():
+            try:
+                client.node.wait('/test_key')
+            except Exception as e:
+                errors.append(e)
+
+        t = self.start_thread(wait)
+        self.wait_for(lambda: self.store.get_stats()['watchers'] == 1)
+
+        self.server.stop()
+        t.join(5)
+
+        self.assertFalse(t.is_alive())
+        self.wait_for(lambda: self.store.get_stats()['watchers'] == 0)
+
+if __name__ == '__main__':
+    unittest.main()
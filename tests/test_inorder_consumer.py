@@ -0,0 +1,103 @@
+import threading
+import time
+import unittest
+
+from support import FakeServerTestCase
+
+
+class InOrderConsumerTest(FakeServerTestCase):
+    def setUp(self):
+        super(InOrderConsumerTest, self).setUp()
+
+        self.inorder = self.get_client().inorder.get_inorder('/test_queue')
+
+    def get_consumer(self, **kwargs):
+        return self.get_client().inorder.get_inorder('/test_queue').\
+                get_consumer(**kwargs)
+
+    def drain(self, consumer_count, prefetch):
+        """Consume the queue with several consumers at once, and return the
+        claimed values and the consumers.
+        """
+
+        consumers = [self.get_consumer(prefetch=prefetch)
+                     for i in range(consumer_count)]
+
+        values = []
+        values_lock = threading.Lock()
+
+        def consume(consumer):
+            while 1:
+                node = consumer.get(block=False)
+                if node is None:
+                    return
+
+                with values_lock:
+                    values.append(node.value)
+
+        threads = [self.start_thread(lambda consumer=consumer:
+                                        consume(consumer))
+                   for consumer in consumers]
+
+        for t in threads:
+            t.join(30)
+
+        return (values, consumers)
+
+    def test_get_oldest(self):
+        for i in range(3):
+            self.inorder.add(str(i))
+
+        consumer = self.get_consumer(prefetch=1)
+        self.assertEqual([consumer.get().value for i in range(3)],
+                         ['0', '1', '2'])
+
+        self.assertEqual(list(self.inorder.list().node.children), [])
+
+    def test_get_empty(self):
+        consumer = self.get_consumer()
+
+        self.assertIsNone(consumer.get(block=False))
+
+        start = time.time()
+        self.assertIsNone(consumer.get(timeout=.3))
+        self.assertGreaterEqual(time.time() - start, .3)
+
+    def test_get_waits_for_entry(self):
+        consumer = self.get_consumer()
+        nodes = []
+        t = self.start_thread(lambda: nodes.append(consumer.get(timeout=5)))
+
+        time.sleep(.2)
+        self.inorder.add('value')
+        t.join(5)
+
+        self.assertEqual([node.value for node in nodes], ['value'])
+
+    def test_each_entry_claimed_once(self):
+        expected = [str(i) for i in range(100)]
+        for value in expected:
+            self.inorder.add(value)
+
+        (values, consumers) = self.drain(4, 10)
+
+        self.assertEqual(sorted(values), sorted(expected))
+        self.assertEqual(sum(consumer.claimed_count
+                             for consumer
+                             in consumers), 100)
+
+    def test_consumers_spread_out(self):
+        # Consumers that all tried the oldest entries would contend for
+        # nearly every one of them (about three conflicts per entry, here).
+        for i in range(200):
+            self.inorder.add(str(i))
+
+        (values, consumers) = self.drain(4, 1)
+
+        self.assertEqual(len(values), 200)
+        self.assertLess(sum(consumer.conflict_count
+                            for consumer
+                            in consumers), 200)
+
+if __name__ == '__main__':
+    unittest.main()
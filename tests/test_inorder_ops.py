@@ -0,0 +1,62 @@
+import unittest
+
+from support import FakeServerTestCase
+
+
+class AddManyTest(FakeServerTestCase):
+    def setUp(self):
+        super(AddManyTest, self).setUp()
+
+        self.inorder = self.get_client().inorder.get_inorder('/test_queue')
+
+    def test_add_many(self):
+        values = [str(i) for i in range(50)]
+
+        r = self.inorder.add_many(iter(values), ttl=30, max_concurrency=8)
+
+        self.assertEqual(r.failures, {})
+        self.assertEqual(len(r.keys), 50)
+
+        # The keys are in the order of the values, whatever order they were
+        # assigned in.
+        self.assertEqual([self.store.get(key)['value'] for key in r.keys],
+                         values)
+        self.assertEqual(set(self.store.get(key)['ttl'] for key in r.keys),
+                         set([30]))
+
+    def test_ttl_per_value(self):
+        r = self.inorder.add_many(['a', 'b', 'c'], ttl=[10, None, 20])
+
+        self.assertEqual([self.store.get(key).get('ttl') for key in r.keys],
+                         [10, None, 20])
+
+        self.assertRaises(ValueError, self.inorder.add_many, ['a', 'b'],
+                          ttl=[10])
+
+    def test_failures(self):
+        self.server.faults.add_error_burst(2)
+
+        r = self.inorder.add_many(['a', 'b', 'c', 'd'], max_concurrency=1)
+
+        self.assertEqual(sorted(r.failures.keys()), [0, 1])
+        self.assertEqual(r.keys[:2], [None, None])
+        self.assertEqual([self.store.get(key)['value'] for key in r.keys[2:]],
+                         ['c', 'd'])
+
+
+class ListTest(FakeServerTestCase):
+    def test_list(self):
+        inorder = self.get_client().inorder.get_inorder('/test_queue')
+
+        self.assertRaises(KeyError, inorder.list)
+
+        for i in range(3):
+            inorder.add(str(i))
+
+        self.assertEqual([node.value
+                          for node
+                          in inorder.list(sorted=True).node.children],
+                         ['0', '1', '2'])
+
+if __name__ == '__main__':
+    unittest.main()
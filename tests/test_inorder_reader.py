@@ -0,0 +1,69 @@
+import time
+import unittest
+
+from support import FakeServerTestCase
+
+
+class InOrderReaderTest(FakeServerTestCase):
+    def setUp(self):
+        super(InOrderReaderTest, self).setUp()
+
+        self.inorder = self.get_client().inorder.get_inorder('/test_queue')
+
+    def values(self, nodes):
+        return [node.value for node in nodes]
+
+    def test_windows(self):
+        for i in range(7):
+            self.inorder.add(str(i))
+
+        reader = self.inorder.get_reader(window_size=3)
+
+        self.assertEqual(self.values(reader.next_window()), ['0', '1', '2'])
+        self.assertEqual(self.values(reader.next_window()), ['3', '4', '5'])
+        self.assertEqual(self.values(reader.next_window()), ['6'])
+
+        # The windows came from one listing.
+        self.assertEqual(reader.list_count, 1)
+
+        # Only the entries after the last one returned are returned.
+        self.inorder.add('7')
+        self.assertEqual(self.values(reader.next_window()), ['7'])
+        self.assertEqual(reader.list_count, 2)
+        self.assertEqual(self.store.get(reader.last_key)['value'], '7')
+
+        self.assertEqual(reader.next_window(), [])
+
+        reader.reset()
+        self.assertEqual(self.values(reader.next_window()), ['0', '1', '2'])
+
+    def test_wait(self):
+        self.inorder.add('0')
+
+        reader = self.inorder.get_reader()
+        self.assertEqual(self.values(reader.next_window()), ['0'])
+
+        # An unchanged directory isn't listed again.
+        start = time.time()
+        self.assertEqual(reader.next_window(wait_s=.3), [])
+        self.assertGreaterEqual(time.time() - start, .3)
+        self.assertEqual(reader.list_count, 1)
+
+        self.inorder.add('1')
+        self.assertEqual(self.values(reader.next_window(wait_s=5)), ['1'])
+        self.assertEqual(reader.list_count, 2)
+
+    def test_missing_directory(self):
+        reader = self.inorder.get_reader()
+
+        self.assertEqual(reader.next_window(), [])
+        self.assertEqual(reader.list_count, 0)
+
+        self.inorder.add('0')
+        self.assertEqual(self.values(reader.next_window()), ['0'])
+
+    def test_window_size(self):
+        self.assertRaises(ValueError, self.inorder.get_reader, window_size=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import time
+import unittest
+
+from support import FakeServerTestCase
+
+
+class LockBaseTest(FakeServerTestCase):
+    """The behaviour that every lock gets from _LockBase, exercised through
+    the recipes (which the fake server supports, unlike the lock module).
+    """
+
+    def test_nonblocking_with_timeout(self):
+        lock = self.get_client().recipe.lock.get_lock('test_lock', 3)
+
+        self.assertRaises(ValueError, lock.acquire, blocking=False, timeout=1)
+        self.assertIsNone(lock.key)
+
+        self.assertTrue(lock.acquire(blocking=False))
+        lock.release()
+
+    def test_reacquire_replaces_renewer(self):
+        lost = []
+
+        # A semaphore with room for two can be acquired again while it's
+        # held.
+        semaphore = self.get_client().recipe.semaphore.get_semaphore(
+                        'test_semaphore', 2, 3, auto_renew=True,
+                        renew_fraction=.02,
+                        on_lost=lambda lock, e: lost.append(e))
+
+        self.assertTrue(semaphore.acquire())
+        self.assertTrue(semaphore.acquire())
+
+        semaphore.release()
+
+        # A renewer left over from the first acquire would fail to renew the
+        # released semaphore.
+        time.sleep(.3)
+
+        self.assertEqual(lost, [])
+        self.assertFalse(semaphore.is_lost)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import time
+import unittest
+
+from support import FakeServerTestCase
+
+
+class _InOrderLockTests(object):
+    """Tests that apply to both the key lock and the semaphore (with a limit
+    of one).
+    """
+
+    def get_lock(self, ttl=3, **kwargs):
+        raise NotImplementedError()
+
+    def test_exclusive(self):
+        holder = self.get_lock()
+        self.assertTrue(holder.acquire())
+
+        contender = self.get_lock()
+        self.assertFalse(contender.acquire(timeout=.3))
+
+        holder.release()
+        self.assertTrue(contender.acquire(timeout=2))
+        contender.release()
+
+    def test_waiter_acquires_on_release(self):
+        holder = self.get_lock()
+        holder.acquire()
+
+        waiter = self.get_lock()
+        acquired = []
+        t = self.start_thread(lambda: acquired.append(waiter.acquire()))
+
+        time.sleep(.2)
+        self.assertEqual(acquired, [])
+
+        holder.release()
+        t.join(5)
+
+        self.assertEqual(acquired, [True])
+        waiter.release()
+
+    def test_waiter_acquires_when_holder_expires(self):
+        holder = self.get_lock(ttl=5, auto_renew=False)
+        holder.acquire()
+
+        waiter = self.get_lock(ttl=60)
+        acquired = []
+        t = self.start_thread(lambda: acquired.append(waiter.acquire()))
+
+        time.sleep(.2)
+        self.advance(6)
+        t.join(5)
+
+        self.assertEqual(acquired, [True])
+        waiter.release()
+
+    def test_waiter_outlives_renewing_holder(self):
+        # The holder renews much more often than the waiter refreshes, and
+        # every renewal is an event that wakes the waiter. The waiter still
+        # has to refresh its own key on schedule, or it'll expire.
+        holder = self.get_lock(auto_renew=True, renew_fraction=.02)
+        holder.acquire()
+
+        waiters = [self.get_lock(renew_fraction=.1) for i in range(2)]
+        results = []
+        holders = []
+
+        def acquire(waiter):
+            try:
+                is_acquired = waiter.acquire()
+            except Exception as e:
+                results.append(e)
+            else:
+                holders.append(waiter)
+                results.append(is_acquired)
+
+        threads = [self.start_thread(lambda waiter=waiter: acquire(waiter))
+                   for waiter in waiters]
+
+        # Three seconds of the store's time (the TTL) pass for every 1.5s of
+        # real time, during which the waiters refresh about five times.
+        for i in range(10):
+            time.sleep(.5)
+            self.advance(1)
+
+        self.assertEqual(results, [])
+
+        holder.release()
+        self.wait_for(lambda: len(results) == 1)
+        self.assertEqual(results, [True])
+
+        # The other waiter still has a key, while it waits.
+        holders[0].release()
+
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(results, [True, True])
+
+    def test_timeout_isnt_extended_by_renewals(self):
+        holder = self.get_lock(auto_renew=True, renew_fraction=.02)
+        holder.acquire()
+
+        contender = self.get_lock()
+
+        start = time.time()
+        self.assertFalse(contender.acquire(timeout=.5))
+        self.assertLess(time.time() - start, 1.5)
+
+        holder.release()
+
+
+class KeyLockTest(_InOrderLockTests, FakeServerTestCase):
+    def get_lock(self, ttl=3, **kwargs):
+        return self.get_client().recipe.lock.get_lock('test_lock', ttl,
+                                                      **kwargs)
+
+if __name__ == '__main__':
+    unittest.main()
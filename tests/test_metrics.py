@@ -0,0 +1,107 @@
+import unittest
+
+from etcd.metrics import LatencyHistogram, OperationMetrics
+
+from support import FakeServerTestCase
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+
+        # 1ms to 1s, in 1ms steps.
+        for i in range(1, 1001):
+            histogram.record(i / 1000.0)
+
+        self.assertEqual(histogram.count, 1000)
+        self.assertAlmostEqual(histogram.mean_s, .5005)
+        self.assertEqual(histogram.max_s, 1.0)
+
+        percentiles = [1, 50, 90, 99, 100]
+        values = histogram.get_percentiles(percentiles)
+
+        for (percentile, value_s) in zip(percentiles, values):
+            expected_s = percentile / 100.0
+            self.assertLessEqual(abs(value_s - expected_s) / expected_s,
+                                 1 / 32.0)
+
+        # Never more than the largest value recorded.
+        self.assertEqual(values[-1], 1.0)
+
+    def test_small_values_are_exact(self):
+        histogram = LatencyHistogram()
+
+        for value_us in (3, 7, 7, 20):
+            histogram.record(value_us / 1000000.0)
+
+        self.assertEqual(histogram.get_percentiles([25, 50, 75]),
+                         [.000003, .000007, .000007])
+
+    def test_empty(self):
+        histogram = LatencyHistogram()
+
+        self.assertEqual(histogram.get_percentiles([50, 99]), [None, None])
+        self.assertIsNone(histogram.mean_s)
+        self.assertIsNone(histogram.max_s)
+
+
+class OperationMetricsTest(FakeServerTestCase):
+    def setUp(self):
+        super(OperationMetricsTest, self).setUp()
+
+        self.client = self.get_client()
+        self.metrics = self.client.enable_metrics()
+
+    def test_counts_and_errors(self):
+        self.client.node.set('/test_key', 'value')
+        for i in range(3):
+            self.client.node.get('/test_key')
+
+        self.assertRaises(KeyError, self.client.node.get, '/test_missing')
+
+        stats = self.metrics.snapshot()
+
+        self.assertEqual(stats['node.set'].count, 1)
+        self.assertEqual(stats['node.set'].errors, {})
+
+        get_stats = stats['node.get']
+        self.assertEqual(get_stats.count, 4)
+        self.assertEqual(get_stats.errors, { 'KeyError': 1 })
+        self.assertTrue(0 < get_stats.p50_s <= get_stats.p99_s <=
+                        get_stats.max_s)
+
+    def test_outermost_only(self):
+        lock = self.client.recipe.lock.get_lock('test_lock', 3)
+        lock.acquire()
+        lock.release()
+
+        # The requests made while acquiring and releasing aren't counted
+        # separately.
+        self.assertEqual(sorted(self.metrics.snapshot().keys()),
+                         ['lock.acquire', 'lock.release'])
+
+    def test_reset(self):
+        self.client.node.set('/test_key', 'value')
+
+        self.assertEqual(list(self.metrics.snapshot(reset=True).keys()),
+                         ['node.set'])
+        self.assertEqual(self.metrics.snapshot(), {})
+
+        self.client.disable_metrics()
+        self.client.node.set('/test_key', 'value')
+
+        self.assertIsNone(self.client.metrics)
+        self.assertEqual(self.metrics.snapshot(), {})
+
+    def test_record(self):
+        metrics = OperationMetrics()
+        metrics.record('op', .01)
+        metrics.record('op', .02, ValueError())
+
+        stats = metrics.snapshot()['op']
+        self.assertEqual(stats.count, 2)
+        self.assertEqual(stats.errors, { 'ValueError': 1 })
+        self.assertEqual(stats.max_s, .02)
+
+if __name__ == '__main__':
+    unittest.main()
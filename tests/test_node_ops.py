@@ -0,0 +1,195 @@
+import unittest
+
+import etcd.config
+import etcd.exceptions
+
+from support import FakeServerTestCase
+
+
+class GetValueTest(FakeServerTestCase):
+    def setUp(self):
+        super(GetValueTest, self).setUp()
+
+        self.client = self.get_client()
+
+    def test_get_value(self):
+        r = self.client.node.set('/test_key', 'value')
+
+        self.assertEqual(self.client.node.get_value('/test_key'), 'value')
+        self.assertEqual(self.client.node.get_value('/test_key',
+                                                    with_index=True),
+                         ('value', r.node.modified_index))
+
+        # The same as get() reports.
+        r = self.client.node.get('/test_key')
+        self.assertEqual(self.client.node.get_value('/test_key',
+                                                    with_index=True),
+                         (r.node.value, r.node.modified_index))
+
+    def test_missing(self):
+        self.assertRaises(KeyError, self.client.node.get_value,
+                          '/test_missing')
+
+    def test_directory(self):
+        self.client.directory.create('/test_dir')
+
+        self.assertRaises(ValueError, self.client.node.get_value,
+                          '/test_dir')
+
+
+class AtomicUpdateTest(FakeServerTestCase):
+    def setUp(self):
+        super(AtomicUpdateTest, self).setUp()
+
+        self.client = self.get_client()
+
+    def known_paths(self):
+        return list(self.client.node._NodeOps__known_states.keys())
+
+    def test_atomic_update(self):
+        self.client.node.set('/test_counter', '1')
+
+        r = self.client.node.atomic_update('/test_counter',
+                                           lambda value: int(value) + 1)
+
+        self.assertEqual(r.node.value, '2')
+        self.assertEqual(self.known_paths(), [])
+
+        self.assertRaises(ValueError, self.client.node.atomic_update,
+                          '/test_counter', lambda value: value,
+                          current_value='2')
+
+    def test_cache_dropped_on_conflict(self):
+        self.client.node.set('/test_counter', '1')
+        self.client.node.atomic_update('/test_counter',
+                                       lambda value: int(value) + 1,
+                                       use_cache=True)
+
+        self.assertEqual(self.known_paths(), ['/test_counter'])
+
+        # Another client makes the remembered state stale, so the write is
+        # rejected, and the state is forgotten.
+        self.get_client().node.set('/test_counter', '10')
+
+        values = []
+
+        def update(value):
+            values.append(value)
+            return str(int(value) + 1)
+
+        self.assertRaises(etcd.exceptions.EtcdAtomicWriteError,
+                          self.client.node.atomic_update, '/test_counter',
+                          update, use_cache=True, max_attempts=1)
+
+        self.assertEqual(self.known_paths(), [])
+
+        r = self.client.node.atomic_update('/test_counter', update,
+                                           use_cache=True)
+
+        self.assertEqual(values, ['2', '10'])
+        self.assertEqual(r.node.value, '11')
+        self.assertEqual(self.known_paths(), ['/test_counter'])
+
+    def test_cache_is_bounded(self):
+        original_size = etcd.config.ATOMIC_CACHE_SIZE
+        etcd.config.ATOMIC_CACHE_SIZE = 3
+
+        try:
+            for i in range(5):
+                path = '/test_counter/%d' % (i,)
+                self.client.node.set(path, '0')
+                self.client.node.atomic_update(path, lambda value: '1',
+                                               use_cache=True)
+
+            # Using one refreshes it.
+            self.client.node.atomic_update('/test_counter/2',
+                                           lambda value: '2',
+                                           use_cache=True)
+
+            self.client.node.set('/test_counter/5', '0')
+            self.client.node.atomic_update('/test_counter/5',
+                                           lambda value: '1',
+                                           use_cache=True)
+        finally:
+            etcd.config.ATOMIC_CACHE_SIZE = original_size
+
+        self.assertEqual(self.known_paths(),
+                         ['/test_counter/4', '/test_counter/2',
+                          '/test_counter/5'])
+
+
+class TransactionTest(FakeServerTestCase):
+    def setUp(self):
+        super(TransactionTest, self).setUp()
+
+        self.client = self.get_client()
+
+    def state(self, key):
+        if self.exists(key) is False:
+            return None
+
+        node = self.store.get(key)
+        return (node['value'], node.get('ttl'))
+
+    def test_transaction(self):
+        self.client.node.set('/test_a', '1', ttl=60)
+        self.client.node.set('/test_b', '2')
+
+        r = self.client.node.transaction(
+                ['/test_a', '/test_b', '/test_c'],
+                lambda values: { '/test_a': None,
+                                 '/test_b': '3',
+                                 '/test_c': values['/test_b'] })
+
+        self.assertEqual(r.attempts, 1)
+        self.assertEqual(sorted(r.responses.keys()),
+                         ['/test_a', '/test_b', '/test_c'])
+
+        self.assertIsNone(self.state('/test_a'))
+        self.assertEqual(self.state('/test_b'), ('3', None))
+        self.assertEqual(self.state('/test_c'), ('2', None))
+
+    def test_conflict_reverts(self):
+        self.client.node.set('/test_updated', 'old', ttl=60)
+        self.client.node.set('/test_deleted', 'old', ttl=20)
+        self.client.node.set('/test_conflicted', 'old', ttl=30)
+
+        other_client = self.get_client()
+        states = []
+
+        def update(values):
+            if not states:
+                # Someone else changes a key after we've read it.
+                other_client.node.set('/test_conflicted', 'other', ttl=45)
+            else:
+                # The successful writes of the first attempt were reverted.
+                states.append((self.state('/test_updated'),
+                               self.state('/test_deleted')))
+
+            states.append(values)
+
+            return { '/test_updated': 'new',
+                     '/test_deleted': None,
+                     '/test_conflicted': values['/test_conflicted'] + '-new' }
+
+        # The other two writes succeed on the first attempt, and are reverted.
+        r = self.client.node.transaction(
+                ['/test_updated', '/test_deleted', '/test_conflicted'],
+                update)
+
+        self.assertEqual(r.attempts, 2)
+        self.assertEqual(states[1], (('old', 60), ('old', 20)))
+        self.assertEqual(states[2], { '/test_updated': 'old',
+                                      '/test_deleted': 'old',
+                                      '/test_conflicted': 'other' })
+
+        self.assertEqual(self.state('/test_updated'), ('new', 60))
+        self.assertIsNone(self.state('/test_deleted'))
+        self.assertEqual(self.state('/test_conflicted'), ('other-new', 45))
+
+    def test_unread_key(self):
+        self.assertRaises(ValueError, self.client.node.transaction,
+                          ['/test_a'], lambda values: { '/test_b': '1' })
+
+if __name__ == '__main__':
+    unittest.main()
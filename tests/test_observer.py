@@ -0,0 +1,58 @@
+import unittest
+
+import requests.exceptions
+
+from etcd.observer import RequestObserver
+
+from support import FakeServerTestCase
+
+
+class _RecordingObserver(RequestObserver):
+    def __init__(self):
+        self.events = []
+
+    def request_started(self, info):
+        self.events.append(('request_started', None))
+
+    def attempt_started(self, info):
+        self.events.append(('attempt_started', None))
+
+    def attempt_finished(self, info, exception):
+        self.events.append(('attempt_finished', exception))
+
+    def request_finished(self, info):
+        self.events.append(('request_finished', info.error))
+
+
+class RequestObserverTest(FakeServerTestCase):
+    def setUp(self):
+        super(RequestObserverTest, self).setUp()
+
+        self.client = self.get_client()
+        self.observer = _RecordingObserver()
+        self.client.add_observer(self.observer)
+
+    def test_request(self):
+        self.client.node.set('/test_key', 'value')
+
+        self.assertEqual(self.observer.events,
+                         [('request_started', None),
+                          ('attempt_started', None),
+                          ('attempt_finished', None),
+                          ('request_finished', None)])
+
+    def test_timeout(self):
+        self.assertRaises(requests.exceptions.Timeout,
+                          self.client.node.wait, '/test_key', timeout=.3)
+
+        names = [name for (name, e) in self.observer.events]
+        self.assertEqual(names, ['request_started', 'attempt_started',
+                                 'attempt_finished', 'request_finished'])
+
+        # The attempt is finished with the same exception as the request.
+        attempt_error = self.observer.events[2][1]
+        self.assertIsInstance(attempt_error, requests.exceptions.Timeout)
+        self.assertIs(self.observer.events[3][1], attempt_error)
+
+if __name__ == '__main__':
+    unittest.main()
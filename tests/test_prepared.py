@@ -0,0 +1,64 @@
+import unittest
+
+from etcd.fake_server import FakeEtcdServer
+
+from support import FakeServerTestCase
+
+
+class PreparedOperationTest(FakeServerTestCase):
+    def setUp(self):
+        super(PreparedOperationTest, self).setUp()
+
+        # A second member of the same cluster, to fail over to.
+        self.other_server = FakeEtcdServer(store=self.store)
+        self.other_server.start()
+
+        self.client = self.get_client()
+
+    def tearDown(self):
+        if self.other_server.is_stopped() is False:
+            self.other_server.stop()
+
+        super(PreparedOperationTest, self).tearDown()
+
+    def get_current_server(self):
+        for server in (self.server, self.other_server):
+            if server.prefix == self.client.prefix:
+                return server
+
+        self.fail("The client isn't using either member.")
+
+    def test_send(self):
+        set_ = self.client.node.prepare_set('/test_key', 'value', ttl=30)
+        get = self.client.node.prepare_get('/test_key')
+
+        self.assertRaises(KeyError, get.send)
+
+        for i in range(3):
+            set_.send()
+
+        self.assertEqual(self.store.get('/test_key')['value'], 'value')
+        self.assertEqual(self.store.get('/test_key')['ttl'], 30)
+        self.assertEqual(get.send().node.value, 'value')
+
+    def test_failover(self):
+        set_ = self.client.node.prepare_set('/test_key', 'value')
+        get = self.client.node.prepare_get('/test_key')
+
+        set_.send()
+        self.assertEqual(get.send().node.value, 'value')
+
+        old_prefix = self.client.prefix
+        self.get_current_server().stop()
+
+        # Both are rebuilt for the member that the client moves to.
+        self.store.set('/test_key', 'other value')
+        self.assertEqual(get.send().node.value, 'other value')
+        self.assertNotEqual(self.client.prefix, old_prefix)
+
+        set_.send()
+        self.assertEqual(self.store.get('/test_key')['value'], 'value')
+        self.assertEqual(get.send().node.value, 'value')
+
+if __name__ == '__main__':
+    unittest.main()
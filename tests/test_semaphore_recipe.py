@@ -0,0 +1,45 @@
+import time
+import unittest
+
+from support import FakeServerTestCase
+from test_lock_recipe import _InOrderLockTests
+
+
+class SemaphoreTest(_InOrderLockTests, FakeServerTestCase):
+    def get_lock(self, ttl=3, limit=1, **kwargs):
+        return self.get_client().recipe.semaphore.get_semaphore(
+                'test_semaphore', limit, ttl, **kwargs)
+
+    def test_limit(self):
+        holders = [self.get_lock(limit=2) for i in range(2)]
+        for holder in holders:
+            self.assertTrue(holder.acquire(timeout=2))
+
+        contender = self.get_lock(limit=2)
+        self.assertFalse(contender.acquire(timeout=.3))
+
+        holders[1].release()
+        self.assertTrue(contender.acquire(timeout=2))
+
+        holders[0].release()
+        contender.release()
+
+    def test_renewed_by_default(self):
+        holder = self.get_lock(ttl=2)
+        holder.acquire()
+
+        # Several TTLs pass, while the holder is renewed about every second.
+        for i in range(6):
+            time.sleep(.6)
+            self.advance(1)
+
+        self.assertFalse(holder.is_lost)
+        self.assertTrue(self.exists(holder.key))
+
+        contender = self.get_lock()
+        self.assertFalse(contender.acquire(timeout=.3))
+
+        holder.release()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import contextlib
+import tempfile
+import threading
+import unittest
+
+import requests.exceptions
+
+from etcd.observer import RequestInfo
+from etcd.tracing import TracingObserver
+
+from support import FakeServerTestCase
+
+
+class _Span(object):
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.exceptions = []
+        self.is_ended = False
+
+    def set_attribute(self, name, value):
+        self.attributes[name] = value
+
+    def set_status(self, status):
+        pass
+
+    def record_exception(self, exception):
+        self.exceptions.append(exception)
+
+    def end(self):
+        self.is_ended = True
+
+
+class _RecordingTracer(object):
+    """Implements the part of the OpenTelemetry tracer that we use."""
+
+    def __init__(self):
+        self.spans = []
+        self.__lock = threading.Lock()
+
+    def start_span(self, name, attributes=None, **kwargs):
+        span = _Span(name, attributes)
+
+        with self.__lock:
+            self.spans.append(span)
+
+        return span
+
+    @contextlib.contextmanager
+    def start_as_current_span(self, name, attributes=None, **kwargs):
+        span = self.start_span(name, attributes)
+
+        try:
+            yield span
+        except Exception as e:
+            span.record_exception(e)
+            raise
+        finally:
+            span.end()
+
+    def get_spans(self, name):
+        with self.__lock:
+            return [span for span in self.spans if span.name == name]
+
+
+class TracingTest(FakeServerTestCase):
+    def setUp(self):
+        super(TracingTest, self).setUp()
+
+        self.client = self.get_client()
+        self.tracer = _RecordingTracer()
+
+        self.assertTrue(self.client.enable_tracing(self.tracer))
+
+    def test_operation(self):
+        self.client.node.set('/test_key', 'value')
+
+        (operation_span,) = self.tracer.get_spans('etcd.node.set')
+        (attempt_span,) = self.tracer.get_spans('etcd.http.put')
+
+        self.assertEqual(operation_span.attributes['etcd.key'], '/test_key')
+        self.assertEqual(attempt_span.attributes['http.status_code'], 201)
+        self.assertTrue(operation_span.is_ended)
+        self.assertTrue(attempt_span.is_ended)
+
+    def test_timed_out_attempt_ends(self):
+        self.assertRaises(requests.exceptions.Timeout,
+                          self.client.node.wait, '/test_key', timeout=.3)
+
+        (attempt_span,) = self.tracer.get_spans('etcd.http.get')
+
+        self.assertTrue(attempt_span.is_ended)
+        self.assertEqual(len(attempt_span.exceptions), 1)
+        self.assertIsInstance(attempt_span.exceptions[0],
+                              requests.exceptions.Timeout)
+
+    def test_request_finished_ends_attempt(self):
+        observer = TracingObserver(self.tracer)
+        info = RequestInfo('get', '/keys/test_key', None)
+        info.member = 'http://127.0.0.1:2379'
+        info.attempts = 1
+
+        observer.attempt_started(info)
+        info.error = ValueError()
+        observer.request_finished(info)
+
+        (attempt_span,) = self.tracer.get_spans('etcd.http.get')
+        self.assertTrue(attempt_span.is_ended)
+        self.assertEqual(attempt_span.exceptions, [info.error])
+
+    def test_composite_operations(self):
+        for i in range(3):
+            self.client.node.set('/test_dir/key%d' % (i,), 'value')
+
+        self.assertEqual(len(list(self.client.directory.walk('/test_dir'))), 
+                         3)
+
+        self.client.directory.delete_many('/test_dir')
+
+        (delete_span,) = self.tracer.get_spans('etcd.directory.delete_many')
+        self.assertTrue(delete_span.is_ended)
+
+        # The bulk delete's own walk gets a span too.
+        walk_spans = self.tracer.get_spans('etcd.directory.walk')
+        self.assertEqual(len(walk_spans), 2)
+
+        for span in walk_spans:
+            self.assertTrue(span.is_ended)
+            self.assertEqual(span.attributes['etcd.key'], '/test_dir')
+
+
+class CompositeMetricsTest(FakeServerTestCase):
+    def setUp(self):
+        super(CompositeMetricsTest, self).setUp()
+
+        self.client = self.get_client()
+        self.metrics = self.client.enable_metrics()
+
+    def test_composite_operations(self):
+        self.client.node.set('/test_counter', '0')
+        self.client.node.atomic_update('/test_counter',
+                                       lambda value: str(int(value) + 1))
+        self.client.node.transaction(['/test_counter'],
+                                     lambda values: { '/test_counter': '5' })
+        self.client.directory.sync('/test_dir', { 'a': '1', 'b': '2' })
+
+        walk = self.client.directory.walk('/test_dir')
+        next(walk)
+
+        # An abandoned walk is measured up to when it's closed.
+        walk.close()
+
+        self.assertRaises(KeyError, list,
+                          self.client.directory.walk('/test_missing'))
+
+        with tempfile.TemporaryFile('w+') as f:
+            self.client.transfer.dump('/test_dir', f)
+
+            f.seek(0)
+            self.client.transfer.load(f, path='/test_copy')
+
+        self.client.directory.delete_many('/test_dir')
+
+        stats = self.metrics.snapshot()
+
+        # Every composite operation is counted once. The requests that they 
+        # make from the calling thread count toward them, but those made from 
+        # worker threads are counted separately.
+        for name in ('node.atomic_update', 'node.transaction', 
+                     'directory.sync', 'directory.delete_many', 
+                     'transfer.dump', 'transfer.load'):
+            self.assertEqual(stats[name].count, 1)
+            self.assertEqual(stats[name].errors, {})
+
+        # Not including the walk done by the bulk delete.
+        self.assertEqual(stats['directory.walk'].count, 2)
+        self.assertEqual(stats['directory.walk'].errors, { 'KeyError': 1 })
+
+    def test_lock_renew(self):
+        lock = self.client.recipe.lock.get_lock('test_lock', 3)
+        lock.acquire()
+        lock.renew(3)
+        lock.release()
+
+        self.assertEqual(self.metrics.snapshot()['lock.renew'].count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
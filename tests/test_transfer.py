@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from support import FakeServerTestCase
+
+
+class TransferTest(FakeServerTestCase):
+    def setUp(self):
+        super(TransferTest, self).setUp()
+
+        self.client = self.get_client()
+        self.temp_path = tempfile.mkdtemp()
+
+        self.client.directory.create('/test_source/expiring', ttl=60)
+
+        for i in range(10):
+            self.client.node.set('/test_source/expiring/v%d' % (i,), str(i))
+            self.client.node.set('/test_source/v%d' % (i,), str(i))
+
+        self.client.node.set('/test_source/session', 'value', ttl=30)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_path)
+
+        super(TransferTest, self).tearDown()
+
+    def dump(self):
+        dump_filepath = os.path.join(self.temp_path, 'dump')
+        with open(dump_filepath, 'w') as f:
+            count = self.client.transfer.dump('/test_source', f)
+
+        self.assertEqual(count, 22)
+
+        return dump_filepath
+
+    def load(self, **kwargs):
+        with open(self.dump()) as f:
+            return self.client.transfer.load(f, path='/test_target', **kwargs)
+
+    def assert_loaded(self, root):
+        for i in range(10):
+            self.assertEqual(self.store.get('%s/v%d' % (root, i))['value'],
+                             str(i))
+            self.assertEqual(
+                self.store.get('%s/expiring/v%d' % (root, i))['value'],
+                str(i))
+
+        self.assertEqual(self.store.get(root + '/expiring')['ttl'], 60)
+        self.assertEqual(self.store.get(root + '/session')['ttl'], 30)
+        self.assertNotIn('ttl', self.store.get(root + '/v0'))
+
+    def test_round_trip(self):
+        r = self.load()
+
+        self.assertEqual(r.loaded, 22)
+        self.assertEqual(r.skipped, 0)
+        self.assertEqual(r.failures, {})
+        self.assert_loaded('/test_target')
+
+    def test_existing_directory_gets_ttl(self):
+        # As if a value under the directory had been written first.
+        self.client.node.set('/test_target/expiring/v0', '0')
+
+        r = self.load(max_concurrency=1)
+
+        self.assertEqual(r.failures, {})
+        self.assert_loaded('/test_target')
+
+    def test_resume(self):
+        checkpoint_filepath = os.path.join(self.temp_path, 'checkpoint')
+        with open(checkpoint_filepath, 'w') as f:
+            f.write('5')
+
+        r = self.load(checkpoint_filepath=checkpoint_filepath,
+                      checkpoint_interval=4)
+
+        self.assertEqual(r.loaded, 17)
+        self.assertEqual(r.skipped, 5)
+        self.assertEqual(r.failures, {})
+
+        with open(checkpoint_filepath) as f:
+            self.assertEqual(f.read(), '22')
+
+        # Loading the rest, from the start, completes the copy.
+        r = self.load()
+
+        self.assertEqual(r.failures, {})
+        self.assert_loaded('/test_target')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+
+from support import FakeServerTestCase
+
+
+class TtlRefresherTest(FakeServerTestCase):
+    def setUp(self):
+        super(TtlRefresherTest, self).setUp()
+
+        self.client = self.get_client()
+        self.refresher = self.client.node.get_ttl_refresher(
+                            refresh_fraction=.1)
+
+    def tearDown(self):
+        self.refresher.stop()
+
+        super(TtlRefresherTest, self).tearDown()
+
+    def test_keeps_key_alive(self):
+        self.refresher.register('/test_presence', 'alive', 2)
+        self.wait_for(lambda: self.exists('/test_presence'))
+
+        # Twice the TTL passes, while the key is refreshed every 0.2s.
+        for i in range(8):
+            time.sleep(.3)
+            self.advance(.5)
+
+        self.assertEqual(self.client.node.get('/test_presence').node.value,
+                         'alive')
+
+        self.refresher.unregister('/test_presence')
+        self.assertEqual(self.refresher.paths, [])
+
+        time.sleep(.3)
+        self.advance(3)
+
+        self.assertRaises(KeyError, self.client.node.get, '/test_presence')
+
+    def test_register_replaces(self):
+        self.refresher.register('/test_presence', 'first', 2)
+        self.refresher.register('/test_presence', 'second', 2)
+
+        self.wait_for(lambda: self.exists('/test_presence') and 
+                              self.store.get('/test_presence')['value'] == 
+                                'second')
+
+        self.assertEqual(self.refresher.paths, ['/test_presence'])
+
+    def test_unregister_unknown(self):
+        self.assertRaises(KeyError, self.refresher.unregister, '/unknown')
+
+    def test_stops_after_expiry(self):
+        failures = []
+        failures_lock = threading.Lock()
+
+        def failed_cb(path, e, expires_in_s):
+            with failures_lock:
+                failures.append((path, expires_in_s))
+
+        paths = ['/test_presence/%d' % (i,) for i in range(5)]
+        for path in paths:
+            self.refresher.register(path, 'alive', 1, on_failure=failed_cb)
+
+        self.wait_for(lambda: all(self.exists(path) for path in paths))
+
+        self.server.stop()
+
+        # Every key is reported once it expires, and is then dropped.
+        self.wait_for(lambda: self.refresher.paths == [])
+        time.sleep(.5)
+
+        with failures_lock:
+            expired = sorted(path
+                             for (path, expires_in_s)
+                             in failures
+                             if expires_in_s <= 0)
+
+        self.assertEqual(expired, paths)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+from support import FakeServerTestCase
+
+
+class WriteBehindBufferTest(FakeServerTestCase):
+    def setUp(self):
+        super(WriteBehindBufferTest, self).setUp()
+
+        self.client = self.get_client()
+
+        # Only flush when we say so.
+        self.buffer = self.client.node.get_write_behind_buffer(
+                        flush_interval_s=60)
+
+    def tearDown(self):
+        self.buffer.close()
+
+        super(WriteBehindBufferTest, self).tearDown()
+
+    def value(self, key):
+        return self.store.get(key)['value']
+
+    def test_coalesces(self):
+        for i in range(10):
+            self.buffer.set('/test_progress', str(i))
+            self.buffer.set('/test_heartbeat', 'alive', ttl=30)
+
+        self.assertFalse(self.exists('/test_progress'))
+
+        self.assertEqual(self.buffer.flush(), 0)
+
+        self.assertEqual(self.value('/test_progress'), '9')
+        self.assertEqual(self.store.get('/test_heartbeat')['ttl'], 30)
+
+        self.assertEqual(self.buffer.set_count, 20)
+        self.assertEqual(self.buffer.suppressed_count, 18)
+        self.assertEqual(self.buffer.write_count, 2)
+        self.assertEqual(self.store.get_stats()['setsSuccess'], 2)
+
+        # Nothing is left to write.
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.buffer.write_count, 2)
+
+    def test_close_flushes(self):
+        self.buffer.set('/test_progress', '1')
+        self.buffer.close()
+
+        self.assertEqual(self.value('/test_progress'), '1')
+        self.assertRaises(ValueError, self.buffer.set, '/test_progress', '2')
+
+        # Closing again has no effect.
+        self.buffer.close()
+
+    def test_failures_retried(self):
+        self.buffer.set('/test_progress', '1')
+        self.buffer.set('/test_heartbeat', 'alive')
+
+        self.server.faults.error_rate = 1
+        self.assertEqual(self.buffer.flush(), 2)
+
+        # A newer value supersedes the one that failed.
+        self.buffer.set('/test_progress', '2')
+
+        self.server.faults.error_rate = 0
+        self.assertEqual(self.buffer.flush(), 0)
+
+        self.assertEqual(self.value('/test_progress'), '2')
+        self.assertEqual(self.value('/test_heartbeat'), 'alive')
+        self.assertEqual(self.buffer.failed_count, 2)
+        self.assertEqual(self.buffer.write_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
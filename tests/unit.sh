@@ -0,0 +1,3 @@
+#!/bin/sh
+
+PYTHONPATH=.. python -m unittest discover -p 'test_*.py'